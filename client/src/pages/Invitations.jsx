@@ -4,11 +4,13 @@ import {
   fetchGroupInvitations,
   acceptGroupInvite,
   denyGroupInvite,
+  respondToGroupInvites,
 } from '../redux/groupSlice';
 import {
   fetchEventInvitations,
   acceptEventInvite,
   denyEventInvite,
+  respondToEventInvites,
 } from '../redux/eventSlice';
 import { Link } from 'react-router-dom';
 import '../style/InvitationsStyle.css';
@@ -74,6 +76,25 @@ function Invitations() {
     });
   };
 
+  // Handlers for answering every listed invitation in one request
+  const handleRespondToAllGroupInvites = (action) => {
+    const invitationIds = groupInvitations.map((invite) => invite.id);
+    dispatch(respondToGroupInvites({ invitationIds, action })).then((result) => {
+      if (result.meta.requestStatus !== 'fulfilled') {
+        alert(`Failed to ${action} group invitations. Please try again.`);
+      }
+    });
+  };
+
+  const handleRespondToAllEventInvites = (action) => {
+    const invitationIds = eventInvitations.map((invite) => invite.id);
+    dispatch(respondToEventInvites({ invitationIds, action })).then((result) => {
+      if (result.meta.requestStatus !== 'fulfilled') {
+        alert(`Failed to ${action} event invitations. Please try again.`);
+      }
+    });
+  };
+
   return (
     <div className="invitations-page">
       <h2 className="page-title">Invitations</h2>
@@ -83,6 +104,22 @@ function Invitations() {
         <h3 className="section-title">Group Invitations</h3>
         {groupLoading && <p className="loading-message">Loading group invitations...</p>}
         {groupError && <p className="error-message">Error: {groupError}</p>}
+        {groupInvitations.length > 1 && (
+          <div className="invitation-actions">
+            <button
+              className="invitation-button accept-button"
+              onClick={() => handleRespondToAllGroupInvites('accept')}
+            >
+              Accept All
+            </button>
+            <button
+              className="invitation-button deny-button"
+              onClick={() => handleRespondToAllGroupInvites('deny')}
+            >
+              Deny All
+            </button>
+          </div>
+        )}
         {groupInvitations.length > 0 ? (
           <ul className="invitation-list">
             {groupInvitations.map((invite) => (
@@ -132,6 +169,22 @@ function Invitations() {
         <h3 className="section-title">Event Invitations</h3>
         {eventLoading && <p className="loading-message">Loading event invitations...</p>}
         {eventError && <p className="error-message">Error: {eventError}</p>}
+        {eventInvitations.length > 1 && (
+          <div className="invitation-actions">
+            <button
+              className="invitation-button accept-button"
+              onClick={() => handleRespondToAllEventInvites('accept')}
+            >
+              Accept All
+            </button>
+            <button
+              className="invitation-button deny-button"
+              onClick={() => handleRespondToAllEventInvites('deny')}
+            >
+              Deny All
+            </button>
+          </div>
+        )}
         {eventInvitations.length > 0 ? (
           <ul className="invitation-list">
             {eventInvitations.map((invite) => (
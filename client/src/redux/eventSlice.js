@@ -1,37 +1,5 @@
 import { createSlice, createAsyncThunk } from '@reduxjs/toolkit';
-import Cookies from 'js-cookie';
-
-// Helper function to retrieve the JWT CSRF token from its cookie
-const fetchCSRFToken = async () => {
-  // JWT's built-in CSRF cookie is now named 'jwt_csrf_access'
-  return Cookies.get('jwt_csrf_access');
-};
-
-// Helper function for fetch requests with credentials and CSRF token
-const fetchWithCredentials = async (url, options = {}) => {
-  const isModifyingRequest = ['POST', 'PUT', 'DELETE'].includes(options.method);
-
-  let csrfToken = '';
-
-  // For modifying requests, get the JWT CSRF token from the cookie
-  if (isModifyingRequest) {
-    csrfToken = await fetchCSRFToken();
-  }
-
-  console.log('CSRF Token Sent:', csrfToken); // Debugging
-
-  const response = await fetch(url, {
-    ...options,
-    credentials: 'include',
-    headers: {
-      'Content-Type': 'application/json',
-      'X-CSRF-TOKEN': csrfToken,
-      ...options.headers,
-    },
-  });
-
-  return response;
-};
+import { fetchCSRFToken, fetchWithCredentials } from './fetchWithCredentials';
 
 // 🔍 Fetch all events
 export const fetchEvents = createAsyncThunk(
@@ -254,6 +222,28 @@ export const denyEventInvite = createAsyncThunk(
   },
 );
 
+// 🔐 Accept or Deny Several Event Invitations in One Request (CSRF Protected)
+export const respondToEventInvites = createAsyncThunk(
+  'events/respondToEventInvites',
+  async ({ invitationIds, action }, thunkAPI) => {
+    try {
+      await fetchCSRFToken(); // Ensure CSRF token is refreshed
+
+      const response = await fetchWithCredentials('/api/event_invitations/bulk', {
+        method: 'PUT',
+        body: JSON.stringify({ invitation_ids: invitationIds, action }),
+      });
+
+      if (!response.ok) throw new Error(`Failed to ${action} event invitations`);
+
+      return await response.json(); // { ids, action }
+    } catch (error) {
+      console.error('Bulk event invitation update failed:', error.message);
+      return thunkAPI.rejectWithValue(error.message);
+    }
+  },
+);
+
 // Event slice
 const eventSlice = createSlice({
   name: 'events',
@@ -462,6 +452,26 @@ const eventSlice = createSlice({
         state.loading = false;
         state.error = action.payload || 'Failed to deny event invitation';
         state.operation = null;
+      })
+
+      // Accept or Deny Several Event Invitations
+      .addCase(respondToEventInvites.pending, (state) => {
+        state.loading = true;
+        state.error = null;
+        state.operation = 'respondingToInvites';
+      })
+      .addCase(respondToEventInvites.fulfilled, (state, action) => {
+        state.loading = false;
+        const handled = new Set(action.payload.ids);
+        state.invitations = state.invitations.filter(
+          (invite) => !handled.has(invite.id),
+        ); // Remove every handled invite
+        state.operation = null;
+      })
+      .addCase(respondToEventInvites.rejected, (state, action) => {
+        state.loading = false;
+        state.error = action.payload || 'Failed to update event invitations';
+        state.operation = null;
       });
   },
 });
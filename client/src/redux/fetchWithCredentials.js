@@ -0,0 +1,65 @@
+import Cookies from 'js-cookie';
+
+// Requests that authenticate by other means, so a 401 from them is final
+const NO_REFRESH = ['/api/login', '/api/register', '/api/token/refresh'];
+
+let refreshing = null;
+
+// Helper function to retrieve the JWT CSRF token from its cookie
+export const fetchCSRFToken = async () => {
+  // JWT's built-in CSRF cookie is now named 'jwt_csrf_access'
+  return Cookies.get('jwt_csrf_access');
+};
+
+// Exchange the refresh cookie for a new access token (and a rotated refresh token).
+// Concurrent callers share one request, so a burst of 401s rotates the token only once.
+export const requestTokenRefresh = () => {
+  if (!refreshing) {
+    refreshing = fetch('/api/token/refresh', {
+      method: 'POST',
+      credentials: 'include',
+      headers: {
+        'Content-Type': 'application/json',
+        'X-CSRF-TOKEN': Cookies.get('jwt_csrf_refresh') || '',
+      },
+    })
+      .then((response) => response.ok)
+      .catch(() => false)
+      .finally(() => {
+        refreshing = null;
+      });
+  }
+  return refreshing;
+};
+
+const send = async (url, options) => {
+  const isModifyingRequest = ['POST', 'PUT', 'DELETE'].includes(options.method);
+
+  let csrfToken = '';
+
+  // For modifying requests, get the JWT CSRF token from the cookie
+  if (isModifyingRequest) {
+    csrfToken = await fetchCSRFToken();
+  }
+
+  return fetch(url, {
+    ...options,
+    credentials: 'include',
+    headers: {
+      'Content-Type': 'application/json',
+      'X-CSRF-TOKEN': csrfToken,
+      ...options.headers,
+    },
+  });
+};
+
+// Fetch with credentials and the CSRF token. When the access token has expired
+// (a 401), it is renewed from the refresh cookie and the request is sent once more
+// with the new CSRF token; if the refresh fails, the original 401 is returned.
+export const fetchWithCredentials = async (url, options = {}) => {
+  const response = await send(url, options);
+  if (response.status !== 401 || NO_REFRESH.includes(url) || !(await requestTokenRefresh())) {
+    return response;
+  }
+  return send(url, options);
+};
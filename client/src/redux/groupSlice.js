@@ -1,37 +1,5 @@
 import { createSlice, createAsyncThunk } from '@reduxjs/toolkit';
-import Cookies from 'js-cookie';
-
-// Helper function to retrieve the JWT CSRF token from its cookie
-const fetchCSRFToken = async () => {
-  // JWT's built-in CSRF cookie is now named 'jwt_csrf_access'
-  return Cookies.get('jwt_csrf_access');
-};
-
-// Helper function for fetch requests with credentials and CSRF token
-const fetchWithCredentials = async (url, options = {}) => {
-  const isModifyingRequest = ['POST', 'PUT', 'DELETE'].includes(options.method);
-
-  let csrfToken = '';
-
-  // For modifying requests, get the JWT CSRF token from the cookie
-  if (isModifyingRequest) {
-    csrfToken = await fetchCSRFToken();
-  }
-
-  console.log('CSRF Token Sent:', csrfToken); // Debugging
-
-  const response = await fetch(url, {
-    ...options,
-    credentials: 'include',
-    headers: {
-      'Content-Type': 'application/json',
-      'X-CSRF-TOKEN': csrfToken,
-      ...options.headers,
-    },
-  });
-
-  return response;
-};
+import { fetchCSRFToken, fetchWithCredentials } from './fetchWithCredentials';
 
 // Thunks for group management
 export const fetchGroups = createAsyncThunk(
@@ -245,6 +213,25 @@ export const denyGroupInvite = createAsyncThunk(
   },
 );
 
+// 🔐 Accept or Deny Several Group Invitations in One Request (CSRF Protected)
+export const respondToGroupInvites = createAsyncThunk(
+  'groups/respondToGroupInvites',
+  async ({ invitationIds, action }, thunkAPI) => {
+    try {
+      const response = await fetchWithCredentials('/api/group_invitations/bulk', {
+        method: 'PUT',
+        body: JSON.stringify({ invitation_ids: invitationIds, action }),
+      });
+
+      if (!response.ok) throw new Error(`Failed to ${action} group invitations`);
+
+      return await response.json(); // { ids, action }
+    } catch (error) {
+      return thunkAPI.rejectWithValue(error.message);
+    }
+  },
+);
+
 // 🔐 Delete Group Invitation (CSRF Protected)
 export const deleteGroupInvite = createAsyncThunk(
   'groups/deleteGroupInvite',
@@ -438,6 +425,26 @@ const groupSlice = createSlice({
         state.inviteError = action.payload || 'Failed to deny group invitation';
         state.loading = false;
       })
+      .addCase(respondToGroupInvites.pending, (state) => {
+        state.inviteStatus = null;
+        state.inviteError = null;
+        state.loading = true;
+      })
+      .addCase(respondToGroupInvites.fulfilled, (state, action) => {
+        state.inviteStatus = 'success';
+        state.loading = false;
+        // Remove every handled invite by matching "id"
+        const handled = new Set(action.payload.ids);
+        state.invitations = state.invitations.filter(
+          (invitation) => !handled.has(invitation.id),
+        );
+      })
+      .addCase(respondToGroupInvites.rejected, (state, action) => {
+        state.inviteStatus = 'failed';
+        state.inviteError =
+          action.payload || 'Failed to update group invitations';
+        state.loading = false;
+      })
       .addCase(deleteGroupInvite.pending, (state) => {
         state.inviteStatus = null;
         state.inviteError = null;
@@ -1,37 +1,5 @@
 import { createSlice, createAsyncThunk } from '@reduxjs/toolkit';
-import Cookies from 'js-cookie';
-
-// Helper function to retrieve the JWT CSRF token from its cookie
-const fetchCSRFToken = async () => {
-  // JWT's built-in CSRF cookie is now named 'jwt_csrf_access'
-  return Cookies.get('jwt_csrf_access');
-};
-
-// Helper function for fetch requests with credentials and CSRF token
-const fetchWithCredentials = async (url, options = {}) => {
-  const isModifyingRequest = ['POST', 'PUT', 'DELETE'].includes(options.method);
-
-  let csrfToken = '';
-
-  // For modifying requests, get the JWT CSRF token from the cookie
-  if (isModifyingRequest) {
-    csrfToken = await fetchCSRFToken();
-  }
-
-  console.log('CSRF Token Sent:', csrfToken); // Debugging
-
-  const response = await fetch(url, {
-    ...options,
-    credentials: 'include',
-    headers: {
-      'Content-Type': 'application/json',
-      'X-CSRF-TOKEN': csrfToken,
-      ...options.headers,
-    },
-  });
-
-  return response;
-};
+import { fetchCSRFToken, fetchWithCredentials } from './fetchWithCredentials';
 
 // 🔐 Invite User to an Event (CSRF Protected)
 export const inviteUserToEvent = createAsyncThunk(
@@ -7,13 +7,45 @@ from flask_jwt_extended import (
     set_access_cookies,
     unset_jwt_cookies,
     create_refresh_token,
-    set_refresh_cookies
+    set_refresh_cookies,
+    get_jwt,
+    decode_token
 )
 #from flask_wtf.csrf import CSRFProtect, generate_csrf, validate_csrf  # No longer needed
 from flask_restful import Resource
-from models import User, Event, Group, RSVP, Comment, GroupInvitation, EventInvitation
+from sqlalchemy import select, insert, update, delete, literal, func, and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload, selectinload
+from models import User, Event, Group, RSVP, Comment, GroupInvitation, EventInvitation, RefreshToken, group_member
 from config import app, db, api
-from datetime import datetime
+from hashing import HashingBusy
+from pagination import page_args, keyset, paginate, pagination_headers
+from streaming import stream_format, stream_response
+from search import search, matching_ids
+from autocomplete import usernames, event_names
+from versioning import collection_version, make_etag, not_modified, etag_headers, touch
+from cache import CACHES, event_details, group_details
+import instrumentation  # noqa: F401  hooks SQL statistics into requests when SQL_INSTRUMENTATION is set
+import metrics
+import query_budget  # noqa: F401  fails requests over their query_budget when QUERY_BUDGETS is set
+import profiler  # noqa: F401  samples requests when PROFILE_SAMPLE_RATE or PROFILE_TOKEN is set
+from slow_queries import slow_queries
+from serializers import (
+    serialize_event,
+    serialize_invited_event,
+    serialize_user,
+    serialize_member,
+    serialize_group,
+    serialize_profile_group,
+    serialize_invited_group,
+    serialize_group_inviter,
+    serialize_rsvp,
+    serialize_comment,
+    serialize_event_comment
+)
+from datetime import datetime, timezone
+from uuid import uuid4
 import json
 
 # Initialize JWT Manager
@@ -60,15 +92,38 @@ def unset_jwt():
     unset_jwt_cookies(resp)
     return resp
 
+def utcnow():
+    """
+    Current UTC time as a naive datetime, matching how DateTime columns are stored.
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def issue_tokens(response, user_id, family=None):
+    """
+    Generate access and refresh tokens, record the refresh token in its family and set both as cookies.
+    A new family is started unless one is given. The caller commits the session.
+    """
+    # Both tokens name the family, so logging out with the access token can revoke it
+    family = family or str(uuid4())
+    access_token = create_access_token(identity=str(user_id), additional_claims={"fam": family})
+    refresh_token = create_refresh_token(identity=str(user_id), additional_claims={"fam": family})
+    claims = decode_token(refresh_token)
+    db.session.add(RefreshToken(
+        jti=claims['jti'],
+        family=claims['fam'],
+        user_id=user_id,
+        expires_at=datetime.fromtimestamp(claims['exp'], timezone.utc).replace(tzinfo=None)
+    ))
+    set_access_cookies(response, access_token)
+    set_refresh_cookies(response, refresh_token)
+    return response
+
 def assign_access_refresh_tokens(user_id, url):
     """
     Generate access and refresh tokens, set them as cookies, and redirect to a specified URL.
     """
-    access_token = create_access_token(identity=str(user_id))
-    refresh_token = create_refresh_token(identity=str(user_id))
-    resp = make_response(redirect(url, 302))
-    set_access_cookies(resp, access_token)
-    set_refresh_cookies(resp, refresh_token)
+    resp = issue_tokens(make_response(redirect(url, 302)), user_id)
+    db.session.commit()
     return resp
 
 @app.route('/')
@@ -78,8 +133,23 @@ def serve_index():
     """
     return app.send_static_file('index.html')
 
+# 📈 Prometheus Metrics Summed Over Every Worker (Bearer Token or Localhost Only)
+@app.route('/metrics')
+def prometheus_metrics():
+    """
+    Request latency, status codes, connection pool, bcrypt queue and detail cache metrics.
+    """
+    if not app.config['METRICS_ENABLED']:
+        return {"message": "Not found"}, 404
+    if not metrics.authorized():
+        return {"message": "Forbidden"}, 403
+    return metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE}
+
 # 🔐 Register Resource (CSRF Protected via JWT CSRF)
 class Register(Resource):
+    # Statements one request may issue when QUERY_BUDGETS is set (see query_budget.py)
+    query_budget = {'post': 7}
+
     def post(self):
         try:
             data = request.get_json()
@@ -95,21 +165,23 @@ class Register(Resource):
             db.session.add(new_user)
             db.session.commit()
 
-            access_token = create_access_token(identity=str(new_user.id))
-            refresh_token = create_refresh_token(identity=str(new_user.id))
-
-            response = make_response({"message": "User registered successfully"})
-            set_access_cookies(response, access_token)
-            set_refresh_cookies(response, refresh_token)
+            response = issue_tokens(make_response({"message": "User registered successfully"}), new_user.id)
+            db.session.commit()
 
             response.status_code = 201
             return response
+        except HashingBusy as e:
+            db.session.rollback()
+            return {"message": e.description}, 503, {"Retry-After": "1"}
         except Exception as e:
             app.logger.error(f"Unexpected error: {e}")
             return {"message": "An internal server error occurred"}, 500
 
 # 🔐 Login Resource (CSRF Protected via JWT CSRF)
 class Login(Resource):
+    # One more statement when the stored hash is moved to the current work factor
+    query_budget = {'post': 3}
+
     def post(self):
         try:
             data = request.get_json()
@@ -120,48 +192,119 @@ class Login(Resource):
             user = User.query.filter_by(email=data['email']).first()
             if user is None or not user.check_password(data['password']):
                 return {"message": "Invalid email or password"}, 401
+            user_id = user.id  # Read before a commit expires the user
 
-            access_token = create_access_token(identity=str(user.id))
-            refresh_token = create_refresh_token(identity=str(user.id))
+            # Transparently move the stored hash to the current work factor
+            try:
+                if user.upgrade_password_hash(data['password']):
+                    db.session.commit()
+            except (ValueError, HashingBusy):
+                pass  # Passwords that predate the current rules keep their old hash, as do logins under load
 
-            response = make_response({
-                "user": {"id": user.id},
+            response = issue_tokens(make_response({
+                "user": {"id": user_id},
                 "message": "Login successful",
-            })
-            set_access_cookies(response, access_token)
-            set_refresh_cookies(response, refresh_token)
+            }), user_id)
+            db.session.commit()
 
             response.status_code = 200
             return response
+        except HashingBusy as e:
+            return {"message": e.description}, 503, {"Retry-After": "1"}
         except Exception as e:
             app.logger.error(f"Unexpected error during login: {e}")
             return {"message": "An internal server error occurred"}, 500
 
+# 🔐 Refresh Tokens (CSRF Protected via JWT CSRF)
+class TokenRefresh(Resource):
+    query_budget = {'post': 4}
+
+    @jwt_required(refresh=True)
+    def post(self):
+        """
+        Rotate the refresh token and issue a new access token. A rotated token that
+        is presented again outside the grace period revokes its whole family.
+        """
+        claims = get_jwt()
+        token = RefreshToken.query.filter_by(jti=claims['jti']).first()
+        now = utcnow()
+
+        if token is None:
+            response = make_response({"message": "Invalid refresh token"}, 401)
+            unset_jwt_cookies(response)
+            return response
+
+        if token.revoked_at is not None:
+            family_live = RefreshToken.query.filter_by(family=token.family, revoked_at=None).first()
+            if family_live and now - token.revoked_at <= app.config['JWT_REFRESH_REUSE_GRACE']:
+                # Another tab rotated this token moments ago; it already holds the new refresh cookie
+                response = make_response({"message": "Token refreshed"}, 200)
+                set_access_cookies(response, create_access_token(identity=str(token.user_id), additional_claims={"fam": token.family}))
+                return response
+
+            app.logger.warning(f"Refresh token reuse detected for user {token.user_id}, revoking family {token.family}")
+            RefreshToken.query.filter_by(family=token.family, revoked_at=None).update({"revoked_at": now})
+            db.session.commit()
+            response = make_response({"message": "Refresh token reuse detected"}, 401)
+            unset_jwt_cookies(response)
+            return response
+
+        token.revoked_at = now
+        RefreshToken.query.filter(RefreshToken.user_id == token.user_id, RefreshToken.expires_at < now).delete()
+        response = issue_tokens(make_response({"message": "Token refreshed"}, 200), token.user_id, family=token.family)
+        db.session.commit()
+        return response
+
 # 🔐 Logout Resource
 class Logout(Resource):
+    query_budget = {'post': 1}
+
     @jwt_required()
     def post(self):
+        """
+        Revoke the refresh tokens of this login, so a copied refresh cookie stops
+        working, and clear the cookies. Access tokens issued before they named
+        their family revoke every refresh token of the user instead.
+        """
+        claims = get_jwt()
+        tokens = RefreshToken.query.filter_by(revoked_at=None)
+        if 'fam' in claims:
+            tokens = tokens.filter_by(family=claims['fam'])
+        else:
+            tokens = tokens.filter_by(user_id=int(get_jwt_identity()))
+        tokens.update({"revoked_at": utcnow()})
+        db.session.commit()
         return unset_jwt()
 
 # 🔍 User List (No CSRF Required, Read-Only)
 class UserList(Resource):
+    # Serialized users expose no relationships, so nothing needs to be eager-loaded
+    load_plan = ()
+    page_key = (User.id,)
+    query_budget = {'get': 1}
+
     def get(self):
-        limit = request.args.get('limit', 30)
+        limit, after = page_args(self.page_key)
         query = request.args.get('q', '')
 
+        users = User.query.options(*self.load_plan)
         if query:
-            users = User.query.filter(User.username.ilike(f"%{query}%")).limit(limit).all()
-        else:
-            users = User.query.limit(limit).all()
+            users = users.filter(User.id.in_(matching_ids('user', query)))
+        stream = stream_format()
+        if stream:
+            return stream_response(keyset(users, self.page_key, after), serialize_user, stream)
+        users, next_cursor = paginate(users, self.page_key, after, limit)
 
         serialized_users = [
-            user.to_dict(rules=('-events', '-rsvps', '-groups', '-sent_event_invitations', '-received_event_invitations'))
+            serialize_user(user)
             for user in users
         ]
-        return serialized_users, 200
+        return serialized_users, 200, pagination_headers(next_cursor)
 
 # 🔍 User Profile (No CSRF Required, Read-Only)
 class UserProfile(Resource):
+    query_budget = {'get': 6}
+
     @jwt_required()
     def get(self, user_id=None):
         if user_id:
@@ -170,11 +313,55 @@ class UserProfile(Resource):
             current_user_id = int(get_jwt_identity())
             user = User.query.get_or_404(current_user_id)
 
+        # Owned events plus events whose invitation was accepted, each joined to
+        # this user's RSVP, in one set-based query
+        accepted_event_ids = select(EventInvitation.event_id).where(
+            EventInvitation.invitee_id == user.id, EventInvitation.status == "Accepted"
+        )
+        profile_events = or_(Event.user_id == user.id, Event.id.in_(accepted_event_ids))
+
+        # Child writes bump their parent's updated_at, so counts plus the newest stamp
+        # change whenever anything in the profile does
+        event_stamp = db.session.execute(
+            select(func.count(Event.id), func.max(Event.updated_at)).where(profile_events)
+        ).one()
+        group_stamp = db.session.execute(
+            select(func.count(Group.id), func.max(Group.updated_at))
+            .join(group_member, group_member.c.group_id == Group.id)
+            .where(group_member.c.user_id == user.id)
+        ).one()
+        etag = make_etag('profile', user.id, *event_stamp, *group_stamp)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        events = db.session.execute(
+            select(
+                Event.id,
+                Event.name,
+                Event.date,
+                Event.location,
+                Event.description,
+                func.coalesce(RSVP.status, "Needs RSVP").label("rsvp_status")
+            )
+            .outerjoin(RSVP, and_(RSVP.event_id == Event.id, RSVP.user_id == user.id))
+            .where(profile_events)
+            .order_by(Event.date, Event.id)
+        ).all()
+
+        groups = (
+            Group.query.options(selectinload(Group.invitations))
+            .join(group_member, group_member.c.group_id == Group.id)
+            .filter(group_member.c.user_id == user.id)
+            .order_by(Group.id)
+            .all()
+        )
+
         return {
             "id": user.id,
             "username": user.username,
             "email": user.email,
-            "groups": [group.to_dict(rules=('-members',)) for group in user.groups],
+            "groups": [serialize_profile_group(group) for group in groups],
             "events": [
                 {
                     "id": event.id,
@@ -182,24 +369,24 @@ class UserProfile(Resource):
                     "date": event.date.strftime('%Y-%m-%d'),
                     "location": event.location,
                     "description": event.description,
-                    "rsvp_status": next(
-                        (rsvp.status for rsvp in user.rsvps if rsvp.event_id == event.id),
-                        "Needs RSVP"
-                    )
+                    "rsvp_status": event.rsvp_status
                 }
-                for event in user.events + [
-                    invitation.event for invitation in user.received_event_invitations
-                    if invitation.status == "Accepted"
-                ]
+                for event in events
             ]
-        }, 200
+        }, 200, etag_headers(etag)
 
 # 🔐 Delete Profile (CSRF Protected via JWT CSRF)
 class DeleteProfile(Resource):
+    # A user with a row of every kind, owned events and groups included: each cascade is one
+    # statement per table, plus the version bumps
+    query_budget = {'delete': 30}
+
     @jwt_required()
     def delete(self):
         current_user_id = int(get_jwt_identity())
-        user = User.query.get_or_404(current_user_id)
+        user = User.query.options(
+            selectinload(User.events).options(*EventDetail.cascade_plan)
+        ).filter_by(id=current_user_id).first_or_404()
         try:
             db.session.delete(user)
             db.session.commit()
@@ -212,20 +399,43 @@ class DeleteProfile(Resource):
 
 # 🔍 Event List (GET) and Create Event (POST, CSRF Protected via JWT CSRF)
 class EventList(Resource):
+    # Mirrors the relationships emitted by the serialization rules below, so a page
+    # costs a constant number of queries regardless of its size
+    load_plan = (
+        joinedload(Event.user),
+        selectinload(Event.comments).joinedload(Comment.user),
+        selectinload(Event.rsvps).joinedload(RSVP.user),
+        selectinload(Event.invited_users),
+        selectinload(Event.invitations),
+    )
+    page_key = (Event.date, Event.id)
+    query_budget = {'get': 6, 'post': 11}
+
     def get(self):
-        limit = request.args.get('limit', 30, type=int)
+        limit, after = page_args(self.page_key)
         query = request.args.get('q', '')
+        stream = stream_format()
+        etag = make_etag('events', collection_version('events'), request.full_path, stream)
+        cached = not_modified(etag)
+        if cached:
+            cached.headers['Vary'] = 'Accept'
+            return cached
         try:
+            events = Event.query.options(*self.load_plan)
             if query:
-                events = Event.query.filter(Event.name.ilike(f"%{query}%")).limit(limit).all()
-            else:
-                events = Event.query.limit(limit).all()
+                events = events.filter(Event.id.in_(matching_ids('event', query)))
+            if stream:
+                return stream_response(
+                    keyset(events, self.page_key, after), serialize_event, stream,
+                    {**etag_headers(etag), 'Vary': 'Accept'}
+                )
+            events, next_cursor = paginate(events, self.page_key, after, limit)
 
             serialized_events = [
-                event.to_dict(rules=('-user.events', '-rsvps.event', '-comments.event', '-invitations.event'))
+                serialize_event(event)
                 for event in events
             ]
-            return serialized_events, 200
+            return serialized_events, 200, {**pagination_headers(next_cursor), **etag_headers(etag), 'Vary': 'Accept'}
         except Exception as e:
             return {"message": "Failed to fetch events", "details": str(e)}, 500
 
@@ -252,14 +462,22 @@ class EventList(Resource):
         db.session.add(new_event)
         db.session.commit()
 
-        serialized_event = new_event.to_dict(
-            rules=('-user.events', '-rsvps.event', '-comments.event', '-invitations.event')
-        )
+        serialized_event = serialize_event(EventDetail.with_relationships(new_event.id).one())
         return {"message": "Event created successfully", "event": serialized_event}, 201
 
 
 # 🔍 Event Detail Resource
 class EventDetail(Resource):
+    # Deleting an event cascades to these collections; loading them up front replaces a lazy load each
+    cascade_plan = (
+        selectinload(Event.comments),
+        selectinload(Event.rsvps),
+        selectinload(Event.invitations),
+        selectinload(Event.invited_users),
+    )
+    # An event with a row of every kind: one statement per cascaded table, plus the version bumps
+    query_budget = {'get': 6, 'put': 11, 'delete': 14}
+
     @jwt_required()
     def get(self, event_id):
         try:
@@ -267,20 +485,54 @@ class EventDetail(Resource):
         except ValueError:
             return {"message": "Invalid user ID in JWT"}, 400
 
-        event = Event.query.get_or_404(event_id)
-        rsvps = RSVP.query.filter_by(event_id=event_id).all()
+        entry = event_details.get(event_id)
+        if entry is None:
+            generation = event_details.generation(event_id)
+            updated_at = db.session.query(Event.updated_at).filter_by(id=event_id).scalar()
+            if updated_at is None:
+                return {"message": "Event not found"}, 404
+            entry = (updated_at.isoformat(), None)
+        stamp, payload = entry
+
+        # is_user_invited depends on the caller, so the ETag does too
+        etag = make_etag('event', event_id, stamp, current_user_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        if payload is None:
+            payload = self.load(event_id)
+            event_details.set(event_id, stamp, payload, generation)
+
+        event_data = dict(payload)
+        event_data['is_user_invited'] = any(rsvp['user_id'] == current_user_id for rsvp in payload['rsvps'])
+        return event_data, 200, etag_headers(etag)
+
+    @staticmethod
+    def with_relationships(event_id):
+        """
+        The event with everything serialize_event emits eagerly loaded, so serializing
+        it costs the same few queries however many RSVPs and comments it has.
+        """
+        return Event.query.options(*EventList.load_plan).filter_by(id=event_id)
+
+    @staticmethod
+    def load(event_id):
+        """
+        The caller-independent part of the payload, as stored in the detail cache.
+        """
+        event = EventDetail.with_relationships(event_id).first_or_404()
 
-        event_data = event.to_dict(rules=('-user.events', '-rsvps.event', '-comments.event', '-invitations.event'))
+        event_data = serialize_event(event)
         event_data['rsvps'] = [
             {
                 'user_id': rsvp.user.id,
                 'username': rsvp.user.username,
                 'status': rsvp.status
             }
-            for rsvp in rsvps
+            for rsvp in event.rsvps
         ]
-        event_data['is_user_invited'] = any(rsvp.user_id == current_user_id for rsvp in rsvps)
-        return event_data, 200
+        return event_data
 
     @jwt_required()
     def put(self, event_id):
@@ -306,7 +558,8 @@ class EventDetail(Resource):
         event.description = data.get('description', event.description)
 
         db.session.commit()
-        return {"message": "Event updated successfully", "event": event.to_dict(rules=('-user.events', '-rsvps.event', '-comments.event', '-invitations.event'))}, 200
+        event = self.with_relationships(event_id).one()
+        return {"message": "Event updated successfully", "event": serialize_event(event)}, 200
 
     @jwt_required()
     def delete(self, event_id):
@@ -315,22 +568,27 @@ class EventDetail(Resource):
         except ValueError:
             return {"message": "Invalid user ID in JWT"}, 400
 
-        event = Event.query.get_or_404(event_id)
-
-        if event.user_id != current_user_id:
+        owner = Event.query.with_entities(Event.user_id).filter_by(id=event_id).first_or_404()
+        if owner.user_id != current_user_id:
             return {"message": "You do not have permission to delete this event"}, 403
 
-        db.session.delete(event)
+        db.session.delete(Event.query.options(*self.cascade_plan).filter_by(id=event_id).one())
         db.session.commit()
         return {"message": "Event deleted successfully"}, 200
 
 # 🔐 Event Invitation Resource (CSRF Protected via JWT CSRF)
 class EventInvite(Resource):
+    max_batch = 500
+    query_budget = {'post': 12}
+
     @jwt_required()
     def post(self, event_id):
         current_user_id = int(get_jwt_identity())
         data = request.get_json()
 
+        if "invited_user_ids" in data:
+            return self.invite_many(event_id, current_user_id, data['invited_user_ids'])
+
         if "invited_user_id" not in data:
             return {"message": "Missing invited_user_id"}, 400
 
@@ -357,8 +615,8 @@ class EventInvite(Resource):
         db.session.add(new_invitation)
         db.session.commit()
 
-        event_data = event.to_dict(rules=('-user.events', '-rsvps.event', '-comments.event', '-invitations.event'))
-        invited_user_data = invited_user.to_dict(rules=('-events', '-groups', '-rsvps', '-sent_event_invitations', '-received_event_invitations'))
+        event_data = serialize_event(EventDetail.with_relationships(event_id).one())
+        invited_user_data = serialize_user(invited_user)
 
         return {
             "message": "User invited successfully",
@@ -370,8 +628,172 @@ class EventInvite(Resource):
             }
         }, 201
 
+    def invite_many(self, event_id, current_user_id, user_ids):
+        """
+        Invite a list of users with a fixed number of queries: one to validate the
+        ids, one to find existing invitations and one multi-row insert.
+        """
+        if not isinstance(user_ids, list) or not user_ids:
+            return {"message": "invited_user_ids must be a non-empty list"}, 400
+        if len(user_ids) > self.max_batch:
+            return {"message": f"Cannot invite more than {self.max_batch} users at once"}, 400
+
+        event = Event.query.get_or_404(event_id)
+        if event.user_id != current_user_id:
+            return {"message": "You do not have permission to invite users to this event"}, 403
+
+        valid = [user_id for user_id in user_ids if isinstance(user_id, int) and not isinstance(user_id, bool)]
+        requested = list(dict.fromkeys(valid))
+        existing_users = set(db.session.scalars(select(User.id).where(User.id.in_(requested))))
+        already_invited = set(db.session.scalars(
+            select(EventInvitation.invitee_id).where(
+                EventInvitation.event_id == event.id, EventInvitation.invitee_id.in_(existing_users)
+            )
+        ))
+
+        to_invite = [
+            user_id for user_id in requested
+            if user_id in existing_users and user_id not in already_invited and user_id != event.user_id
+        ]
+        created = {}
+        if to_invite:
+            try:
+                rows = db.session.execute(
+                    insert(EventInvitation).returning(EventInvitation.id, EventInvitation.invitee_id),
+                    [
+                        {"event_id": event.id, "inviter_id": current_user_id, "invitee_id": user_id, "status": "Pending"}
+                        for user_id in to_invite
+                    ]
+                )
+                created = {row.invitee_id: row.id for row in rows}
+                touch(db.session, events=[event.id])
+                db.session.commit()
+            except IntegrityError:
+                # Another request invited one of these users in the meantime
+                db.session.rollback()
+                return {"message": "Invitations changed concurrently, please retry"}, 409
+
+        results, seen = [], set()
+        for user_id in user_ids:
+            if not isinstance(user_id, int) or isinstance(user_id, bool):
+                results.append({"user_id": user_id, "status": "invalid"})
+                continue
+            if user_id in seen:
+                results.append({"user_id": user_id, "status": "duplicate"})
+            elif user_id in created:
+                results.append({"user_id": user_id, "status": "invited", "invitation_id": created[user_id]})
+            elif user_id in already_invited:
+                results.append({"user_id": user_id, "status": "already_invited"})
+            elif user_id == event.user_id:
+                results.append({"user_id": user_id, "status": "self"})
+            else:
+                results.append({"user_id": user_id, "status": "not_found"})
+            seen.add(user_id)
+
+        return {
+            "message": f"Invited {len(created)} user(s)",
+            "invited": len(created),
+            "results": results
+        }, 201 if created else 200
+
+# 🔐 Invite Every Member of a Group to an Event (CSRF Protected via JWT CSRF)
+class EventInviteGroup(Resource):
+    query_budget = {'post': 7}
+
+    @jwt_required()
+    def post(self, event_id):
+        """
+        Invite all current members of a group in one INSERT ... SELECT, skipping the
+        event owner and anyone already invited, whatever the size of the group.
+        Only the group's owner and members may invite it, so a group's membership
+        cannot be enumerated by anyone who owns an event.
+        """
+        current_user_id = int(get_jwt_identity())
+        data = request.get_json()
+
+        if "group_id" not in data:
+            return {"message": "Missing group_id"}, 400
+
+        event = Event.query.get_or_404(event_id)
+        if event.user_id != current_user_id:
+            return {"message": "You do not have permission to invite users to this event"}, 403
+
+        group = Group.query.get_or_404(data['group_id'])
+        group_name = group.name
+
+        is_member = group.user_id == current_user_id or db.session.query(group_member).filter_by(
+            group_id=group.id, user_id=current_user_id
+        ).first()
+        if not is_member:
+            return {"message": "You must be a member of this group to invite its members"}, 403
+
+        members = db.session.scalar(
+            select(func.count()).select_from(group_member).where(group_member.c.group_id == group.id)
+        )
+        already_invited = select(EventInvitation.id).where(
+            EventInvitation.event_id == event.id,
+            EventInvitation.invitee_id == group_member.c.user_id
+        ).exists()
+        now = datetime.now(timezone.utc)
+        new_invitations = select(
+            literal(event.id),
+            literal(current_user_id),
+            group_member.c.user_id,
+            literal("Pending"),
+            literal(now),
+            literal(now)
+        ).where(
+            group_member.c.group_id == group.id,
+            group_member.c.user_id != event.user_id,
+            ~already_invited
+        )
+
+        try:
+            result = db.session.execute(
+                insert(EventInvitation).from_select(
+                    ['event_id', 'inviter_id', 'invitee_id', 'status', 'created_at', 'updated_at'],
+                    new_invitations
+                )
+            )
+            created = result.rowcount
+            if created:
+                touch(db.session, events=[event.id])
+            db.session.commit()
+        except IntegrityError:
+            # A member was invited individually while this statement ran
+            db.session.rollback()
+            return {"message": "Invitations changed concurrently, please retry"}, 409
+
+        return {
+            "message": f"Invited {created} member(s) of {group_name}",
+            "created": created,
+            "skipped": members - created
+        }, 201 if created else 200
+
 # 🔍 Event Invitations List (CSRF Protected for Deleting) / Read-Only for Getting
 class EventInvitations(Resource):
+    # The invited event is serialized with its owner, comments, RSVPs and invitees
+    load_plan = (
+        joinedload(EventInvitation.event).options(
+            joinedload(Event.user),
+            selectinload(Event.comments).joinedload(Comment.user),
+            selectinload(Event.rsvps).joinedload(RSVP.user),
+            selectinload(Event.invited_users),
+        ),
+        joinedload(EventInvitation.inviter),
+    )
+    page_key = (EventInvitation.id,)
+    query_budget = {'get': 4, 'delete': 4}
+
+    @staticmethod
+    def serialize(invite):
+        return {
+            'id': invite.id,
+            'event': serialize_invited_event(invite.event) if invite.event else None,
+            'inviter': serialize_user(invite.inviter) if invite.inviter else None,
+            'status': invite.status
+        }
+
     @jwt_required()
     def get(self):
         try:
@@ -379,21 +801,18 @@ class EventInvitations(Resource):
         except ValueError:
             return {"message": "Invalid user ID in JWT"}, 400
 
+        limit, after = page_args(self.page_key)
         try:
-            invitations = EventInvitation.query.filter_by(invitee_id=current_user_id, status='Pending').all()
-            serialized_invitations = []
-            for invite in invitations:
-                event_data = invite.event.to_dict(rules=('-invitations', '-rsvps.event', '-comments.event')) if invite.event else None
-                inviter_data = invite.inviter.to_dict(rules=('-events', '-groups', '-sent_event_invitations', '-received_event_invitations')) if invite.inviter else None
-
-                serialized_invitations.append({
-                    'id': invite.id,
-                    'event': event_data,
-                    'inviter': inviter_data,
-                    'status': invite.status
-                })
-
-            return serialized_invitations, 200
+            invitations = EventInvitation.query.options(*self.load_plan).filter_by(
+                invitee_id=current_user_id, status='Pending'
+            )
+            stream = stream_format()
+            if stream:
+                return stream_response(keyset(invitations, self.page_key, after), self.serialize, stream)
+            invitations, next_cursor = paginate(invitations, self.page_key, after, limit)
+            serialized_invitations = [self.serialize(invite) for invite in invitations]
+
+            return serialized_invitations, 200, pagination_headers(next_cursor)
         except Exception as e:
             print(f"Error fetching event invitations: {e}")
             return {"message": "Failed to fetch event invitations", "details": str(e)}, 500
@@ -422,29 +841,41 @@ class EventInvitations(Resource):
 
 # 🔍 Fetch All Invitations for a Specific Event (No CSRF Required, Read-Only)
 class EventInvitationsForEvent(Resource):
+    load_plan = (joinedload(EventInvitation.invitee),)
+    page_key = (EventInvitation.id,)
+    query_budget = {'get': 2}
+
+    @staticmethod
+    def serialize(invite):
+        return {
+            "id": invite.id,
+            "invitee": {
+                "id": invite.invitee.id,
+                "username": invite.invitee.username,
+            },
+            "status": invite.status,
+        }
+
     @jwt_required()
     def get(self, event_id):
+        limit, after = page_args(self.page_key)
         try:
             event = Event.query.get_or_404(event_id)
-            invitations = EventInvitation.query.filter_by(event_id=event_id).all()
-            serialized_invitations = [
-                {
-                    "id": invite.id,
-                    "invitee": {
-                        "id": invite.invitee.id,
-                        "username": invite.invitee.username,
-                    },
-                    "status": invite.status,
-                }
-                for invite in invitations
-            ]
-            return serialized_invitations, 200
+            invitations = EventInvitation.query.options(*self.load_plan).filter_by(event_id=event_id)
+            stream = stream_format()
+            if stream:
+                return stream_response(keyset(invitations, self.page_key, after), self.serialize, stream)
+            invitations, next_cursor = paginate(invitations, self.page_key, after, limit)
+            serialized_invitations = [self.serialize(invite) for invite in invitations]
+            return serialized_invitations, 200, pagination_headers(next_cursor)
         except Exception as e:
             print(f"Error fetching invitations for event {event_id}: {e}")
             return {"message": "Failed to fetch invitations", "details": str(e)}, 500
 
 # 🔍 Fetch Invitation By Criteria (No CSRF Required, Read-Only)
 class EventInvitationByCriteria(Resource):
+    query_budget = {'get': 1}
+
     @jwt_required()
     def get(self):
         try:
@@ -465,6 +896,8 @@ class EventInvitationByCriteria(Resource):
 
 # 🔐 Deny Event Invitation (CSRF Protected via JWT CSRF)
 class DenyEventInvitation(Resource):
+    query_budget = {'put': 4}
+
     @jwt_required()
     def put(self, invitation_id):
         try:
@@ -483,6 +916,8 @@ class DenyEventInvitation(Resource):
 
 # 🔐 Accept Event Invitation (CSRF Protected via JWT CSRF)
 class AcceptEventInvitation(Resource):
+    query_budget = {'put': 4}
+
     @jwt_required()
     def put(self, invitation_id):
         try:
@@ -501,20 +936,31 @@ class AcceptEventInvitation(Resource):
 
 # 🔍 Fetch All Groups (No CSRF Required, Read-Only) / 🔐 Create a Group (CSRF Protected)
 class GroupList(Resource):
+    # Members and invitations are the only relationships the serialization rules emit
+    load_plan = (
+        selectinload(Group.members),
+        selectinload(Group.invitations),
+    )
+    page_key = (Group.id,)
+    query_budget = {'get': 3, 'post': 8}
+
     def get(self):
         """
-        Retrieve a list of groups with optional search.
+        Retrieve a page of groups with optional search.
         """
-        limit = request.args.get('limit', 30, type=int)
+        limit, after = page_args(self.page_key)
         query = request.args.get('q', '')
 
+        groups = Group.query.options(*self.load_plan)
         if query:
-            groups = Group.query.filter(Group.name.ilike(f"%{query}%")).limit(limit).all()
-        else:
-            groups = Group.query.limit(limit).all()
+            groups = groups.filter(Group.id.in_(matching_ids('group', query)))
+        stream = stream_format()
+        if stream:
+            return stream_response(keyset(groups, self.page_key, after), serialize_group, stream)
+        groups, next_cursor = paginate(groups, self.page_key, after, limit)
 
         # Serialize groups with restricted fields to avoid recursion
-        return [group.to_dict(rules=('-members.groups', '-invitations.group', '-members.rsvps', '-members.comments')) for group in groups], 200
+        return [serialize_group(group) for group in groups], 200, pagination_headers(next_cursor)
 
     @jwt_required()
     def post(self):
@@ -527,18 +973,16 @@ class GroupList(Resource):
         if not all(k in data for k in ("name", "description")):
             return {"message": "Missing required fields"}, 400
 
+        # Add the creator as a member of the group; set on the new object, the
+        # collection starts empty instead of being loaded
+        creator = User.query.get_or_404(current_user_id)
         new_group = Group(
             name=data['name'],
             description=data['description'],
-            user_id=current_user_id
+            user_id=current_user_id,
+            members=[creator]
         )
         db.session.add(new_group)
-        db.session.flush()  # Get the group's ID before committing
-
-        # Add the creator as a member of the group
-        creator = User.query.get_or_404(current_user_id)
-        new_group.members.append(creator)
-
         db.session.commit()
 
         return {
@@ -549,11 +993,39 @@ class GroupList(Resource):
 
 # 🔍 Fetch Group Details (No CSRF Required, Read-Only) / 🔐 Delete Group (CSRF Protected)
 class GroupDetail(Resource):
+    # Members are the only relationship the payload includes
+    load_plan = (selectinload(Group.members),)
+    query_budget = {'get': 3, 'delete': 7}
+
     def get(self, group_id):
         """
         Retrieve details of a specific group.
         """
-        group = Group.query.get_or_404(group_id)
+        entry = group_details.get(group_id)
+        if entry is None:
+            generation = group_details.generation(group_id)
+            updated_at = db.session.query(Group.updated_at).filter_by(id=group_id).scalar()
+            if updated_at is None:
+                return {"message": "Group not found"}, 404
+            entry = (updated_at.isoformat(), None)
+        stamp, payload = entry
+
+        etag = make_etag('group', group_id, stamp)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        if payload is None:
+            payload = self.load(group_id)
+            group_details.set(group_id, stamp, payload, generation)
+        return payload, 200, etag_headers(etag)
+
+    @staticmethod
+    def load(group_id):
+        """
+        The group payload, as stored in the detail cache.
+        """
+        group = Group.query.options(*GroupDetail.load_plan).filter_by(id=group_id).first_or_404()
 
         # Serialize group and its members with restricted fields to avoid recursion
         group_data = {
@@ -562,11 +1034,11 @@ class GroupDetail(Resource):
             'description': group.description,
             'user_id': group.user_id,
             'members': [
-                user.to_dict(rules=('-groups', '-rsvps', '-comments', '-sent_event_invitations', '-received_event_invitations'))
+                serialize_member(user)
                 for user in group.members
             ]
         }
-        return group_data, 200
+        return group_data
 
     @jwt_required()
     def delete(self, group_id):
@@ -578,7 +1050,8 @@ class GroupDetail(Resource):
         except ValueError:
             return {"message": "Invalid user ID in JWT"}, 400
 
-        group = Group.query.get_or_404(group_id)
+        # Deleting the group removes its memberships, so load them up front
+        group = Group.query.options(*self.load_plan).filter_by(id=group_id).first_or_404()
 
         # Ensure only the group owner can delete it
         if group.user_id != current_user_id:
@@ -591,6 +1064,14 @@ class GroupDetail(Resource):
 
 # 🔐 Invite User to Group (CSRF Protected via JWT CSRF)
 class GroupInvite(Resource):
+    # The new invitation is returned with the group, its members, the inviter and the invitee
+    load_plan = (
+        joinedload(GroupInvitation.group).selectinload(Group.members),
+        joinedload(GroupInvitation.inviter),
+        joinedload(GroupInvitation.invitee),
+    )
+    query_budget = {'post': 10}
+
     @jwt_required()
     def post(self, group_id):
         """
@@ -613,8 +1094,9 @@ class GroupInvite(Resource):
 
         invited_user = User.query.get_or_404(data['invited_user_id'])
 
-        # Check if the user is already a group member
-        if invited_user in group.members:
+        # Check if the user is already a group member, without loading every member
+        is_member = db.session.query(group_member).filter_by(group_id=group.id, user_id=invited_user.id).first()
+        if is_member:
             return {"message": "User is already a group member"}, 400
 
         # Check if the user is already invited
@@ -635,30 +1117,48 @@ class GroupInvite(Resource):
         db.session.commit()
 
         # Serialize the invitation data
+        new_invitation = GroupInvitation.query.options(*self.load_plan).filter_by(id=new_invitation.id).one()
         invitation_data = new_invitation.to_dict(rules=('-group.invitations', '-inviter.sent_group_invitations', '-invitee.received_group_invitations'))
         return {"message": "Group invitation sent successfully", "invitation": invitation_data}, 201
 
 
 # 🔍 Fetch Group Invitations (No CSRF Required, Read-Only) / 🔐 Cancel Group Invitation (CSRF Protected via JWT CSRF)
 class GroupInvitations(Resource):
+    # The invited group is serialized with its members
+    load_plan = (
+        joinedload(GroupInvitation.group).selectinload(Group.members),
+        joinedload(GroupInvitation.inviter),
+    )
+    page_key = (GroupInvitation.id,)
+    query_budget = {'get': 2, 'delete': 4}
+
+    @staticmethod
+    def serialize(invite):
+        # Restricted fields prevent recursion
+        return {
+            'id': invite.id,
+            'group': serialize_invited_group(invite.group),
+            'inviter': serialize_group_inviter(invite.inviter)
+        }
+
     @jwt_required()
     def get(self):
         """
-        Retrieve pending group invitations for the current user.
+        Retrieve a page of pending group invitations for the current user,
+        or all of them from the cursor on as a stream (see stream_format).
         """
         current_user_id = int(get_jwt_identity())
-        invitations = GroupInvitation.query.filter_by(invited_user_id=current_user_id, status='Pending').all()
+        limit, after = page_args(self.page_key)
+        invitations = GroupInvitation.query.options(*self.load_plan).filter_by(
+            invited_user_id=current_user_id, status='Pending'
+        )
+        stream = stream_format()
+        if stream:
+            return stream_response(keyset(invitations, self.page_key, after), self.serialize, stream)
+        invitations, next_cursor = paginate(invitations, self.page_key, after, limit)
 
-        # Serialize invitations with restricted fields to prevent recursion
-        serialized_invitations = [
-            {
-                'id': invite.id,
-                'group': invite.group.to_dict(rules=('-invitations', '-members.groups')),
-                'inviter': invite.inviter.to_dict(rules=('-groups', '-sent_group_invitations', '-received_group_invitations'))
-            }
-            for invite in invitations
-        ]
-        return serialized_invitations, 200
+        serialized_invitations = [self.serialize(invite) for invite in invitations]
+        return serialized_invitations, 200, pagination_headers(next_cursor)
 
     @jwt_required()
     def delete(self):
@@ -690,32 +1190,43 @@ class GroupInvitations(Resource):
 
 # 🔍 Fetch Group Invitations (No CSRF Required, Read-Only)
 class GroupInvitationsForGroup(Resource):
+    load_plan = (joinedload(GroupInvitation.invitee),)
+    page_key = (GroupInvitation.id,)
+    query_budget = {'get': 2}
+
+    @staticmethod
+    def serialize(invite):
+        # Invitee details and status only
+        return {
+            "id": invite.id,
+            "invitee": {
+                "id": invite.invitee.id,
+                "username": invite.invitee.username,
+            },
+            "status": invite.status,
+        }
+
     @jwt_required()
     def get(self, group_id):
         """
-        Retrieve all invitations for a specific group.
+        Retrieve a page of invitations for a specific group, or all of them
+        from the cursor on as a stream (see stream_format).
         """
+        limit, after = page_args(self.page_key)
         try:
             # Ensure the group exists
             group = Group.query.get_or_404(group_id)
 
-            # Fetch all invitations for the group
-            invitations = GroupInvitation.query.filter_by(group_id=group_id).all()
+            invitations = GroupInvitation.query.options(*self.load_plan).filter_by(group_id=group_id)
+            stream = stream_format()
+            if stream:
+                return stream_response(keyset(invitations, self.page_key, after), self.serialize, stream)
 
-            # Serialize the invitations with invitee details and status
-            serialized_invitations = [
-                {
-                    "id": invite.id,
-                    "invitee": {
-                        "id": invite.invitee.id,
-                        "username": invite.invitee.username,
-                    },
-                    "status": invite.status,
-                }
-                for invite in invitations
-            ]
+            # Fetch a page of invitations for the group
+            invitations, next_cursor = paginate(invitations, self.page_key, after, limit)
+            serialized_invitations = [self.serialize(invite) for invite in invitations]
 
-            return serialized_invitations, 200
+            return serialized_invitations, 200, pagination_headers(next_cursor)
 
         except Exception as e:
             print(f"Error fetching invitations for group {group_id}: {e}")
@@ -724,6 +1235,8 @@ class GroupInvitationsForGroup(Resource):
 
 # 🔐 Deny Group Invitation (CSRF Protected via JWT CSRF)
 class DenyGroupInvitation(Resource):
+    query_budget = {'put': 5}
+
     @jwt_required()
     def put(self, invitation_id):
         """
@@ -748,6 +1261,8 @@ class DenyGroupInvitation(Resource):
 
 # 🔐 Accept Group Invitation (CSRF Protected via JWT CSRF)
 class AcceptGroupInvitation(Resource):
+    query_budget = {'put': 8}
+
     @jwt_required()
     def put(self, invitation_id):
         """
@@ -761,11 +1276,20 @@ class AcceptGroupInvitation(Resource):
             if invitation.invited_user_id != current_user_id:
                 return {"message": "You do not have permission to accept this invitation"}, 403
 
-            # Update invitation status to "Accepted"
+            # Update invitation status to "Accepted" and add the membership with one
+            # insert, rather than loading every member to append to group.members
             invitation.status = 'Accepted'
-            user = User.query.get_or_404(current_user_id)
-            group = Group.query.get_or_404(invitation.group_id)
-            group.members.append(user)
+            already_member = select(group_member.c.user_id).where(
+                group_member.c.user_id == current_user_id,
+                group_member.c.group_id == invitation.group_id
+            ).exists()
+            db.session.execute(
+                insert(group_member).from_select(
+                    ['user_id', 'group_id'],
+                    select(literal(current_user_id), literal(invitation.group_id)).where(~already_member)
+                )
+            )
+            touch(db.session, groups=[invitation.group_id])
             db.session.commit()
 
             return {"id": invitation.id}, 200
@@ -774,8 +1298,115 @@ class AcceptGroupInvitation(Resource):
 
 
 
+def owned_invitations(model, invitee_column, parent_column, current_user_id, max_batch=500):
+    """
+    Validate {"invitation_ids": [...], "action": "accept" | "deny"} and authorize every
+    id in one query. Returns (ids, parent_ids, action, None) or an error response as
+    the last item; nothing is changed unless every id belongs to the caller.
+    """
+    data = request.get_json() or {}
+    ids, action = data.get('invitation_ids'), data.get('action')
+
+    if action not in ('accept', 'deny'):
+        return None, None, None, ({"message": "action must be 'accept' or 'deny'"}, 400)
+    if not isinstance(ids, list) or not ids or not all(isinstance(id_, int) and not isinstance(id_, bool) for id_ in ids):
+        return None, None, None, ({"message": "invitation_ids must be a non-empty list of ids"}, 400)
+    if len(ids) > max_batch:
+        return None, None, None, ({"message": f"Cannot update more than {max_batch} invitations at once"}, 400)
+
+    ids = list(dict.fromkeys(ids))
+    rows = db.session.execute(
+        select(model.id, invitee_column, parent_column).where(model.id.in_(ids))
+    ).all()
+    found = {row[0]: row for row in rows}
+
+    missing = [id_ for id_ in ids if id_ not in found]
+    if missing:
+        return None, None, None, ({"message": "Invitations not found", "ids": missing}, 404)
+    forbidden = [id_ for id_ in ids if found[id_][1] != current_user_id]
+    if forbidden:
+        return None, None, None, ({"message": f"You do not have permission to {action} these invitations", "ids": forbidden}, 403)
+
+    return ids, {row[2] for row in rows}, action, None
+
+
+# 🔐 Accept or Deny Many Event Invitations at Once (CSRF Protected via JWT CSRF)
+class BulkEventInvitations(Resource):
+    query_budget = {'put': 4}
+
+    @jwt_required()
+    def put(self):
+        """
+        Accept (status "Accepted") or deny (delete) a list of the caller's event
+        invitations with one statement and one commit.
+        """
+        current_user_id = int(get_jwt_identity())
+        ids, event_ids, action, error = owned_invitations(
+            EventInvitation, EventInvitation.invitee_id, EventInvitation.event_id, current_user_id
+        )
+        if error:
+            return error
+
+        if action == 'accept':
+            db.session.execute(
+                update(EventInvitation).where(EventInvitation.id.in_(ids)).values(status='Accepted'),
+                execution_options={"synchronize_session": False}
+            )
+        else:
+            db.session.execute(
+                delete(EventInvitation).where(EventInvitation.id.in_(ids)),
+                execution_options={"synchronize_session": False}
+            )
+        touch(db.session, events=event_ids)
+        db.session.commit()
+
+        return {"ids": ids, "action": action}, 200
+
+
+# 🔐 Accept or Deny Many Group Invitations at Once (CSRF Protected via JWT CSRF)
+class BulkGroupInvitations(Resource):
+    query_budget = {'put': 5}
+
+    @jwt_required()
+    def put(self):
+        """
+        Accept or deny a list of the caller's group invitations with set-based
+        statements; accepting also adds the caller to every group they are not yet in.
+        """
+        current_user_id = int(get_jwt_identity())
+        ids, group_ids, action, error = owned_invitations(
+            GroupInvitation, GroupInvitation.invited_user_id, GroupInvitation.group_id, current_user_id
+        )
+        if error:
+            return error
+
+        db.session.execute(
+            update(GroupInvitation).where(GroupInvitation.id.in_(ids))
+            .values(status='Accepted' if action == 'accept' else 'Denied'),
+            execution_options={"synchronize_session": False}
+        )
+        if action == 'accept':
+            already_member = select(group_member.c.user_id).where(
+                group_member.c.user_id == current_user_id,
+                group_member.c.group_id == GroupInvitation.group_id
+            ).exists()
+            db.session.execute(
+                insert(group_member).from_select(
+                    ['user_id', 'group_id'],
+                    select(literal(current_user_id), GroupInvitation.group_id)
+                    .where(GroupInvitation.id.in_(ids), ~already_member)
+                )
+            )
+        touch(db.session, groups=group_ids)
+        db.session.commit()
+
+        return {"ids": ids, "action": action}, 200
+
+
 # 🔐 RSVP to Event (CSRF Protected via JWT CSRF)
 class RSVPList(Resource):
+    query_budget = {'post': 3}
+
     @jwt_required()
     def post(self):
         try:
@@ -786,27 +1417,43 @@ class RSVPList(Resource):
         data = request.get_json()
         if not all(k in data for k in ("event_id", "status")):
             return {"message": "Missing required fields"}, 400
-
-        event = Event.query.get_or_404(data['event_id'])
-
-        invitation = EventInvitation.query.filter_by(
-            event_id=event.id, invitee_id=current_user_id, status="Accepted"
-        ).first()
-        if not invitation:
+        try:
+            event_id = int(data['event_id'])
+        except (TypeError, ValueError):
+            return {"message": "Invalid event_id"}, 400
+
+        # Insert or update in one statement, only if the caller accepted an invitation.
+        # The (event_id, user_id) unique constraint makes concurrent submits converge
+        # on a single row instead of racing a read against an insert.
+        accepted = select(EventInvitation.id).where(
+            EventInvitation.event_id == event_id,
+            EventInvitation.invitee_id == current_user_id,
+            EventInvitation.status == "Accepted"
+        ).exists()
+        dialect = postgresql if db.engine.dialect.name == 'postgresql' else sqlite
+        statement = dialect.insert(RSVP).from_select(
+            ['event_id', 'user_id', 'status'],
+            select(literal(event_id), literal(current_user_id), literal(data['status'])).where(accepted)
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=['event_id', 'user_id'],
+            set_={'status': statement.excluded.status}
+        ).returning(RSVP.id, RSVP.user_id, RSVP.event_id, RSVP.status)
+
+        rsvp = db.session.execute(statement).one_or_none()
+        if rsvp is None:
+            db.session.rollback()
+            Event.query.get_or_404(event_id)
             return {"message": "You are not allowed to RSVP for this event"}, 403
 
-        existing_rsvp = RSVP.query.filter_by(event_id=event.id, user_id=current_user_id).first()
-        if existing_rsvp:
-            existing_rsvp.status = data['status']
-        else:
-            new_rsvp = RSVP(user_id=current_user_id, event_id=event.id, status=data['status'])
-            db.session.add(new_rsvp)
-
+        touch(db.session, events=[rsvp.event_id])
         db.session.commit()
-        return {"message": "RSVP updated successfully", "rsvp": existing_rsvp.to_dict() if existing_rsvp else new_rsvp.to_dict()}, 201
+        return {"message": "RSVP updated successfully", "rsvp": dict(rsvp._mapping)}, 201
 
 # 🔍 Fetch RSVPs for an Event (No CSRF Required, Read-Only)
 class EventRSVPs(Resource):
+    query_budget = {'get': 7}
+
     @jwt_required()
     def get(self, event_id):
         try:
@@ -814,21 +1461,35 @@ class EventRSVPs(Resource):
         except ValueError:
             return {"message": "Invalid user ID in JWT"}, 400
 
-        event = Event.query.get_or_404(event_id)
+        # Only the columns the access check and the ETag need; refusals and 304s stop here
+        stamp = Event.query.with_entities(Event.user_id, Event.updated_at).filter_by(id=event_id).first_or_404()
 
-        if event.user_id != current_user_id and not EventInvitation.query.filter_by(
-            event_id=event.id, invitee_id=current_user_id, status="Accepted"
+        if stamp.user_id != current_user_id and not EventInvitation.query.filter_by(
+            event_id=event_id, invitee_id=current_user_id, status="Accepted"
         ).first():
             return {"message": "You are not authorized to view RSVPs for this event"}, 403
 
-        rsvps = RSVP.query.filter_by(event_id=event.id).all()
+        etag = make_etag('rsvps', event_id, stamp.updated_at.isoformat())
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        # Each RSVP embeds the event, which already carries all of them
+        event = EventDetail.with_relationships(event_id).one()
         serialized_rsvps = [
-            rsvp.to_dict(rules=('-user.rsvps', '-event.rsvps')) for rsvp in rsvps
+            serialize_rsvp(rsvp) for rsvp in event.rsvps
         ]
-        return serialized_rsvps, 200
+        return serialized_rsvps, 200, etag_headers(etag)
 
 # 🔐 Add a Comment to an Event (CSRF Protected via JWT CSRF)
 class CommentList(Resource):
+    # The new comment is returned with its author and its event, serialized in full
+    load_plan = (
+        joinedload(Comment.user),
+        joinedload(Comment.event).options(*EventList.load_plan),
+    )
+    query_budget = {'post': 9}
+
     @jwt_required()
     def post(self, event_id):
         current_user_id = int(get_jwt_identity())
@@ -845,34 +1506,123 @@ class CommentList(Resource):
         db.session.add(new_comment)
         db.session.commit()
 
-        comment_data = new_comment.to_dict(rules=('-user.comments', '-event.comments'))
+        new_comment = Comment.query.options(*self.load_plan).filter_by(id=new_comment.id).one()
+        comment_data = serialize_comment(new_comment)
         return {"message": "Comment added successfully", "comment": comment_data}, 201
 
 # 🔍 Fetch All Comments for an Event (No CSRF Required, Read-Only)
 class EventComments(Resource):
+    # Newest first; created_at ties are broken by id
+    page_key = (Comment.created_at, Comment.id)
+    query_budget = {'get': 2}
+
     def get(self, event_id):
-        comments = Comment.query.filter_by(event_id=event_id).all()
+        """
+        A page of an event's comments, or all of them from the cursor on as a
+        stream (see stream_format) for exports.
+        """
+        limit, after = page_args(self.page_key)
+        stream = stream_format()
+        updated_at = db.session.query(Event.updated_at).filter_by(id=event_id).scalar()
+        etag = make_etag('comments', event_id, updated_at.isoformat() if updated_at else None, request.full_path, stream)
+        headers = {**etag_headers(etag), 'Vary': 'Accept'}
+        cached = not_modified(etag)
+        if cached:
+            cached.headers['Vary'] = 'Accept'
+            return cached
+
+        comments = Comment.query.options(joinedload(Comment.user)).filter_by(event_id=event_id)
+        if stream:
+            return stream_response(
+                keyset(comments, self.page_key, after, descending=True), serialize_event_comment, stream, headers
+            )
+
+        comments, next_cursor = paginate(comments, self.page_key, after, limit, descending=True)
         serialized_comments = [
-            comment.to_dict(rules=('-user.comments', '-event.comments')) for comment in comments
+            serialize_event_comment(comment) for comment in comments
         ]
-        return serialized_comments, 200
+        return serialized_comments, 200, {**pagination_headers(next_cursor), **headers}
+
+
+# 🔍 Full-Text Search Across Events, Groups and Users (No CSRF Required, Read-Only)
+class Search(Resource):
+    query_budget = {'get': 1}
+
+    def get(self):
+        """
+        Ranked search returning mixed result types from a single index query.
+        """
+        query = request.args.get('q', '')
+        limit = request.args.get('limit', 20, type=int)
+        kinds = [kind for kind in request.args.get('type', '').split(',') if kind]
+
+        if any(kind not in ('event', 'group', 'user') for kind in kinds):
+            return {"message": "Invalid type, expected event, group or user"}, 400
+
+        return search(query, kinds=kinds, limit=max(1, min(limit, 100))), 200
+
+# 🔍 Prefix Autocomplete for Usernames and Event Names (No CSRF Required, Read-Only)
+class Autocomplete(Resource):
+    indexes = {'users': usernames, 'events': event_names}
+    query_budget = {'get': 1}
+
+    def get(self, kind):
+        """
+        Return the top matches for a prefix from the in-memory index.
+        """
+        index = self.indexes.get(kind)
+        if index is None:
+            return {"message": "Unknown autocomplete type"}, 404
+
+        prefix = request.args.get('q', '')
+        limit = request.args.get('limit', 10, type=int)
+        if not prefix:
+            return [], 200
+        return index.query(prefix, limit=max(1, min(limit, 50))), 200
+
+# 🔍 Detail Cache Counters for This Worker (No CSRF Required, Read-Only)
+class CacheStats(Resource):
+    query_budget = {'get': 0}
 
+    @jwt_required()
+    def get(self):
+        """
+        Hit, miss and eviction counters used to size DETAIL_CACHE_SIZE and DETAIL_CACHE_TTL.
+        """
+        return {cache.name: cache.stats() for cache in CACHES}, 200
+
+# 🔍 Slowest Statement Shapes Seen by This Worker (Bearer Token or Localhost Only, Read-Only)
+class SlowQueries(Resource):
+    query_budget = {'get': 0}
+
+    def get(self):
+        """
+        Statements slower than SLOW_QUERY_MS by fingerprint, with counts, source lines
+        and plans, the most total time first. Empty unless SLOW_QUERY_MS is set.
+        Authorized like /metrics, since the statements describe other users' requests.
+        """
+        if not metrics.authorized():
+            return {"message": "Forbidden"}, 403
+        return slow_queries.report(), 200
 
 
 # Add the resources to the API
 api.add_resource(Register, '/api/register')
 api.add_resource(Login, '/api/login')
 api.add_resource(Logout, '/api/logout')
+api.add_resource(TokenRefresh, '/api/token/refresh')
 api.add_resource(UserList, '/api/users')  # Updated to support search
 api.add_resource(UserProfile, '/api/profile', '/api/profile/<int:user_id>')
 api.add_resource(EventList, '/api/events')  # Updated to support search
 api.add_resource(EventDetail, '/api/events/<int:event_id>')
 api.add_resource(EventInvite, '/api/events/<int:event_id>/invite')
+api.add_resource(EventInviteGroup, '/api/events/<int:event_id>/invite/group')
 api.add_resource(EventInvitations, '/api/event_invitations')  # For listing event invitations
 api.add_resource(EventInvitationsForEvent, '/api/events/<int:event_id>/invitations')
 api.add_resource(EventInvitationByCriteria, '/api/event_invitations/criteria')
 api.add_resource(DenyEventInvitation, '/api/event_invitations/<int:invitation_id>/deny')  # For denying an event invitation
 api.add_resource(AcceptEventInvitation, '/api/event_invitations/<int:invitation_id>/accept')  # For accepting an event invitation
+api.add_resource(BulkEventInvitations, '/api/event_invitations/bulk')  # For accepting or denying many event invitations
 api.add_resource(GroupList, '/api/groups')  # Updated to support search
 api.add_resource(GroupDetail, '/api/groups/<int:group_id>')
 api.add_resource(GroupInvite, '/api/groups/<int:group_id>/invite')
@@ -880,10 +1630,15 @@ api.add_resource(GroupInvitations, '/api/group_invitations')  # For listing grou
 api.add_resource(GroupInvitationsForGroup, '/api/groups/<int:group_id>/invitations')
 api.add_resource(AcceptGroupInvitation, '/api/group_invitations/<int:invitation_id>/accept')  # For accepting a group invitation
 api.add_resource(DenyGroupInvitation, '/api/group_invitations/<int:invitation_id>/deny')  # For denying a group invitation
+api.add_resource(BulkGroupInvitations, '/api/group_invitations/bulk')  # For accepting or denying many group invitations
 api.add_resource(RSVPList, '/api/rsvps')
 api.add_resource(EventRSVPs, '/api/events/<int:event_id>/rsvps')
 api.add_resource(CommentList, '/api/events/<int:event_id>/comments')
 api.add_resource(EventComments, '/api/events/<int:event_id>/comments')
+api.add_resource(Search, '/api/search')
+api.add_resource(Autocomplete, '/api/autocomplete/<string:kind>')
+api.add_resource(CacheStats, '/api/cache/stats')
+api.add_resource(SlowQueries, '/api/slow_queries')
 
 # Add the resource to handle user profile deletion
 api.add_resource(DeleteProfile, '/api/profile/delete')
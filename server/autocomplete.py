@@ -0,0 +1,229 @@
+import fcntl
+import io
+import json
+import os
+import threading
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from config import db
+from cache import versions
+from models import User, Event
+
+# A journal is started afresh past this size; workers then rebuild once from the database
+JOURNAL_MAX_BYTES = 4 * 1024 * 1024
+
+
+class ChangeJournal:
+    """
+    Append-only file of committed index changes, one JSON line per commit,
+    shared by every worker on the host next to the detail cache's version table.
+    Writers append under a lock file; readers only read the lines past their
+    offset. When the file outgrows JOURNAL_MAX_BYTES a writer replaces it with an
+    empty one, and readers holding the old file see it as rotated. With a
+    private cache bus the journal is kept in memory for this process only.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._pid = None
+        self._path = None
+        self._file = None
+
+    def _open(self):
+        bus = versions.path()
+        self._path = f'{bus}.{self.name}' if bus else None
+        self._file = open(self._path, 'a+b') if self._path else io.BytesIO()
+        self._pid = os.getpid()
+
+    @contextmanager
+    def _locked(self, operation):
+        if self._path is None:
+            yield
+            return
+        with open(f'{self._path}.lock', 'a+b') as lock:
+            fcntl.flock(lock, operation)
+            yield
+
+    def rotated(self):
+        """
+        Whether the journal this process reads was replaced since it was opened,
+        or was never opened in this process (a fork starts over).
+        """
+        if self._pid != os.getpid():
+            return True
+        if self._path is None:
+            return False
+        try:
+            return os.stat(self._path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def reopen(self):
+        """
+        Read the current journal from now on. Returns its end offset, so only later
+        commits are read; taken under the lock, so it never falls inside a line.
+        """
+        self._open()
+        with self._locked(fcntl.LOCK_SH):
+            return self._file.seek(0, io.SEEK_END)
+
+    def append(self, changes):
+        line = json.dumps(changes).encode('utf-8') + b'\n'
+        if self._pid != os.getpid():
+            self._open()
+        if self._path is None:
+            self._file.seek(0, io.SEEK_END)
+            self._file.write(line)
+            return
+        # Written through a handle of its own, so the file this process reads stays the
+        # one its offset belongs to, even when this append rotates the journal
+        with self._locked(fcntl.LOCK_EX):
+            if os.path.exists(self._path) and os.path.getsize(self._path) + len(line) > JOURNAL_MAX_BYTES:
+                fresh = f'{self._path}.{os.getpid()}'
+                open(fresh, 'wb').close()
+                os.replace(fresh, self._path)
+            # One write of a whole line, so readers never see half an entry
+            with open(self._path, 'ab') as journal:
+                journal.write(line)
+
+    def read(self, offset):
+        """
+        The changes of every complete line from offset on, and the offset after them.
+        """
+        self._file.seek(offset)
+        data = self._file.read()
+        complete = data[:data.rfind(b'\n') + 1]
+        changes = [change for line in complete.splitlines() for change in json.loads(line)]
+        return changes, offset + len(complete)
+
+
+class PrefixIndex:
+    """
+    Sorted array of (lowercased key, id) pairs answering top-k prefix queries
+    with a binary search. Built lazily on first use and kept current from
+    committed ORM changes.
+
+    Each worker process holds its own copy. Commits in any worker are appended
+    to a ChangeJournal, and every query first applies the lines added since the
+    last one, so workers share the changes rather than rebuilding the whole
+    index from the database. Only a rotated journal causes a rebuild.
+    """
+
+    def __init__(self, column, label):
+        self.column = column
+        self.label = label
+        self._entries = []
+        self._keys = {}
+        self._built = False
+        self._offset = 0
+        self._journal = ChangeJournal(f'autocomplete-{column.class_.__tablename__}')
+        self._lock = threading.Lock()
+
+    def _build(self):
+        # Read before the select, so commits that land during it are applied again on
+        # top; changes are idempotent, so a replayed one leaves the entry as it is
+        self._offset = self._journal.reopen()
+        model = self.column.class_
+        rows = db.session.execute(select(model.id, self.column)).all()
+        self._keys = {row[0]: row[1] for row in rows}
+        self._entries = sorted((value.lower(), id_) for id_, value in self._keys.items())
+        self._built = True
+
+    def _catch_up(self):
+        if not self._built or self._journal.rotated():
+            self._build()
+        changes, self._offset = self._journal.read(self._offset)
+        for operation, id_, value in changes:
+            self._remove(id_)
+            if operation == 'upsert':
+                self._keys[id_] = value
+                insort(self._entries, (value.lower(), id_))
+
+    def query(self, prefix, limit=10):
+        """
+        Return up to limit {id, label} dicts whose key starts with prefix, in key order.
+        """
+        prefix = prefix.lower()
+        with self._lock:
+            self._catch_up()
+            results = []
+            # Walked by position, so a short prefix never copies the rest of the array
+            position = bisect_left(self._entries, (prefix,))
+            while position < len(self._entries) and len(results) < limit:
+                key, id_ = self._entries[position]
+                if not key.startswith(prefix):
+                    break
+                results.append({'id': id_, self.label: self._keys[id_]})
+                position += 1
+            return results
+
+    def apply(self, changes):
+        """
+        Publish this worker's committed (operation, id, value) changes to every
+        worker, this one included; each applies them on its next query.
+        """
+        with self._lock:
+            self._journal.append(list(changes))
+
+    def _remove(self, id_):
+        value = self._keys.pop(id_, None)
+        if value is None:
+            return
+        entry = (value.lower(), id_)
+        position = bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def reset(self):
+        """
+        Drop the in-memory index so the next query rebuilds it from the database.
+        """
+        with self._lock:
+            self._entries = []
+            self._keys = {}
+            self._built = False
+
+
+usernames = PrefixIndex(User.username, 'username')
+event_names = PrefixIndex(Event.name, 'name')
+
+INDEXES = {User: usernames, Event: event_names}
+
+
+def _record(session, index, operation, target):
+    session.info.setdefault('autocomplete_pending', []).append(
+        (index, operation, target.id, getattr(target, index.column.key))
+    )
+
+
+# Changes are queued per session while flushing and only applied to the index
+# once the transaction commits, so rolled-back writes never become visible.
+for _model, _index in INDEXES.items():
+    @event.listens_for(_model, 'after_insert')
+    @event.listens_for(_model, 'after_update')
+    def _queue_upsert(mapper, connection, target, index=_index):
+        session = Session.object_session(target)
+        if session is not None:
+            _record(session, index, 'upsert', target)
+
+    @event.listens_for(_model, 'after_delete')
+    def _queue_remove(mapper, connection, target, index=_index):
+        session = Session.object_session(target)
+        if session is not None:
+            _record(session, index, 'remove', target)
+
+
+@event.listens_for(Session, 'after_commit')
+def apply_pending_changes(session):
+    changes = {}
+    for index, operation, id_, value in session.info.pop('autocomplete_pending', ()):
+        changes.setdefault(index, []).append((operation, id_, value))
+    for index, index_changes in changes.items():
+        index.apply(index_changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def discard_pending_changes(session):
+    session.info.pop('autocomplete_pending', None)
@@ -0,0 +1,160 @@
+"""
+Check that the detail caches stay coherent across worker processes.
+
+Starts several reader processes the way gunicorn starts workers without
+--preload, each importing the app on its own and keeping its own caches,
+all against one temporary SQLite database. Every round the writer process
+commits a change to an event or a group, then every reader requests the
+detail endpoint twice and reports whether both payloads reflect the write.
+
+Run from the server directory:
+    python -m benchmarks.cache_coherence --workers 4 --rounds 50
+
+Pass --private to give each process its own version table (DETAIL_CACHE_BUS
+set to empty); the harness should then report stale reads, which shows it
+would catch a broken invalidation path.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+
+def configure(workdir, private):
+    """
+    Point a process at the shared scratch database and version table before
+    the app is imported.
+    """
+    os.environ['DATABASE_URI'] = f"sqlite:///{os.path.join(workdir, 'app.db')}"
+    os.environ['DETAIL_CACHE_BUS'] = '' if private else os.path.join(workdir, 'versions.bin')
+    os.environ.setdefault('JWT_SECRET_KEY', 'cache-coherence')
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    os.environ['BCRYPT_POOL_SIZE'] = '0'
+
+
+def reader(workdir, private, commands, results):
+    configure(workdir, private)
+    from flask_jwt_extended import create_access_token
+    from config import app
+    import app as routes  # noqa: F401  registers the API resources
+    from cache import CACHES
+
+    with app.app_context():
+        token = create_access_token(identity='1')
+    client = app.test_client()
+    client.set_cookie('access_token_cookie', token)
+
+    for command in iter(commands.get, None):
+        kind, expected = command
+        started = time.perf_counter()
+        if kind == 'event':
+            seen = len(client.get('/api/events/1').get_json()['comments'])
+        else:
+            seen = len(client.get('/api/groups/1').get_json()['members'])
+        elapsed = time.perf_counter() - started
+
+        # A second read should be served from this worker's refreshed cache
+        if kind == 'event':
+            again = len(client.get('/api/events/1').get_json()['comments'])
+        else:
+            again = len(client.get('/api/groups/1').get_json()['members'])
+        results.put((os.getpid(), kind, seen == expected == again, elapsed))
+
+    results.put((os.getpid(), 'stats', {cache.name: cache.stats() for cache in CACHES}, 0))
+
+
+def seed(users):
+    from config import db
+    from models import User, Event, Group
+    from datetime import datetime
+
+    db.drop_all()
+    db.create_all()
+    people = []
+    for i in range(users):
+        user = User(username=f'coherence{i}', email=f'coherence{i}@example.com')
+        user.password = 'Password1'
+        people.append(user)
+    db.session.add_all(people)
+    db.session.commit()
+    db.session.add(Event(name='Coherence', date=datetime(2024, 1, 1), location='Here', description='d', user_id=people[0].id))
+    group = Group(name='Coherence', description='d', user_id=people[0].id)
+    group.members.append(people[0])
+    db.session.add(group)
+    db.session.commit()
+    return [user.id for user in people]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--private', action='store_true', help='do not share the version table between processes')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='cache-coherence-')
+    configure(workdir, args.private)
+    from config import app, db
+    from models import Comment, Group, User
+    import app as routes  # noqa: F401  writes go through the same session hooks as a worker
+
+    with app.app_context():
+        user_ids = seed(args.rounds + 1)
+
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    queues = [context.Queue() for _ in range(args.workers)]
+    workers = [context.Process(target=reader, args=(workdir, args.private, queue, results)) for queue in queues]
+    for worker in workers:
+        worker.start()
+
+    def broadcast(command):
+        for queue in queues:
+            queue.put(command)
+        return [results.get() for _ in queues]
+
+    comments, members = 0, 1
+    stale = 0
+    latencies = []
+    # Warm every worker's cache so a missed invalidation would serve stale data
+    broadcast(('event', comments))
+    broadcast(('group', members))
+
+    for round_ in range(args.rounds):
+        with app.app_context():
+            if round_ % 2 == 0:
+                db.session.add(Comment(content=f'round {round_}', user_id=user_ids[0], event_id=1))
+                comments += 1
+                command = ('event', comments)
+            else:
+                group = db.session.get(Group, 1)
+                group.members.append(db.session.get(User, user_ids[members]))
+                members += 1
+                command = ('group', members)
+            db.session.commit()
+
+        for pid, kind, fresh, elapsed in broadcast(command):
+            latencies.append(elapsed)
+            if not fresh:
+                stale += 1
+                print(f"  stale {kind} read in worker {pid} after round {round_}")
+
+    for queue in queues:
+        queue.put(None)
+    for _ in workers:
+        pid, _, stats, _ = results.get()
+        print(f"worker {pid}: {stats}")
+    for worker in workers:
+        worker.join()
+
+    latencies.sort()
+    print(f"\n{args.workers} workers, {args.rounds} writes, {len(latencies)} reads after a write")
+    print(f"median read {latencies[len(latencies) // 2] * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+    print(f"{stale} stale read(s)")
+    sys.exit(1 if stale else 0)
+
+
+if __name__ == '__main__':
+    main()
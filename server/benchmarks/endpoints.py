@@ -0,0 +1,357 @@
+"""
+Benchmark every API resource through the Flask test client.
+
+Seeds a scratch SQLite database with seed.py's bulk generator (sized from
+--users), then sends --requests requests to each method of every resource
+registered with api.add_resource and reports p50/p95/p99 latency, SQL
+statements per request and response bytes. GETs are derived from the URL map;
+writes use the scenarios in WRITES, whose fixtures are created outside the
+timed request. From the server directory:
+    python -m benchmarks.endpoints --users 10000 --output before.json
+    python -m benchmarks.endpoints --users 10000 --baseline before.json
+
+Pass --database to keep the seeded file, and --reuse to benchmark an existing
+one without seeding it again.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument('--users', type=int, default=10000, help='other volumes are derived from this')
+parser.add_argument('--seed', type=int, default=0)
+parser.add_argument('--requests', type=int, default=50, help='timed requests per endpoint and method')
+parser.add_argument('--only', default='', help='regular expression matched against "METHOD /rule"')
+parser.add_argument('--database', help='SQLite file to seed (default: a temporary file)')
+parser.add_argument('--reuse', action='store_true', help='benchmark --database as it is')
+parser.add_argument('--output', help='write the results to this JSON file')
+parser.add_argument('--baseline', help='compare against the results of an earlier run')
+
+if __name__ == '__main__':
+    ARGS = parser.parse_args()
+    DATABASE = ARGS.database or os.path.join(tempfile.mkdtemp(prefix='endpoint-benchmark-'), 'app.db')
+    os.environ['DATABASE_URI'] = f"sqlite:///{os.path.abspath(DATABASE)}"
+    os.environ.setdefault('JWT_SECRET_KEY', 'endpoint-benchmark')
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, func, insert, select
+from config import app, api, db
+from models import User, Event, Group, RSVP, GroupInvitation, EventInvitation, group_member
+from seed import seed_bulk, BULK_PASSWORD
+import app as routes  # noqa: F401  registers the API resources
+
+# Query strings for GET routes that need them to exercise their main query
+QUERY_STRINGS = {
+    '/api/search': 'q=party',
+    '/api/autocomplete/<string:kind>': 'q=jo',
+    '/api/event_invitations/criteria': 'event_id={event_id}&invitee_id={invitee_id}',
+}
+PERCENTILES = (50, 95, 99)
+
+
+class Fixtures:
+    """
+    Ids of the busiest seeded rows, and helpers creating fresh rows for writes
+    that consume them. Helpers commit, so the rows are visible to the request.
+    """
+
+    def __init__(self):
+        self.event_id, self.event_owner = db.session.execute(
+            select(Event.id, Event.user_id).join(RSVP).group_by(Event.id).order_by(func.count().desc()).limit(1)
+        ).one()
+        self.group_id, self.group_owner = db.session.execute(
+            select(Group.id, Group.user_id).join(group_member).group_by(Group.id).order_by(func.count().desc()).limit(1)
+        ).one()
+        self.guest_id = db.session.scalar(select(RSVP.user_id).filter_by(event_id=self.event_id).limit(1))
+        self.email = db.session.scalar(select(User.email).filter_by(id=self.guest_id))
+        self.password_hash = db.session.scalar(select(User.password_hash).filter_by(id=self.guest_id))
+        self.popular_events = db.session.scalars(
+            select(EventInvitation.event_id).group_by(EventInvitation.event_id).order_by(func.count().desc()).limit(10)
+        ).all()
+        self.popular_groups = db.session.scalars(
+            select(Group.id).join(group_member).group_by(Group.id).order_by(func.count().desc()).limit(10)
+        ).all()
+        self._counter = itertools.count()
+
+    def url_args(self):
+        return {
+            'event_id': self.event_id,
+            'group_id': self.group_id,
+            'user_id': self.event_owner,
+            'invitee_id': self.guest_id,
+            'kind': 'users',
+        }
+
+    def unique(self):
+        return f'bench{os.getpid()}x{next(self._counter)}'
+
+    def new_user(self):
+        # Core insert: the ORM would hash a password for every fixture
+        name = self.unique()
+        user_id = db.session.execute(
+            insert(User).values(username=name, email=f'{name}@example.com', password_hash=self.password_hash).returning(User.id)
+        ).scalar_one()
+        db.session.commit()
+        return user_id
+
+    def add(self, obj):
+        db.session.add(obj)
+        db.session.commit()
+        return obj.id
+
+    def new_event(self, owner):
+        return self.add(Event(name=self.unique(), date=datetime(2025, 6, 1), location='Bench', description='d', user_id=owner))
+
+    def new_group(self, owner):
+        return self.add(Group(name=self.unique(), description='d', user_id=owner))
+
+    def event_invitation(self, event_id, invitee, status='Pending'):
+        inviter = db.session.scalar(select(Event.user_id).filter_by(id=event_id))
+        return self.add(EventInvitation(event_id=event_id, inviter_id=inviter, invitee_id=invitee, status=status))
+
+    def group_invitation(self, group_id, invitee):
+        inviter = db.session.scalar(select(Group.user_id).filter_by(id=group_id))
+        return self.add(GroupInvitation(group_id=group_id, inviter_id=inviter, invited_user_id=invitee, status='Pending'))
+
+
+def login(client, user_id):
+    with app.app_context():
+        client.set_cookie('access_token_cookie', create_access_token(identity=str(user_id)))
+
+
+def _refresh(fx, client, i):
+    if i == 0:
+        # A real login sets the refresh cookie; each rotation then replaces it
+        client.post('/api/login', json={'email': fx.email, 'password': BULK_PASSWORD})
+    return '/api/token/refresh', None
+
+
+def _register(fx, client, i):
+    name = fx.unique()
+    return '/api/register', {'username': name, 'email': f'{name}@example.com', 'password': BULK_PASSWORD}
+
+
+def _as(user, prepare):
+    """
+    A scenario that logs in as user (a Fixtures attribute) before preparing its request.
+    """
+    def scenario(fx, client, i):
+        login(client, getattr(fx, user))
+        return prepare(fx, i)
+    return scenario
+
+
+def _as_new_user(prepare):
+    """
+    A scenario that creates a user, logs in as them and prepares a request with prepare(fixtures, user_id).
+    """
+    def scenario(fx, client, i):
+        user_id = fx.new_user()
+        login(client, user_id)
+        return prepare(fx, user_id)
+    return scenario
+
+
+# (endpoint, method) -> scenario(fixtures, client, i) returning (path, json body)
+WRITES = {
+    ('register', 'POST'): _register,
+    ('login', 'POST'): lambda fx, client, i: ('/api/login', {'email': fx.email, 'password': BULK_PASSWORD}),
+    ('logout', 'POST'): _as('guest_id', lambda fx, i: ('/api/logout', None)),
+    ('tokenrefresh', 'POST'): _refresh,
+    ('deleteprofile', 'DELETE'): _as_new_user(lambda fx, user_id: ('/api/profile/delete', None)),
+    ('eventlist', 'POST'): _as('event_owner', lambda fx, i: (
+        '/api/events', {'name': fx.unique(), 'date': '2025-06-01T18:30', 'location': 'Bench', 'description': 'd'}
+    )),
+    ('eventdetail', 'PUT'): _as('event_owner', lambda fx, i: (f'/api/events/{fx.event_id}', {'description': fx.unique()})),
+    ('eventdetail', 'DELETE'): _as('event_owner', lambda fx, i: (f'/api/events/{fx.new_event(fx.event_owner)}', None)),
+    ('commentlist', 'POST'): _as('guest_id', lambda fx, i: (f'/api/events/{fx.event_id}/comments', {'content': fx.unique()})),
+    ('rsvplist', 'POST'): _as('guest_id', lambda fx, i: (
+        '/api/rsvps', {'event_id': fx.event_id, 'status': ('going', 'maybe')[i % 2]}
+    )),
+    ('eventinvite', 'POST'): _as('event_owner', lambda fx, i: (
+        f'/api/events/{fx.event_id}/invite', {'invited_user_id': fx.new_user()}
+    )),
+    ('eventinvitegroup', 'POST'): _as('group_owner', lambda fx, i: (
+        f'/api/events/{fx.new_event(fx.group_owner)}/invite/group', {'group_id': fx.group_id}
+    )),
+    ('eventinvitations', 'DELETE'): _as('event_owner', lambda fx, i: (
+        '/api/event_invitations', {'id': fx.event_invitation(fx.event_id, fx.new_user())}
+    )),
+    ('accepteventinvitation', 'PUT'): _as_new_user(lambda fx, user_id: (
+        f'/api/event_invitations/{fx.event_invitation(fx.event_id, user_id)}/accept', None
+    )),
+    ('denyeventinvitation', 'PUT'): _as_new_user(lambda fx, user_id: (
+        f'/api/event_invitations/{fx.event_invitation(fx.event_id, user_id)}/deny', None
+    )),
+    ('bulkeventinvitations', 'PUT'): _as_new_user(lambda fx, user_id: (
+        '/api/event_invitations/bulk',
+        {'invitation_ids': [fx.event_invitation(event_id, user_id) for event_id in fx.popular_events], 'action': 'accept'}
+    )),
+    ('grouplist', 'POST'): _as('group_owner', lambda fx, i: ('/api/groups', {'name': fx.unique(), 'description': 'd'})),
+    ('groupdetail', 'DELETE'): _as('group_owner', lambda fx, i: (f'/api/groups/{fx.new_group(fx.group_owner)}', None)),
+    ('groupinvite', 'POST'): _as('group_owner', lambda fx, i: (
+        f'/api/groups/{fx.group_id}/invite', {'invited_user_id': fx.new_user()}
+    )),
+    ('groupinvitations', 'DELETE'): _as('group_owner', lambda fx, i: (
+        '/api/group_invitations', {'id': fx.group_invitation(fx.group_id, fx.new_user())}
+    )),
+    ('acceptgroupinvitation', 'PUT'): _as_new_user(lambda fx, user_id: (
+        f'/api/group_invitations/{fx.group_invitation(fx.group_id, user_id)}/accept', None
+    )),
+    ('denygroupinvitation', 'PUT'): _as_new_user(lambda fx, user_id: (
+        f'/api/group_invitations/{fx.group_invitation(fx.group_id, user_id)}/deny', None
+    )),
+    ('bulkgroupinvitations', 'PUT'): _as_new_user(lambda fx, user_id: (
+        '/api/group_invitations/bulk',
+        {'invitation_ids': [fx.group_invitation(group_id, user_id) for group_id in fx.popular_groups], 'action': 'accept'}
+    )),
+}
+
+
+def scenarios(fx):
+    """
+    Yield (name, endpoint, method, scenario) for every method of every API resource.
+    """
+    url_args = fx.url_args()
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.endpoint not in api.endpoints:
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            name = f'{method} {rule.rule}'
+            if method == 'GET':
+                path = re.sub(r'<(?:\w+:)?(\w+)>', lambda m: str(url_args[m.group(1)]), rule.rule)
+                query_string = QUERY_STRINGS.get(rule.rule, '').format(**url_args)
+                url = f'{path}?{query_string}' if query_string else path
+                yield name, rule.endpoint, method, _as('event_owner', lambda fx, i, url=url: (url, None))
+            elif (rule.endpoint, method) in WRITES:
+                yield name, rule.endpoint, method, WRITES[rule.endpoint, method]
+            else:
+                yield name, rule.endpoint, method, None
+
+
+def percentile(values, p):
+    """
+    Nearest-rank percentile of a sorted list.
+    """
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+
+def run(name, method, scenario, fx, requests):
+    statements = []
+    counting = False
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if counting:
+            statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    client = app.test_client()
+    latencies, queries, sizes, statuses = [], [], [], {}
+    try:
+        for i in range(requests):
+            with app.app_context():
+                path, body = scenario(fx, client, i)
+            statements.clear()
+            counting = True
+            started = time.perf_counter()
+            response = client.open(path, method=method, json=body)
+            size = len(response.get_data())  # Drains streamed bodies inside the timing
+            elapsed = time.perf_counter() - started
+            counting = False
+
+            latencies.append(elapsed * 1000)
+            queries.append(len(statements))
+            sizes.append(size)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+    latencies.sort()
+    result = {f'p{p}_ms': round(percentile(latencies, p), 3) for p in PERCENTILES}
+    result.update({
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'queries': round(sum(queries) / len(queries), 2),
+        'max_queries': max(queries),
+        'bytes': round(sum(sizes) / len(sizes)),
+        'statuses': {str(code): n for code, n in sorted(statuses.items())},
+    })
+    return result
+
+
+def compare(results, baseline):
+    print(f"\n{'vs ' + ARGS.baseline:<56} {'p50':>9} {'p95':>9} {'queries':>9} {'bytes':>9}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<56} {'new':>9}")
+            continue
+        changes = []
+        for key in ('p50_ms', 'p95_ms', 'queries', 'bytes'):
+            change = (result[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            changes.append(f"{change:+8.1f}%")
+        print(f"{name:<56} {' '.join(changes)}")
+
+
+def main():
+    if not ARGS.reuse:
+        users = ARGS.users
+        seed_bulk(users, events=max(users // 10, 10), groups=max(users // 100, 10), rsvps=users * 5,
+                  comments=users * 2, members=users, group_invitations=users // 5, seed=ARGS.seed, workers=1)
+    app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+
+    with app.app_context():
+        fx = Fixtures()
+        counts = {model.__tablename__: db.session.scalar(select(func.count()).select_from(model))
+                  for model in (User, Event, Group, RSVP, EventInvitation)}
+
+    only = re.compile(ARGS.only) if ARGS.only else None
+    results, skipped = {}, []
+    print(f"{'':<56} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>9} {'bytes':>9}  statuses")
+    for name, endpoint, method, scenario in scenarios(fx):
+        if only and not only.search(name):
+            continue
+        if scenario is None:
+            skipped.append(name)
+            continue
+        result = run(name, method, scenario, fx, ARGS.requests)
+        result['resource'] = app.view_functions[endpoint].view_class.__name__
+        results[name] = result
+        print(f"{name:<56} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} {result['p99_ms']:9.2f} "
+              f"{result['queries']:9.1f} {result['bytes']:9d}  {result['statuses']}")
+
+    for name in skipped:
+        print(f"{name:<56} skipped, no scenario in WRITES")
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': os.path.abspath(DATABASE),
+            'rows': counts,
+            'requests': ARGS.requests,
+            'seed': ARGS.seed,
+        },
+        'results': results,
+    }
+    if ARGS.output:
+        with open(ARGS.output, 'w') as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+        print(f"\nWrote {ARGS.output}")
+    if ARGS.baseline:
+        with open(ARGS.baseline) as baseline:
+            compare(results, json.load(baseline)['results'])
+    sys.exit(1 if skipped else 0)
+
+
+if __name__ == '__main__':
+    main()
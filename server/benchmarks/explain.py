@@ -0,0 +1,123 @@
+"""
+EXPLAIN every SELECT issued by the read-only API endpoints and flag any that
+cannot use an index.
+
+Runs against the database configured by DATABASE_URI, which should be seeded
+(python seed.py). From the server directory:
+    python -m benchmarks.explain
+
+On SQLite a plan step is flagged when it is a full "SCAN" of a table with no
+index, unless the statement has a LIMIT and needs no temporary sort, since
+that scan stops after LIMIT rows. On Postgres sequential scans are disabled
+for the session so the plan shows whether an index is usable at all, even on
+a small dataset.
+"""
+import re
+import sys
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from config import app, db
+from models import Event, Group, EventInvitation
+import app as routes  # noqa: F401  registers the API resources
+
+# Query strings for endpoints that need them to exercise their main query
+QUERY_STRINGS = {
+    '/api/events': ('', 'q=party'),
+    '/api/groups': ('', 'q=club'),
+    '/api/users': ('', 'q=jo'),
+    '/api/search': ('q=party',),
+    '/api/event_invitations/criteria': ('event_id={event_id}&invitee_id={invitee_id}',),
+}
+
+
+def sample_arguments():
+    """
+    Pick existing ids to fill in URL parameters.
+    """
+    event = Event.query.order_by(Event.id).first()
+    group = Group.query.order_by(Group.id).first()
+    invitation = EventInvitation.query.order_by(EventInvitation.id).first()
+    if event is None or group is None:
+        sys.exit("The database has no events or groups; run seed.py first")
+    return {
+        'event_id': event.id,
+        'group_id': group.id,
+        'user_id': event.user_id,
+        'invitee_id': invitation.invitee_id if invitation else event.user_id,
+        'kind': 'users',
+    }
+
+
+def endpoint_urls(args):
+    """
+    Yield (endpoint, url) for every GET route under /api.
+    """
+    for rule in sorted(app.url_map.iter_rules(), key=lambda r: r.rule):
+        if not rule.rule.startswith('/api') or 'GET' not in rule.methods:
+            continue
+        path = re.sub(r'<(?:\w+:)?(\w+)>', lambda m: str(args[m.group(1)]), rule.rule)
+        for query_string in QUERY_STRINGS.get(rule.rule, ('',)):
+            query_string = query_string.format(**args)
+            yield rule.endpoint, f"{path}?{query_string}" if query_string else path
+
+
+def explain(connection, statement, parameters):
+    """
+    Return (plan_lines, flagged_lines) for a statement on this connection.
+    """
+    if connection.dialect.name == 'postgresql':
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+        plan = [row[0] for row in rows]
+        return plan, [line for line in plan if 'Seq Scan' in line]
+
+    rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    plan = [row[-1] for row in rows]
+    bounded = re.search(r'\bLIMIT\b', statement) and not any('TEMP B-TREE' in line for line in plan)
+    flagged = [
+        line for line in plan
+        if line.startswith('SCAN') and 'USING' not in line and 'VIRTUAL TABLE' not in line and not bounded
+    ]
+    return plan, flagged
+
+
+def main():
+    with app.app_context():
+        args = sample_arguments()
+        token = create_access_token(identity=str(args['user_id']))
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                captured.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        client = app.test_client()
+        client.set_cookie('access_token_cookie', token)
+
+        failures = 0
+        with db.engine.connect() as connection:
+            if connection.dialect.name == 'postgresql':
+                connection.exec_driver_sql("SET enable_seqscan = off")
+
+            for endpoint, url in endpoint_urls(args):
+                captured.clear()
+                response = client.get(url)
+                print(f"\n{endpoint} GET {url} -> {response.status_code} ({len(captured)} queries)")
+
+                for statement, parameters in list(captured):
+                    plan, flagged = explain(connection, statement, parameters)
+                    status = "NO INDEX" if flagged else "ok"
+                    failures += bool(flagged)
+                    print(f"  [{status}] {' '.join(statement.split())[:120]}")
+                    for line in plan:
+                        print(f"      {line}")
+
+        event.remove(db.engine, 'before_cursor_execute', capture)
+
+    print(f"\n{failures} statement(s) without a usable index")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
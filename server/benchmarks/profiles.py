@@ -0,0 +1,121 @@
+"""
+Aggregate request profiles written by profiler.py.
+
+Reads the <resource>.<method>.<request id>.collapsed files in a profile
+directory (PROFILE_DIR, or event-manager-profiles in the temp directory),
+keeps those matching --resource and --method, and sums them. Prints the
+profiles per resource and the functions with the most time, then optionally
+writes the summed stacks for a flame graph: --collapsed for flamegraph.pl or
+speedscope, --speedscope for https://www.speedscope.app directly. Reads no
+configuration and opens no database, so it runs anywhere the files are copied
+to. From the server directory:
+    python -m benchmarks.profiles --resource EventList --speedscope eventlist.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument('directory', nargs='?',
+                    default=os.getenv('PROFILE_DIR') or os.path.join(tempfile.gettempdir(), 'event-manager-profiles'))
+parser.add_argument('--resource', help='only profiles of this Resource class (or endpoint)')
+parser.add_argument('--method', help='only profiles of this HTTP method')
+parser.add_argument('--top', type=int, default=20, help='functions to list by self and total time')
+parser.add_argument('--collapsed', help='write the summed stacks here in collapsed format')
+parser.add_argument('--speedscope', help='write the summed stacks here as a speedscope profile')
+
+
+def load(directory, resource=None, method=None):
+    """
+    Summed {stack: microseconds} of the matching profiles, and how many each resource and method has.
+    """
+    stacks, counts = {}, {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.collapsed'))):
+        name, profiled_method, _ = os.path.basename(path).split('.', 2)
+        if (resource and name != resource) or (method and profiled_method != method.upper()):
+            continue
+        counts[name, profiled_method] = counts.get((name, profiled_method), 0) + 1
+        with open(path) as f:
+            for line in f:
+                stack, _, microseconds = line.rstrip('\n').rpartition(' ')
+                stacks[stack] = stacks.get(stack, 0) + int(microseconds)
+    return stacks, counts
+
+
+def hot_functions(stacks):
+    """
+    {function: (self microseconds, total microseconds)}; a recursive function counts once per stack.
+    """
+    functions = {}
+    for stack, microseconds in stacks.items():
+        frames = stack.split(';')
+        for frame in set(frames):
+            own, total = functions.get(frame, (0, 0))
+            functions[frame] = (own, total + microseconds)
+        own, total = functions[frames[-1]]
+        functions[frames[-1]] = (own + microseconds, total)
+    return functions
+
+
+def speedscope(stacks, name):
+    frames, index, samples, weights = [], {}, [], []
+    for stack, microseconds in sorted(stacks.items()):
+        sample = []
+        for frame in stack.split(';'):
+            if frame not in index:
+                index[frame] = len(frames)
+                frames.append({'name': frame})
+            sample.append(index[frame])
+        samples.append(sample)
+        weights.append(microseconds)
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'microseconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+        'name': name,
+        'exporter': 'benchmarks.profiles',
+    }
+
+
+def main():
+    args = parser.parse_args()
+    stacks, counts = load(args.directory, args.resource, args.method)
+    if not stacks:
+        print(f'No matching profiles in {args.directory}')
+        sys.exit(1)
+
+    print(f"{'resource':<32} {'method':<8} {'profiles':>9}")
+    for (name, method), count in sorted(counts.items()):
+        print(f'{name:<32} {method:<8} {count:>9}')
+
+    total = sum(stacks.values())
+    print(f"\n{'self ms':>10} {'self %':>7} {'total ms':>10} {'total %':>7}  function")
+    functions = sorted(hot_functions(stacks).items(), key=lambda item: item[1][0], reverse=True)
+    for frame, (own, inclusive) in functions[:args.top]:
+        print(f'{own / 1000:10.1f} {own / total * 100:6.1f}% {inclusive / 1000:10.1f} {inclusive / total * 100:6.1f}%  {frame}')
+
+    if args.collapsed:
+        with open(args.collapsed, 'w') as f:
+            for stack, microseconds in sorted(stacks.items()):
+                f.write(f'{stack} {microseconds}\n')
+        print(f'\nWrote {args.collapsed}')
+    if args.speedscope:
+        name = ' '.join(filter(None, (args.resource, args.method))) or 'all requests'
+        with open(args.speedscope, 'w') as f:
+            json.dump(speedscope(stacks, name), f)
+        print(f'\nWrote {args.speedscope}')
+
+
+if __name__ == '__main__':
+    main()
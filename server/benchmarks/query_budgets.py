@@ -0,0 +1,92 @@
+"""
+Check every API resource against its declared query budget.
+
+Seeds a scratch SQLite database like benchmarks.endpoints, turns on
+QUERY_BUDGETS (and QUERY_BUDGET_STRICT unless --lenient is given) and sends
+each scenario of benchmarks.endpoints a few times, the first time with cold
+caches. A request that issues more statements than its Resource's
+query_budget, or lazily loads a relationship marked raiseload, is reported
+with every statement and the app code that issued it. Methods without a
+budget are listed too. Exits 1 on any of them. From the server directory:
+    python -m benchmarks.query_budgets --users 2000
+
+Budgets should not depend on the data, so run it at two sizes when changing
+one: an N+1 query passes on a small database and fails on a bigger one.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument('--users', type=int, default=2000, help='other volumes are derived from this')
+parser.add_argument('--seed', type=int, default=0)
+parser.add_argument('--requests', type=int, default=2, help='requests per endpoint and method')
+parser.add_argument('--only', default='', help='regular expression matched against "METHOD /rule"')
+parser.add_argument('--lenient', action='store_true', help='only check counts, allow lazy loads')
+
+if __name__ == '__main__':
+    ARGS = parser.parse_args()
+    DATABASE = os.path.join(tempfile.mkdtemp(prefix='query-budgets-'), 'app.db')
+    os.environ['DATABASE_URI'] = f"sqlite:///{DATABASE}"
+    os.environ.setdefault('JWT_SECRET_KEY', 'query-budgets')
+    os.environ['QUERY_BUDGETS'] = 'true'
+    os.environ['QUERY_BUDGET_STRICT'] = 'false' if ARGS.lenient else 'true'
+
+from config import app
+from seed import seed_bulk
+from query_budget import QueryBudgetExceeded, LazyLoadForbidden, budget_for
+from benchmarks.endpoints import Fixtures, scenarios
+
+
+def check(method, scenario, fx, requests):
+    """
+    The first violation raised by any of the requests, or None.
+    """
+    client = app.test_client()
+    for i in range(requests):
+        with app.app_context():
+            path, body = scenario(fx, client, i)
+        try:
+            client.open(path, method=method, json=body)
+        except (QueryBudgetExceeded, LazyLoadForbidden) as error:
+            return error
+    return None
+
+
+def main():
+    users = ARGS.users
+    seed_bulk(users, events=max(users // 10, 10), groups=max(users // 100, 10), rsvps=users * 5,
+              comments=users * 2, members=users, group_invitations=users // 5, seed=ARGS.seed, workers=1)
+    app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+    # Re-raise violations from the test client instead of answering 500
+    app.config['TESTING'] = True
+
+    with app.app_context():
+        fx = Fixtures()
+
+    only = re.compile(ARGS.only) if ARGS.only else None
+    failures, unbudgeted = 0, []
+    for name, endpoint, method, scenario in scenarios(fx):
+        if only and not only.search(name):
+            continue
+        view_class = app.view_functions[endpoint].view_class
+        if budget_for(view_class, method) is None:
+            unbudgeted.append(f'{name} ({view_class.__name__})')
+        if scenario is None:
+            continue
+        error = check(method, scenario, fx, ARGS.requests)
+        if error is None:
+            print(f'ok    {name}')
+        else:
+            failures += 1
+            print(f'FAIL  {name}\n{error}\n')
+
+    for name in unbudgeted:
+        print(f'no budget  {name}')
+    sys.exit(1 if failures or unbudgeted else 0)
+
+
+if __name__ == '__main__':
+    main()
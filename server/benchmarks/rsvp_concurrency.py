@@ -0,0 +1,122 @@
+"""
+Fire many RSVPs at the same event in parallel and check that every user ends
+up with exactly one RSVP row, holding one of the statuses they submitted, and
+that no request failed.
+
+Uses a scratch SQLite database unless DATABASE_URI is set (point it at an
+empty Postgres database to exercise the ON CONFLICT path there; its tables
+are dropped and recreated). From the server directory:
+    python -m benchmarks.rsvp_concurrency --users 50 --repeats 8
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+from collections import Counter
+
+if not os.getenv('DATABASE_URI'):
+    os.environ['DATABASE_URI'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='rsvp-concurrency-'), 'app.db')}"
+os.environ.setdefault('JWT_SECRET_KEY', 'rsvp-concurrency')
+
+from datetime import datetime
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from config import app, db
+from models import User, Event, EventInvitation, RSVP
+import app as routes  # noqa: F401  registers the API resources
+
+STATUSES = ('Going', 'Maybe', 'Not Going')
+
+
+def seed(users):
+    """
+    One event, and an accepted invitation to it for every user but the last,
+    who must be refused.
+    """
+    db.drop_all()
+    db.create_all()
+    db.session.execute(insert(User), [
+        {'username': f'rsvp{i}', 'email': f'rsvp{i}@example.com', 'password_hash': 'unused'}
+        for i in range(users + 1)
+    ])
+    user_ids = [user.id for user in User.query.order_by(User.id)]
+    event = Event(name='Concurrency', date=datetime(2024, 1, 1), location='Here', description='d', user_id=user_ids[0])
+    db.session.add(event)
+    db.session.flush()
+    db.session.execute(insert(EventInvitation), [
+        {'event_id': event.id, 'inviter_id': user_ids[0], 'invitee_id': user_id, 'status': 'Accepted'}
+        for user_id in user_ids[:-1]
+    ])
+    db.session.commit()
+    return event.id, user_ids[:-1], user_ids[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--repeats', type=int, default=8, help='parallel RSVPs per user')
+    args = parser.parse_args()
+
+    with app.app_context():
+        event_id, user_ids, outsider = seed(args.users)
+        tokens = {user_id: create_access_token(identity=str(user_id)) for user_id in user_ids + [outsider]}
+
+    app.config['JWT_COOKIE_CSRF_PROTECT'] = False
+    jobs = [(user_id, random.choice(STATUSES)) for user_id in user_ids for _ in range(args.repeats)]
+    jobs += [(outsider, 'Going')] * args.repeats
+    random.shuffle(jobs)
+
+    submitted = {}
+    responses = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(len(jobs))
+
+    def submit(user_id, status):
+        client = app.test_client()
+        client.set_cookie('access_token_cookie', tokens[user_id])
+        start.wait()
+        response = client.post('/api/rsvps', json={'event_id': event_id, 'status': status})
+        with lock:
+            responses[response.status_code] += 1
+            if response.status_code == 201:
+                submitted.setdefault(user_id, set()).add(status)
+
+    threads = [threading.Thread(target=submit, args=job) for job in jobs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    failures = []
+    with app.app_context():
+        rows = RSVP.query.filter_by(event_id=event_id).all()
+        dialect = db.engine.dialect.name
+    per_user = Counter(row.user_id for row in rows)
+
+    if responses[201] != len(user_ids) * args.repeats:
+        failures.append(f"expected {len(user_ids) * args.repeats} successful RSVPs, got {responses[201]}")
+    if responses[403] != args.repeats:
+        failures.append(f"expected {args.repeats} refusals for the uninvited user, got {responses[403]}")
+    duplicated = [user_id for user_id, count in per_user.items() if count > 1]
+    if duplicated:
+        failures.append(f"{len(duplicated)} user(s) with more than one RSVP row")
+    if set(per_user) != set(user_ids):
+        failures.append(f"{len(set(user_ids) - set(per_user))} user(s) without an RSVP row")
+    if outsider in per_user:
+        failures.append("the uninvited user got an RSVP row")
+    wrong = [row.user_id for row in rows if row.status not in submitted.get(row.user_id, ())]
+    if wrong:
+        failures.append(f"{len(wrong)} row(s) with a status their user never submitted")
+
+    print(f"{len(jobs)} parallel RSVPs from {len(user_ids) + 1} users on {dialect}")
+    print(f"responses: {dict(sorted(responses.items()))}, rows: {len(rows)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    print("ok" if not failures else f"{len(failures)} check(s) failed")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Microbenchmark comparing the compiled serializers against SerializerMixin.to_dict.
+
+Run from the server directory:
+    python -m benchmarks.serializers --count 10000
+"""
+import argparse
+from datetime import datetime
+from timeit import default_timer as timer
+from models import User, Event, RSVP, Comment
+from serializers import serialize_event, serialize_user
+
+EVENT_RULES = ('-user.events', '-rsvps.event', '-comments.event', '-invitations.event')
+USER_RULES = ('-events', '-rsvps', '-groups', '-sent_event_invitations', '-received_event_invitations')
+
+
+def build_objects(count):
+    """
+    Build transient users and events (each with an owner, two RSVPs and two comments)
+    so the benchmark measures serialization only, without any database access.
+    """
+    users = [User(id=i, username=f"user{i}", email=f"user{i}@example.com") for i in range(count)]
+    events = []
+    for i in range(count):
+        event = Event(
+            id=i,
+            name=f"Event {i}",
+            date=datetime(2024, 1, 1 + i % 28, 18, 30),
+            location="Denver",
+            description="Benchmark event",
+            user=users[i],
+        )
+        for j in range(2):
+            attendee = users[(i + j + 1) % count]
+            event.rsvps.append(RSVP(id=i * 2 + j, user=attendee, status="Confirmed"))
+            event.comments.append(Comment(id=i * 2 + j, content="See you there", user=attendee))
+        events.append(event)
+    return users, events
+
+
+def measure(label, func, objects):
+    start = timer()
+    for obj in objects:
+        func(obj)
+    elapsed = timer() - start
+    print(f"{label:<28} {elapsed * 1000:10.1f} ms  {elapsed / len(objects) * 1e6:8.2f} us/object")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=10000, help="Number of objects to serialize")
+    args = parser.parse_args()
+
+    users, events = build_objects(args.count)
+
+    for name, objects, rules, compiled in (
+        ("User", users, USER_RULES, serialize_user),
+        ("Event", events, EVENT_RULES, serialize_event),
+    ):
+        for obj in objects:
+            assert compiled(obj) == obj.to_dict(rules=rules), f"{name} {obj.id} serializes differently"
+        print(f"{name} x {len(objects)}")
+        baseline = measure("  SerializerMixin.to_dict", lambda obj: obj.to_dict(rules=rules), objects)
+        optimized = measure("  compiled serializer", compiled, objects)
+        print(f"  speedup: {baseline / optimized:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
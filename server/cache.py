@@ -0,0 +1,205 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from config import app
+from versioning import on_commit
+
+SLOT = struct.Struct('Q')
+
+
+class VersionTable:
+    """
+    Fixed-size table of counters in a memory-mapped file shared by every worker
+    process on the host. Each cache key hashes to a slot; a commit bumps the slots
+    of the keys it invalidates, and a cached entry is only served while its slot
+    still holds the value read before the entry was loaded. Invalidation is
+    therefore visible to all workers as soon as the committing request returns,
+    without any messages to deliver.
+
+    The file is opened lazily in each process, so the mapping and the lock are
+    never shared across a gunicorn fork. An empty DETAIL_CACHE_BUS keeps the
+    table private to the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._pid = None
+        self._file = None
+        self._map = None
+
+    @property
+    def slots(self):
+        return app.config['DETAIL_CACHE_SLOTS']
+
+    def path(self):
+        """
+        The shared file, or '' when DETAIL_CACHE_BUS keeps each worker private.
+        """
+        path = app.config['DETAIL_CACHE_BUS']
+        if path is None:
+            # Workers serving the same database share a table by default
+            uri = app.config['SQLALCHEMY_DATABASE_URI'] or ''
+            digest = hashlib.sha1(uri.encode('utf-8')).hexdigest()[:12]
+            path = os.path.join(tempfile.gettempdir(), f'event-manager-cache-{digest}.bin')
+        return path
+
+    def _get_map(self):
+        with self._lock:
+            if self._map is None or self._pid != os.getpid():
+                self._open()
+            return self._map
+
+    def _open(self):
+        size = self.slots * SLOT.size
+        path = self.path()
+        if path:
+            self._file = open(path, 'a+b')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._file.fileno()).st_size < size:
+                    self._file.truncate(size)
+            finally:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        else:
+            self._file = None
+            self._map = mmap.mmap(-1, size)
+        self._pid = os.getpid()
+
+    def slot(self, key):
+        return zlib.crc32(key.encode('utf-8')) % self.slots
+
+    def read(self, slot):
+        return SLOT.unpack_from(self._get_map(), slot * SLOT.size)[0]
+
+    def bump(self, slots):
+        """
+        Increment each slot and return {slot: new value}. Writers serialize on a
+        file lock so concurrent commits in different workers never lose an increment.
+        """
+        bumped = {}
+        with self._lock:
+            table = self._get_map()
+            if self._file is not None:
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                for slot in set(slots):
+                    offset = slot * SLOT.size
+                    bumped[slot] = (SLOT.unpack_from(table, offset)[0] + 1) % 2 ** 64
+                    SLOT.pack_into(table, offset, bumped[slot])
+            finally:
+                if self._file is not None:
+                    fcntl.flock(self._file, fcntl.LOCK_UN)
+        return bumped
+
+
+versions = VersionTable()
+
+
+class DetailCache:
+    """
+    Size-bounded LRU of serialized detail payloads keyed by entity id. Entries
+    expire after DETAIL_CACHE_TTL seconds as a backstop; normally they are
+    invalidated in every worker as soon as a commit touches the entity.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _slot(self, id_):
+        return versions.slot(f'{self.name}:{id_}')
+
+    def generation(self, id_):
+        """
+        Read before loading a payload on a miss and hand back to set(), so a
+        payload loaded while any worker invalidated the id is not stored.
+        """
+        return versions.read(self._slot(id_))
+
+    def get(self, id_):
+        """
+        The cached (stamp, payload) for an id, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(id_)
+            if entry is not None:
+                if entry[0] < time.monotonic():
+                    del self._entries[id_]
+                    self.evictions += 1
+                    entry = None
+                elif entry[1] != self.generation(id_):
+                    del self._entries[id_]
+                    self.invalidations += 1
+                    entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(id_)
+            self.hits += 1
+            return entry[2], entry[3]
+
+    def set(self, id_, stamp, payload, generation):
+        max_size = app.config['DETAIL_CACHE_SIZE']
+        if max_size <= 0 or generation != self.generation(id_):
+            return
+        expires_at = time.monotonic() + app.config['DETAIL_CACHE_TTL']
+        with self._lock:
+            self._entries[id_] = (expires_at, generation, stamp, payload)
+            self._entries.move_to_end(id_)
+            while len(self._entries) > max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, ids):
+        """
+        Bump the shared version of each id, then drop any local copies.
+        """
+        if not ids:
+            return
+        versions.bump(self._slot(id_) for id_ in ids)
+        with self._lock:
+            for id_ in ids:
+                if self._entries.pop(id_, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': app.config['DETAIL_CACHE_SIZE'],
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+event_details = DetailCache('event_detail')
+group_details = DetailCache('group_detail')
+
+CACHES = (event_details, group_details)
+
+
+@on_commit
+def apply_invalidations(events, groups):
+    event_details.invalidate(events)
+    group_details.invalidate(groups)
@@ -41,7 +41,7 @@ app.config['JWT_COOKIE_SECURE'] = True  # Enforces secure cookies over HTTPS cha
 app.config['JWT_COOKIE_SAMESITE'] = 'Lax'  # Required for cross-site cookie sharing changed to Lax for development, None for production
 app.config['JWT_COOKIE_HTTPONLY'] = True  # Prevents JavaScript from accessing cookies changed to false for development
 app.config['JWT_ACCESS_COOKIE_PATH'] = '/'  # Path for access tokens
-app.config['JWT_REFRESH_COOKIE_PATH'] = '/token/refresh'  # Path for refresh tokens
+app.config['JWT_REFRESH_COOKIE_PATH'] = '/api/token/refresh'  # Path for refresh tokens
 app.config['JWT_COOKIE_CSRF_PROTECT'] = True  # always true Enable CSRF protection in production and development
 app.config['JWT_CSRF_IN_COOKIES'] = True  # Ensures CSRF token is stored and validated in cookies
 app.config['JWT_CSRF_CHECK_FORM'] = True  # Ensure forms are checked for CSRF tokens in production
@@ -53,6 +53,40 @@ app.config['JWT_REFRESH_CSRF_COOKIE_NAME'] = 'jwt_csrf_refresh'
 
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)  # Access tokens expire in 1 hour
 app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=7)  # Refresh tokens expire in 7 days
+app.config['JWT_REFRESH_REUSE_GRACE'] = timedelta(seconds=10)  # Concurrent refreshes from several tabs within this window are not treated as reuse
+
+# Password hashing: bcrypt work factor and the bounded process pool that runs it
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))  # Changing this rehashes passwords on next login
+app.config['BCRYPT_POOL_SIZE'] = int(os.getenv('BCRYPT_POOL_SIZE', 2))  # Hashing processes per worker, 0 hashes in-process
+app.config['BCRYPT_MAX_QUEUE'] = int(os.getenv('BCRYPT_MAX_QUEUE', 4))  # Hashes in flight per worker before requests fail fast with 503; keep it below gunicorn's --threads
+
+# Per-worker cache of event and group detail payloads, invalidated in every worker on commit
+app.config['DETAIL_CACHE_SIZE'] = int(os.getenv('DETAIL_CACHE_SIZE', 1024))  # Entries per cache and worker, 0 disables caching
+app.config['DETAIL_CACHE_TTL'] = float(os.getenv('DETAIL_CACHE_TTL', 300))  # Seconds before an entry is reloaded even without a write
+app.config['DETAIL_CACHE_BUS'] = os.getenv('DETAIL_CACHE_BUS')  # File of version counters shared by the workers, empty keeps each worker's cache private
+app.config['DETAIL_CACHE_SLOTS'] = int(os.getenv('DETAIL_CACHE_SLOTS', 65536))  # Counters in that file; ids sharing one are invalidated together
+
+# Per-request SQL statistics as a Server-Timing header and a structured log line
+app.config['SQL_INSTRUMENTATION'] = os.getenv('SQL_INSTRUMENTATION', 'false').lower() in ('1', 'true', 'yes')  # Read at startup; when off no hooks are installed
+
+# Slow-query log: statements over a threshold, logged with parameters, source line and plan
+app.config['SLOW_QUERY_MS'] = float(os.getenv('SLOW_QUERY_MS', 0))  # Milliseconds; read at startup, 0 installs no hooks
+app.config['SLOW_QUERY_FINGERPRINTS'] = int(os.getenv('SLOW_QUERY_FINGERPRINTS', 500))  # Statement shapes each worker keeps counts and plans for
+
+# Query budgets: fail requests that issue more statements than their Resource declares (for tests)
+app.config['QUERY_BUDGETS'] = os.getenv('QUERY_BUDGETS', 'false').lower() in ('1', 'true', 'yes')  # Read at startup; records a stack per statement, so keep it off in production
+app.config['QUERY_BUDGET_STRICT'] = os.getenv('QUERY_BUDGET_STRICT', 'false').lower() in ('1', 'true', 'yes')  # Also fail lazy loads of relationships marked info={'raiseload': True}
+
+# Sampling profiler: collapsed stacks of some requests, for flame graphs (see profiler.py)
+app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv('PROFILE_SAMPLE_RATE', 0))  # Fraction of requests profiled, e.g. 0.01; read at startup
+app.config['PROFILE_TOKEN'] = os.getenv('PROFILE_TOKEN')  # Secret that profiles any request sending it as X-Profile; unset disables the header
+app.config['PROFILE_INTERVAL'] = float(os.getenv('PROFILE_INTERVAL', 0.005))  # Seconds between samples of a profiled request
+app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR')  # Where profiles are written, by default event-manager-profiles in the temp directory
+
+# Prometheus metrics at /metrics, summed over the workers through one memory-mapped file each
+app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'false').lower() in ('1', 'true', 'yes')  # Read at startup; off by default, when off no hooks are installed and /metrics is 404
+app.config['METRICS_DIR'] = os.getenv('METRICS_DIR')  # Directory of the worker files, by default in the temp directory; clear it when the server restarts
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')  # Bearer token a scraper must send; unset only accepts requests from localhost
 
 # Optional: CSRF Protection for Flask-WTF
 # Uncomment if using Flask-WTF for forms
@@ -70,8 +104,8 @@ api = Api(app)
 
 
 #Development
-#CORS(app, supports_credentials=True, origins=["http://localhost:5173"])
+#CORS(app, supports_credentials=True, origins=["http://localhost:5173"], expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"])
 #Make sure the CORS origins match your frontend URL
 
 #Production
-CORS(app, supports_credentials=True, origins=["https://event-manager-dtae.onrender.com"])
\ No newline at end of file
+CORS(app, supports_credentials=True, origins=["https://event-manager-dtae.onrender.com"], expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"])
\ No newline at end of file
@@ -0,0 +1,111 @@
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+from flask import request, has_request_context
+from werkzeug.exceptions import ServiceUnavailable
+from config import app
+
+
+class HashingBusy(ServiceUnavailable):
+    description = "Server is busy, please try again shortly"
+
+
+# Pool jobs are pickled by reference, so they stay module-level functions the
+# forkserver's children can import
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password, password_hash):
+    return bcrypt.checkpw(password, password_hash)
+
+
+class HashingExecutor:
+    """
+    Size-bounded process pool for bcrypt work. Jobs beyond BCRYPT_MAX_QUEUE in
+    flight are rejected immediately with HashingBusy instead of piling up behind
+    the request workers. The pool is created lazily in each process, so it is
+    never shared across a gunicorn fork.
+
+    The limit counts the hashes of one worker process, so it needs a worker that
+    serves several requests at once: gunicorn's gthread workers (see Procfile),
+    with BCRYPT_MAX_QUEUE below --threads so the remaining threads keep serving
+    other requests while some wait on a hash. A sync worker has a single request
+    in flight, which blocks on the hash however the pool is sized; a warning is
+    logged once when hashing runs under a single-threaded server.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        self._in_flight = 0
+        self._checked_server = False
+
+    @property
+    def queue_depth(self):
+        return self._in_flight
+
+    def _get_pool(self):
+        if self._pool is None or self._pid != os.getpid():
+            # Forked from a clean server process rather than from this one: a fork of a
+            # threaded worker can inherit a lock another thread held and deadlock
+            self._pool = ProcessPoolExecutor(
+                max_workers=app.config['BCRYPT_POOL_SIZE'], mp_context=multiprocessing.get_context('forkserver')
+            )
+            self._pid = os.getpid()
+        return self._pool
+
+    def _check_server(self):
+        self._checked_server = True
+        if has_request_context() and not request.environ.get('wsgi.multithread'):
+            app.logger.warning(
+                'Password hashing runs under a single-threaded worker, so BCRYPT_MAX_QUEUE cannot '
+                'take effect and every hash blocks the worker; run gunicorn with --worker-class gthread'
+            )
+
+    def run(self, func, *args):
+        if not self._checked_server:
+            self._check_server()
+        with self._lock:
+            if self._in_flight >= app.config['BCRYPT_MAX_QUEUE']:
+                raise HashingBusy()
+            self._in_flight += 1
+            pool = self._get_pool() if app.config['BCRYPT_POOL_SIZE'] > 0 else None
+
+        try:
+            if pool is None:
+                return func(*args)
+            return pool.submit(func, *args).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+
+executor = HashingExecutor()
+
+
+def hash_password(password):
+    """
+    Hash a password with the configured work factor off the request thread.
+    """
+    rounds = app.config['BCRYPT_LOG_ROUNDS']
+    return executor.run(_hashpw, password.encode('utf-8'), rounds).decode('utf-8')
+
+
+def verify_password(password, password_hash):
+    """
+    Check a password against a stored bcrypt hash off the request thread.
+    """
+    return executor.run(_checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def needs_rehash(password_hash):
+    """
+    True when a stored hash was made with a different work factor than configured.
+    """
+    match = re.match(r'^\$2[abxy]?\$(\d{2})\$', password_hash or '')
+    return match is None or int(match.group(1)) != app.config['BCRYPT_LOG_ROUNDS']
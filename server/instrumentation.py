@@ -0,0 +1,127 @@
+import json
+import logging
+import time
+from flask import g, request, has_request_context
+from config import app
+from statement_hooks import subscribe
+
+
+class RequestSQL:
+    """
+    SQL statements, database time and rows of the current request.
+    """
+    __slots__ = ('started', 'statements', 'seconds', 'rows', 'status')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.status = None
+
+
+class CountingCursor:
+    """
+    A DB-API cursor that adds the rows fetched through it to a request's count.
+    """
+    __slots__ = ('_cursor', '_stats')
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _current():
+    return g.get('request_sql') if has_request_context() else None
+
+
+def _after_statement(conn, cursor, statement, parameters, context, executemany, elapsed):
+    stats = _current()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+        if cursor.description is None:
+            stats.rows += max(cursor.rowcount, 0)
+        elif context is not None:
+            # rowcount is -1 for a SQLite SELECT, so rows read are counted as they are
+            # fetched; the result SQLAlchemy builds next reads through this cursor
+            context.cursor = CountingCursor(cursor, stats)
+
+
+def _start():
+    g.request_sql = RequestSQL()
+
+
+def resource_name():
+    """
+    The Resource class serving the current request, or its endpoint for plain views.
+    """
+    view_class = getattr(app.view_functions.get(request.endpoint), 'view_class', None)
+    return view_class.__name__ if view_class is not None else request.endpoint
+
+
+def _server_timing(response):
+    stats = _current()
+    if stats is not None:
+        stats.status = response.status_code
+        # Queries a streamed body runs later are only in the log line
+        total = (time.perf_counter() - stats.started) * 1000
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={stats.seconds * 1000:.2f};desc="{stats.statements} queries, {stats.rows} rows", app;dur={total:.2f}'
+        )
+    return response
+
+
+def _log(exc):
+    stats = g.pop('request_sql', None)
+    if stats is None:
+        return
+    app.logger.info(json.dumps({
+        'event': 'request_sql',
+        'resource': resource_name(),
+        'endpoint': request.endpoint,
+        'method': request.method,
+        'path': request.path,
+        'status': stats.status if exc is None else 500,
+        'queries': stats.statements,
+        'db_ms': round(stats.seconds * 1000, 2),
+        'rows': stats.rows,
+        'duration_ms': round((time.perf_counter() - stats.started) * 1000, 2),
+    }))
+
+
+def install():
+    """
+    Count every statement against the request that issued it. The line is logged
+    once the request context is torn down, after any streamed body has been sent.
+    """
+    subscribe(after=_after_statement)
+    app.before_request(_start)
+    app.after_request(_server_timing)
+    app.teardown_request(_log)
+    if not app.logger.isEnabledFor(logging.INFO):
+        app.logger.setLevel(logging.INFO)
+
+
+if app.config['SQL_INSTRUMENTATION']:
+    install()
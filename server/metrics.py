@@ -0,0 +1,353 @@
+import glob
+import hashlib
+import hmac
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+from config import app, db
+
+HEADER = struct.Struct('Q')
+KEY_LENGTH = struct.Struct('I')
+VALUE = struct.Struct('d')
+INITIAL_SIZE = 64 * 1024
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CHECKOUT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+def metrics_dir():
+    path = app.config['METRICS_DIR']
+    if not path:
+        # Workers serving the same database share a directory by default
+        uri = app.config['SQLALCHEMY_DATABASE_URI'] or ''
+        digest = hashlib.sha1(uri.encode('utf-8')).hexdigest()[:12]
+        path = os.path.join(tempfile.gettempdir(), f'event-manager-metrics-{digest}')
+    return path
+
+
+class WorkerFile:
+    """
+    Samples of one worker process in a memory-mapped file named after its pid.
+    Entries are appended as (key length, key, value) and the used size in the
+    header is written last, so a scrape in another worker only ever reads whole
+    entries. Only the owning process writes, so no cross-process lock is needed.
+    The file is opened lazily in each process, so a gunicorn fork gets its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._file = None
+        self._map = None
+        self._used = 0
+        self._offsets = {}
+
+    def _open(self):
+        directory = metrics_dir()
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(os.path.join(directory, f'{os.getpid()}.db'), 'w+b')
+        self._file.truncate(INITIAL_SIZE)
+        self._map = mmap.mmap(self._file.fileno(), INITIAL_SIZE)
+        self._used = HEADER.size
+        HEADER.pack_into(self._map, 0, self._used)
+        self._offsets = {}
+        self._pid = os.getpid()
+
+    def _offset(self, key):
+        if self._pid != os.getpid():
+            self._open()
+        offset = self._offsets.get(key)
+        if offset is None:
+            encoded = key.encode('utf-8')
+            padded = encoded + b' ' * (-(KEY_LENGTH.size + len(encoded)) % 8)
+            size = KEY_LENGTH.size + len(padded) + VALUE.size
+            if self._used + size > len(self._map):
+                capacity = len(self._map) * 2
+                while self._used + size > capacity:
+                    capacity *= 2
+                self._map.close()
+                self._file.truncate(capacity)
+                self._map = mmap.mmap(self._file.fileno(), capacity)
+            KEY_LENGTH.pack_into(self._map, self._used, len(padded))
+            self._map[self._used + KEY_LENGTH.size:self._used + KEY_LENGTH.size + len(padded)] = padded
+            offset = self._used + KEY_LENGTH.size + len(padded)
+            VALUE.pack_into(self._map, offset, 0.0)
+            self._used += size
+            HEADER.pack_into(self._map, 0, self._used)
+            self._offsets[key] = offset
+        return offset
+
+    def add(self, key, amount):
+        self.add_many(((key, amount),))
+
+    def add_many(self, amounts):
+        """
+        Add each (key, amount) pair under one acquisition of the lock.
+        """
+        with self._lock:
+            for key, amount in amounts:
+                offset = self._offset(key)
+                VALUE.pack_into(self._map, offset, VALUE.unpack_from(self._map, offset)[0] + amount)
+
+    def set(self, key, value):
+        with self._lock:
+            VALUE.pack_into(self._map, self._offset(key), value)
+
+
+worker_file = WorkerFile()
+
+
+def read_samples(path):
+    """
+    {key: value} of every complete entry in a worker file.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    samples = {}
+    if len(data) < HEADER.size:
+        return samples
+    used = min(HEADER.unpack_from(data, 0)[0], len(data))
+    position = HEADER.size
+    while position + KEY_LENGTH.size <= used:
+        length = KEY_LENGTH.unpack_from(data, position)[0]
+        key_end = position + KEY_LENGTH.size + length
+        if key_end + VALUE.size > used:
+            break
+        key = data[position + KEY_LENGTH.size:key_end].rstrip(b' ').decode('utf-8')
+        samples[key] = VALUE.unpack_from(data, key_end)[0]
+        position = key_end + VALUE.size
+    return samples
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Metric:
+    """
+    A metric family. Samples are stored under a JSON key of (family, suffix, labels).
+    """
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def _key(self, suffix, labels, extra=()):
+        return json.dumps([self.name, suffix, [[name, str(labels[name])] for name in self.labelnames] + list(extra)])
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        worker_file.add(self._key('', labels), amount)
+
+    def set(self, value, **labels):
+        """
+        Mirror a count this worker already keeps, e.g. cache hits.
+        """
+        worker_file.set(self._key('', labels), value)
+
+
+class Gauge(Metric):
+    """
+    Summed over live workers only; the last value of an exited worker is dropped.
+    """
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        worker_file.add(self._key('', labels), amount)
+
+    def set(self, value, **labels):
+        worker_file.set(self._key('', labels), value)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        # Buckets are stored cumulatively, as they are exposed. Every bucket is written,
+        # the ones above the value with 0, so a label set always exposes all of them
+        amounts = [
+            (self._key('_bucket', labels, [['le', repr(bound)]]), 1 if value <= bound else 0)
+            for bound in self.buckets
+        ]
+        amounts.append((self._key('_bucket', labels, [['le', '+Inf']]), 1))
+        amounts.append((self._key('_sum', labels), value))
+        amounts.append((self._key('_count', labels), 1))
+        worker_file.add_many(amounts)
+
+
+REGISTRY = []
+
+request_duration = Histogram(
+    'http_request_duration_seconds', 'Time to build a response, by Resource class and method', ('resource', 'method')
+)
+requests_total = Counter('http_requests_total', 'Responses by Resource class, method and status code', ('resource', 'method', 'status'))
+pool_checkout = Histogram(
+    'db_pool_checkout_seconds', 'Time to check a database connection out of the pool', buckets=CHECKOUT_BUCKETS
+)
+pool_in_use = Gauge('db_pool_connections_in_use', 'Database connections currently checked out')
+bcrypt_queue = Gauge('bcrypt_queue_depth', 'Password hashes in flight, as of each worker\'s last request')
+cache_hits = Counter('detail_cache_hits_total', 'Detail cache hits', ('cache',))
+cache_misses = Counter('detail_cache_misses_total', 'Detail cache misses', ('cache',))
+
+
+def collect():
+    """
+    Samples summed over every worker file, as {(family, suffix, labels): value}.
+    """
+    kinds = {metric.name: metric.kind for metric in REGISTRY}
+    totals = {}
+    for path in glob.glob(os.path.join(metrics_dir(), '*.db')):
+        try:
+            pid = int(os.path.basename(path)[:-3])
+            samples = read_samples(path)
+        except (ValueError, OSError):
+            continue
+        alive = _alive(pid)
+        for key, value in samples.items():
+            name, suffix, labels = json.loads(key)
+            if kinds.get(name) == 'gauge' and not alive:
+                continue
+            sample = (name, suffix, tuple(tuple(label) for label in labels))
+            totals[sample] = totals.get(sample, 0.0) + value
+    return totals
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format(name, labels, value):
+    label_text = ','.join(f'{key}="{_escape(label)}"' for key, label in labels)
+    return f'{name}{{{label_text}}} {value!r}' if label_text else f'{name} {value!r}'
+
+
+def render():
+    """
+    Every metric of every worker in the Prometheus text exposition format.
+    """
+    sample_state()
+    totals = collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        samples = [(suffix, labels, value) for (name, suffix, labels), value in totals.items() if name == metric.name]
+        for suffix, labels, value in sorted(samples, key=_sample_order):
+            lines.append(_format(metric.name + suffix, labels, value))
+
+    # Derived from the summed counters, so the ratio covers every worker
+    lines.append('# HELP detail_cache_hit_ratio Detail cache hits over lookups since the workers started')
+    lines.append('# TYPE detail_cache_hit_ratio gauge')
+    for (name, _, labels), hits in sorted(totals.items()):
+        if name == cache_hits.name:
+            lookups = hits + totals.get((cache_misses.name, '', labels), 0.0)
+            lines.append(_format('detail_cache_hit_ratio', labels, hits / lookups if lookups else 0.0))
+    return '\n'.join(lines) + '\n'
+
+
+def _sample_order(sample):
+    suffix, labels, _ = sample
+    plain = tuple(label for label in labels if label[0] != 'le')
+    bound = dict(labels).get('le')
+    return plain, suffix, float(bound) if bound is not None else 0.0
+
+
+def sample_state():
+    """
+    Record this worker's bcrypt queue and cache counters, which live elsewhere.
+    """
+    from cache import CACHES
+    from hashing import executor
+
+    bcrypt_queue.set(executor.queue_depth)
+    for cache in CACHES:
+        cache_hits.set(cache.hits, cache=cache.name)
+        cache_misses.set(cache.misses, cache=cache.name)
+
+
+def authorized():
+    """
+    A scrape must carry METRICS_TOKEN as a bearer token, or come from localhost when none is set.
+    """
+    token = app.config['METRICS_TOKEN']
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        return hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {token}'.encode('utf-8'))
+    return request.remote_addr in ('127.0.0.1', '::1')
+
+
+def _time_checkouts(pool):
+    if getattr(pool, '_metrics_timed', False):
+        return
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            pool_checkout.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+    pool._metrics_timed = True
+
+
+def _start():
+    g.metrics_started = time.perf_counter()
+    # Engines are created lazily and replaced on dispose, so check on each request
+    _time_checkouts(db.engine.pool)
+
+
+def _record(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        from instrumentation import resource_name
+
+        resource = resource_name() or 'unmatched'
+        request_duration.observe(time.perf_counter() - started, resource=resource, method=request.method)
+        requests_total.inc(resource=resource, method=request.method, status=response.status_code)
+        sample_state()
+    return response
+
+
+def _checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_in_use.inc()
+
+
+def _checkin(dbapi_connection, connection_record):
+    pool_in_use.inc(-1)
+
+
+def install():
+    event.listen(Pool, 'checkout', _checkout)
+    event.listen(Pool, 'checkin', _checkin)
+    app.before_request(_start)
+    app.after_request(_record)
+
+
+if app.config['METRICS_ENABLED']:
+    install()
@@ -0,0 +1,50 @@
+"""Add full-text search index
+
+Revision ID: 5d2c8e41b7a9
+Revises: aa7af00ef4a7
+Create Date: 2026-10-18 10:12:41.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2c8e41b7a9'
+down_revision = 'aa7af00ef4a7'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_SELECTS = (
+    "SELECT id * 4 + 1, 'event', id, name, description || ' ' || location FROM events",
+    "SELECT id * 4 + 2, 'group', id, name, description FROM groups",
+    "SELECT id * 4 + 3, 'user', id, username, '' FROM users",
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE search_index ("
+            "doc_id BIGINT PRIMARY KEY, kind VARCHAR(10) NOT NULL, ref_id INTEGER NOT NULL, "
+            "title TEXT NOT NULL, body TEXT NOT NULL, "
+            "document TSVECTOR GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', title), 'A') || "
+            "setweight(to_tsvector('english', body), 'B')) STORED)"
+        )
+        op.execute("CREATE INDEX ix_search_index_document ON search_index USING GIN (document)")
+        key = 'doc_id'
+    else:
+        op.execute(
+            "CREATE VIRTUAL TABLE search_index USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize='unicode61 remove_diacritics 2')"
+        )
+        key = 'rowid'
+
+    for backfill in BACKFILL_SELECTS:
+        op.execute(f"INSERT INTO search_index ({key}, kind, ref_id, title, body) {backfill}")
+
+
+def downgrade():
+    op.execute("DROP TABLE search_index")
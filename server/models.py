@@ -2,7 +2,7 @@ from sqlalchemy_serializer import SerializerMixin
 from config import db
 from sqlalchemy.orm import validates
 import re
-import bcrypt
+from hashing import hash_password, verify_password, needs_rehash
 from datetime import datetime, timezone
 
 
@@ -10,26 +10,30 @@ from datetime import datetime, timezone
 group_member = db.Table(
     'group_member',
     db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
-    db.Column('group_id', db.Integer, db.ForeignKey('groups.id'), primary_key=True)
+    db.Column('group_id', db.Integer, db.ForeignKey('groups.id'), primary_key=True, index=True)
 )
 
 event_invitation = db.Table(
     'event_invitation',
     db.Column('event_id', db.Integer, db.ForeignKey('events.id'), primary_key=True),
-    db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True, index=True)
 )
 
 class GroupInvitation(db.Model, SerializerMixin):
     __tablename__ = 'group_invitations'
+    __table_args__ = (
+        db.UniqueConstraint('group_id', 'invited_user_id'),
+        db.Index('ix_group_invitations_invited_user_id_status_id', 'invited_user_id', 'status', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     group_id = db.Column(db.Integer, db.ForeignKey('groups.id'), nullable=False)
-    inviter_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    inviter_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     invited_user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.String(20), nullable=False, default='pending')
 
-    group = db.relationship('Group', back_populates='invitations')
-    inviter = db.relationship('User', foreign_keys=[inviter_id], back_populates='sent_group_invitations')
-    invitee = db.relationship('User', foreign_keys=[invited_user_id], back_populates='received_group_invitations')
+    group = db.relationship('Group', back_populates='invitations', info={'raiseload': True})
+    inviter = db.relationship('User', foreign_keys=[inviter_id], back_populates='sent_group_invitations', info={'raiseload': True})
+    invitee = db.relationship('User', foreign_keys=[invited_user_id], back_populates='received_group_invitations', info={'raiseload': True})
 
     serialize_rules = (
         '-group',
@@ -89,6 +93,7 @@ class User(db.Model, SerializerMixin):
         secondary=event_invitation,
         back_populates="invited_users"
     )
+    refresh_tokens = db.relationship('RefreshToken', back_populates='user', cascade="all, delete-orphan")
 
     serialize_rules = (
         '-password_hash',
@@ -101,7 +106,8 @@ class User(db.Model, SerializerMixin):
         '-sent_event_invitations',  # Block entire relation
         '-received_event_invitations',  # Block entire relation
         '-invited_events',
-        '-invited_events'
+        '-invited_events',
+        '-refresh_tokens'
     )
 
 
@@ -146,10 +152,17 @@ class User(db.Model, SerializerMixin):
     @password.setter
     def password(self, password):
         self._original_password = password
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return verify_password(password, self.password_hash)
+
+    def upgrade_password_hash(self, password):
+        """Re-hash a verified password if it was stored with a different work factor."""
+        if needs_rehash(self.password_hash):
+            self.password = password
+            return True
+        return False
 
     def add_group(self, group):
         """Add the user to a group."""
@@ -166,29 +179,48 @@ class Group(db.Model, SerializerMixin):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc)  # Also bumped when members or invitations change
+    )
 
-    members = db.relationship('User', secondary=group_member, back_populates='groups')
+    members = db.relationship('User', secondary=group_member, back_populates='groups', info={'raiseload': True})
     invitations = db.relationship('GroupInvitation', back_populates='group', cascade="all, delete-orphan")
 
-    serialize_rules = ('-members.groups', '-invitations.group')
+    serialize_rules = ('-members.groups', '-invitations.group', '-updated_at')
 
 class Event(db.Model, SerializerMixin):
     __tablename__ = 'events'
+    __table_args__ = (
+        db.Index('ix_events_date_id', 'date', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), nullable=False)
     date = db.Column(db.DateTime, nullable=False)
     location = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc)  # Also bumped when comments, RSVPs or invitations change
+    )
 
-    user = db.relationship('User', back_populates='events')
-    comments = db.relationship('Comment', back_populates='event', cascade="all, delete-orphan")
-    rsvps = db.relationship('RSVP', back_populates='event', cascade="all, delete-orphan")
+    # Relationships marked raiseload are serialized with every event, group or
+    # invitation in a list; with QUERY_BUDGET_STRICT set, loading one lazily fails
+    # the request (see query_budget.py), so list queries must name it in a load plan
+    user = db.relationship('User', back_populates='events', info={'raiseload': True})
+    comments = db.relationship('Comment', back_populates='event', cascade="all, delete-orphan", info={'raiseload': True})
+    rsvps = db.relationship('RSVP', back_populates='event', cascade="all, delete-orphan", info={'raiseload': True})
     invited_users = db.relationship(
         'User',
         secondary=event_invitation,
-        back_populates="invited_events"
+        back_populates="invited_events",
+        info={'raiseload': True}
     )
     invitations = db.relationship('EventInvitation', back_populates='event', cascade="all, delete-orphan")
 
@@ -198,14 +230,19 @@ class Event(db.Model, SerializerMixin):
         '-rsvps.event',
         '-invitations',  # Block entire invitations relationship
         '-invited_users.events',
-        '-invited_users.invited_events'
+        '-invited_users.invited_events',
+        '-updated_at'
     )
 
 class EventInvitation(db.Model, SerializerMixin):
     __tablename__ = 'event_invitations'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'invitee_id'),
+        db.Index('ix_event_invitations_invitee_id_status_id', 'invitee_id', 'status', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
-    inviter_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    inviter_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     invitee_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     status = db.Column(db.String(20), nullable=False, default="Pending")
     created_at = db.Column(
@@ -220,9 +257,9 @@ class EventInvitation(db.Model, SerializerMixin):
         onupdate=lambda: datetime.now(timezone.utc)  # Automatically update on modification
     )
 
-    event = db.relationship('Event', back_populates='invitations')
-    inviter = db.relationship('User', foreign_keys=[inviter_id], back_populates='sent_event_invitations')
-    invitee = db.relationship('User', foreign_keys=[invitee_id], back_populates='received_event_invitations')
+    event = db.relationship('Event', back_populates='invitations', info={'raiseload': True})
+    inviter = db.relationship('User', foreign_keys=[inviter_id], back_populates='sent_event_invitations', info={'raiseload': True})
+    invitee = db.relationship('User', foreign_keys=[invitee_id], back_populates='received_event_invitations', info={'raiseload': True})
 
     serialize_rules = (
         '-event',  # Block entire event relationship
@@ -233,24 +270,62 @@ class EventInvitation(db.Model, SerializerMixin):
 
 class RSVP(db.Model, SerializerMixin):
     __tablename__ = 'rsvps'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'user_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
     status = db.Column(db.String(20), nullable=False)
 
-    user = db.relationship('User', back_populates='rsvps')
+    user = db.relationship('User', back_populates='rsvps', info={'raiseload': True})
     event = db.relationship('Event', back_populates='rsvps')
 
     serialize_rules = ('-user.rsvps', '-event.rsvps')
 
 class Comment(db.Model, SerializerMixin):
     __tablename__ = 'comments'
+    __table_args__ = (
+        db.Index('ix_comments_event_id_created_at_id', 'event_id', 'created_at', 'id'),  # Newest-first pages per event
+    )
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    created_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc)
+    )
 
-    user = db.relationship('User', back_populates='comments')
+    user = db.relationship('User', back_populates='comments', info={'raiseload': True})
     event = db.relationship('Event', back_populates='comments')
 
-    serialize_rules = ('-user.comments', '-event.comments')
\ No newline at end of file
+    serialize_rules = ('-user.comments', '-event.comments')
+
+
+class RefreshToken(db.Model, SerializerMixin):
+    """
+    One issued refresh token. Tokens from the same login share a family, so a
+    rotated token that is presented again can revoke every token descended from it.
+    """
+    __tablename__ = 'refresh_tokens'
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), unique=True, nullable=False)
+    family = db.Column(db.String(36), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=True)
+
+    user = db.relationship('User', back_populates='refresh_tokens')
+
+    serialize_rules = ('-user',)
+
+
+class CollectionVersion(db.Model, SerializerMixin):
+    """
+    Counter bumped on every write to a collection, used to build cheap ETags for list endpoints.
+    """
+    __tablename__ = 'collection_versions'
+    name = db.Column(db.String(40), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
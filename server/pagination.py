@@ -0,0 +1,96 @@
+import base64
+import json
+from datetime import date, datetime
+from flask import request
+from sqlalchemy import tuple_
+from werkzeug.exceptions import BadRequest
+
+DEFAULT_PAGE_SIZE = 30
+MAX_PAGE_SIZE = 100
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class InvalidCursor(BadRequest):
+    description = "Invalid cursor"
+
+
+def encode_cursor(values):
+    """
+    Encode the sort-key values of the last row on a page into an opaque cursor.
+    """
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, page_key):
+    """
+    Decode a cursor back into sort-key values typed to match the page_key columns.
+    Raises InvalidCursor (400) for anything that was not produced by encode_cursor.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(page_key):
+            raise ValueError(cursor)
+
+        decoded = []
+        for column, value in zip(page_key, values):
+            python_type = column.type.python_type
+            if issubclass(python_type, datetime):
+                value = datetime.fromisoformat(value)
+            elif issubclass(python_type, date):
+                value = date.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise ValueError(cursor)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError):
+        raise InvalidCursor()
+
+
+def page_args(page_key):
+    """
+    Read limit and cursor from the query string.
+    Returns (limit, after) where after is the decoded cursor or None for the first page.
+    """
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cursor = request.args.get('cursor')
+    after = decode_cursor(cursor, page_key) if cursor else None
+    return limit, after
+
+
+def keyset(query, page_key, after=None, descending=False):
+    """
+    Order a query by the page_key columns and skip everything up to and including
+    the row the cursor values were taken from.
+    """
+    key = tuple_(*page_key) if len(page_key) > 1 else page_key[0]
+    if after is not None:
+        bound = tuple_(*after) if len(after) > 1 else after[0]
+        query = query.filter(key < bound if descending else key > bound)
+
+    order = [column.desc() if descending else column.asc() for column in page_key]
+    return query.order_by(*order)
+
+
+def paginate(query, page_key, after=None, limit=DEFAULT_PAGE_SIZE, descending=False):
+    """
+    Keyset-paginate a query ordered by the page_key columns.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    items = keyset(query, page_key, after, descending).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in page_key])
+    return items, next_cursor
+
+
+def pagination_headers(next_cursor):
+    """
+    Response headers advertising the next page, if there is one.
+    """
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
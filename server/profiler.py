@@ -0,0 +1,172 @@
+import hmac
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from uuid import uuid4
+from flask import g, request
+from config import app
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+REQUEST_ID = re.compile(r'[^A-Za-z0-9_-]')
+HEADER = 'X-Profile'
+
+
+def profile_dir():
+    return app.config['PROFILE_DIR'] or os.path.join(tempfile.gettempdir(), 'event-manager-profiles')
+
+
+def _frame_name(code):
+    path = code.co_filename
+    if path.startswith(SERVER_DIR):
+        path = os.path.relpath(path, SERVER_DIR)
+    elif 'site-packages' + os.sep in path:
+        path = path.split('site-packages' + os.sep, 1)[1]
+    else:
+        path = os.path.basename(path)
+    # Collapsed stacks separate frames with ';'
+    return f'{code.co_name} ({path}:{code.co_firstlineno})'.replace(';', ':')
+
+
+class Profile:
+    """
+    Stacks sampled from one request's thread, as {collapsed stack: microseconds}.
+    """
+
+    def __init__(self, thread_id, name):
+        self.thread_id = thread_id
+        self.name = name
+        self.stacks = {}
+
+    def add(self, frame, microseconds):
+        names = []
+        while frame is not None:
+            names.append(_frame_name(frame.f_code))
+            frame = frame.f_back
+        stack = ';'.join(reversed(names))
+        self.stacks[stack] = self.stacks.get(stack, 0) + microseconds
+
+    def write(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{self.name}.collapsed')
+        partial = f'{path}.{os.getpid()}.tmp'
+        with open(partial, 'w') as f:
+            for stack, microseconds in sorted(self.stacks.items()):
+                f.write(f'{stack} {microseconds}\n')
+        # Renamed into place, so the aggregation CLI never reads half a file
+        os.replace(partial, path)
+        return path
+
+
+class Sampler:
+    """
+    One daemon thread per process that wakes every PROFILE_INTERVAL seconds while
+    any request is being profiled and records the stack of each profiled thread,
+    weighted by the time since the previous sample. Requests that are not
+    profiled are never touched, and the thread sleeps when none are. Python only
+    switches threads every sys.getswitchinterval() seconds (5 ms by default), so
+    a CPU-bound request is sampled at most that often whatever the interval.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = {}
+        self._wake = threading.Event()
+        self._pid = None
+
+    def start(self, profile):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Threads do not survive a fork, so each gunicorn worker starts its own
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name='request-profiler', daemon=True).start()
+            self._active[profile.thread_id] = profile
+        self._wake.set()
+
+    def stop(self, profile):
+        with self._lock:
+            self._active.pop(profile.thread_id, None)
+
+    def _run(self):
+        interval = app.config['PROFILE_INTERVAL']
+        last = time.perf_counter()
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wake.clear()
+            if idle:
+                self._wake.wait()
+                last = time.perf_counter()
+            time.sleep(interval)
+            now = time.perf_counter()
+            microseconds = round((now - last) * 1_000_000)
+            last = now
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, profile in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        profile.add(frame, microseconds)
+
+
+sampler = Sampler()
+
+
+def requested():
+    """
+    Whether the caller asked for a profile with the PROFILE_TOKEN header.
+    """
+    token = app.config['PROFILE_TOKEN']
+    supplied = request.headers.get(HEADER)
+    return bool(token and supplied) and hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8'))
+
+
+def _start():
+    if not (requested() or random.random() < app.config['PROFILE_SAMPLE_RATE']):
+        return
+    from instrumentation import resource_name
+
+    request_id = REQUEST_ID.sub('', request.headers.get('X-Request-ID', ''))[:64] or uuid4().hex
+    profile = Profile(threading.get_ident(), f'{resource_name() or "unmatched"}.{request.method}.{request_id}')
+    g.profile = profile
+    sampler.start(profile)
+
+
+def _tag(response):
+    profile = g.get('profile')
+    if profile is not None:
+        response.headers['X-Profile-Id'] = profile.name
+    return response
+
+
+def _finish(exc):
+    profile = g.pop('profile', None)
+    if profile is None:
+        return
+    sampler.stop(profile)
+    try:
+        profile.write(profile_dir())
+    except OSError as e:
+        app.logger.warning(f'Could not write profile {profile.name}: {e}')
+
+
+def install():
+    """
+    Profile a PROFILE_SAMPLE_RATE fraction of requests, plus any request whose
+    X-Profile header carries PROFILE_TOKEN. Each profile is written when the
+    request context is torn down, after a streamed body has been sent, to
+    PROFILE_DIR/<resource>.<method>.<request id>.collapsed; the response names
+    it in X-Profile-Id. The request id is X-Request-ID when the caller sends one.
+    """
+    app.before_request(_start)
+    app.after_request(_tag)
+    app.teardown_request(_finish)
+
+
+# Nothing is hooked unless a rate or a token is configured
+if app.config['PROFILE_SAMPLE_RATE'] > 0 or app.config['PROFILE_TOKEN']:
+    install()
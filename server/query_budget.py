@@ -0,0 +1,138 @@
+import os
+import traceback
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+import statement_hooks
+from config import app
+from statement_hooks import subscribe
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+HOOK_FILES = (__file__, statement_hooks.__file__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    A request issued more statements than its Resource's query_budget allows.
+    """
+
+
+class LazyLoadForbidden(AssertionError):
+    """
+    A relationship marked info={'raiseload': True} was lazy loaded in strict mode.
+    """
+
+
+class RequestQueries:
+    """
+    Statements of the current request, each with the stack of app code that issued it.
+    """
+    __slots__ = ('budget', 'statements', 'violations')
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.statements = []
+        self.violations = []
+
+
+def _app_stack():
+    # Frames of the server's own modules, without the statement hooks; library frames are noise
+    return [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(SERVER_DIR) and frame.filename not in HOOK_FILES
+    ]
+
+
+def _current():
+    return g.get('request_queries') if has_request_context() else None
+
+
+def budget_for(view_class, method):
+    """
+    The statement budget a Resource declares for an HTTP method, or None when it declares none.
+    """
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(method.lower())
+    return budget
+
+
+def _report(title, statements):
+    lines = [title]
+    for number, (statement, stack) in enumerate(statements, 1):
+        lines.append(f'{number:>4}. {" ".join(statement.split())}')
+        lines.extend('        ' + line for line in ''.join(traceback.format_list(stack)).rstrip().splitlines())
+    return '\n'.join(lines)
+
+
+def _before_statement(conn, cursor, statement, parameters, context, executemany):
+    queries = _current()
+    if queries is None:
+        return
+    queries.statements.append((statement, _app_stack()))
+    if queries.budget is not None and len(queries.statements) == queries.budget + 1:
+        queries.violations.append(QueryBudgetExceeded(f'{_view_name()} {request.method} exceeded its query budget of {queries.budget}'))
+
+
+def _do_orm_execute(state):
+    if state.is_relationship_load and state.execution_options.get('yield_per'):
+        # With a do_orm_execute hook installed, SQLAlchemy hands a streamed parent's
+        # yield_per to its selectin loads, which unique() their rows and then refuse it
+        state.update_execution_options(yield_per=None)
+    if not (state.is_relationship_load and state.lazy_loaded_from is not None):
+        return
+    prop = state.loader_strategy_path.prop
+    if not prop.info.get('raiseload'):
+        return
+    error = LazyLoadForbidden(_report(
+        f'{prop} was lazy loaded; add it to the load plan of the query that loaded the parent',
+        [(str(state.statement), _app_stack())]
+    ))
+    queries = _current()
+    if queries is not None:
+        queries.violations.append(error)
+    # Raised here as well, so the lazy load fails the way raiseload() would
+    raise error
+
+
+def _view_name():
+    view_class = getattr(app.view_functions.get(request.endpoint), 'view_class', None)
+    return view_class.__name__ if view_class is not None else request.endpoint
+
+
+def _start():
+    view_class = getattr(app.view_functions.get(request.endpoint), 'view_class', None)
+    g.request_queries = RequestQueries(budget_for(view_class, request.method))
+
+
+def _check(response):
+    queries = g.pop('request_queries', None)
+    if queries is None or not queries.violations:
+        return response
+    error = queries.violations[0]
+    if isinstance(error, QueryBudgetExceeded):
+        # Every statement is listed, so the repeated one stands out
+        error = QueryBudgetExceeded(_report(
+            f'{error} with {len(queries.statements)} statements:', queries.statements
+        ))
+    raise error
+
+
+def install(strict=False):
+    """
+    Fail any request that issues more statements than its Resource's query_budget
+    (an int, or a dict by lower-case method). Violations are raised after the
+    view returns, so a view's own except clauses cannot turn them into a 500
+    response; with TESTING set the test client re-raises them. Statements a
+    streamed body runs after the view has returned are not counted.
+    """
+    subscribe(before=_before_statement)
+    if strict:
+        event.listen(Session, 'do_orm_execute', _do_orm_execute)
+    app.before_request(_start)
+    app.after_request(_check)
+
+
+# Meant for tests and benchmarks; production never pays for the stacks
+if app.config['QUERY_BUDGETS']:
+    install(strict=app.config['QUERY_BUDGET_STRICT'])
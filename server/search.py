@@ -0,0 +1,191 @@
+import re
+from sqlalchemy import event, text, select, column, null, false, Integer, inspect as sql_inspect
+from sqlalchemy.orm import Session
+from config import db
+from models import User, Event, Group
+
+# Each searchable model maps to a kind code, the fields that feed the index and
+# how to build the (title, body) document. Title matches rank above body matches.
+SEARCHABLE = {
+    Event: ('event', 1, ('name', 'description', 'location'), lambda e: (e.name, f"{e.description} {e.location}")),
+    Group: ('group', 2, ('name', 'description'), lambda g: (g.name, g.description)),
+    User: ('user', 3, ('username',), lambda u: (u.username, '')),
+}
+
+# Backfill statements shared by rebuild_search_index and the migration
+BACKFILL_SELECTS = (
+    "SELECT id * 4 + 1, 'event', id, name, description || ' ' || location FROM events",
+    "SELECT id * 4 + 2, 'group', id, name, description FROM groups",
+    "SELECT id * 4 + 3, 'user', id, username, '' FROM users",
+)
+
+# SQLite uses an FTS5 virtual table keyed by rowid; Postgres uses a regular table
+# with a generated, weighted tsvector column behind a GIN index.
+DIALECTS = {
+    'sqlite': {
+        'key': 'rowid',
+        'create': (
+            "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize='unicode61 remove_diacritics 2')",
+        ),
+        'drop': ("DROP TABLE IF EXISTS search_index",),
+        'search': (
+            "SELECT kind, ref_id, title, -bm25(search_index, 0.0, 0.0, 10.0, 1.0) AS rank "
+            "FROM search_index WHERE search_index MATCH :query {kinds} "
+            "ORDER BY rank DESC LIMIT :limit"
+        ),
+        'ids': "SELECT ref_id FROM search_index WHERE search_index MATCH :query AND kind = :kind",
+    },
+    'postgresql': {
+        'key': 'doc_id',
+        'create': (
+            "CREATE TABLE IF NOT EXISTS search_index ("
+            "doc_id BIGINT PRIMARY KEY, kind VARCHAR(10) NOT NULL, ref_id INTEGER NOT NULL, "
+            "title TEXT NOT NULL, body TEXT NOT NULL, "
+            "document TSVECTOR GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', title), 'A') || "
+            "setweight(to_tsvector('english', body), 'B')) STORED)",
+            "CREATE INDEX IF NOT EXISTS ix_search_index_document ON search_index USING GIN (document)",
+        ),
+        'drop': ("DROP TABLE IF EXISTS search_index",),
+        'search': (
+            "SELECT kind, ref_id, title, ts_rank(document, to_tsquery('english', :query)) AS rank "
+            "FROM search_index WHERE document @@ to_tsquery('english', :query) {kinds} "
+            "ORDER BY rank DESC LIMIT :limit"
+        ),
+        'ids': (
+            "SELECT ref_id FROM search_index "
+            "WHERE document @@ to_tsquery('english', :query) AND kind = :kind"
+        ),
+    },
+}
+
+
+def _dialect(connection):
+    return DIALECTS[connection.dialect.name]
+
+
+def build_query(connection, q):
+    """
+    Turn free text into a prefix-matching full-text query for the connection's
+    dialect, or None if it has no searchable terms.
+    """
+    terms = re.findall(r'\w+', q.lower())
+    if not terms:
+        return None
+    if connection.dialect.name == 'postgresql':
+        return ' & '.join(f"{term}:*" for term in terms)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _create(connection, drop_existing=False):
+    statements = _dialect(connection)
+    if drop_existing:
+        for statement in statements['drop']:
+            connection.execute(text(statement))
+    for statement in statements['create']:
+        connection.execute(text(statement))
+
+
+def create_search_index(drop_existing=False):
+    """
+    Create the search index table for the current database if it does not exist.
+    With drop_existing, any previous index is discarded first.
+    """
+    _create(db.session.connection(), drop_existing)
+    db.session.commit()
+
+
+# The index is not a mapped table, so db.create_all() and db.drop_all() would
+# otherwise leave it out and every flush of a searchable model would fail.
+# Migrated databases get it from the full-text search migration instead.
+@event.listens_for(db.metadata, 'after_create')
+def _create_with_tables(metadata, connection, **kw):
+    _create(connection)
+
+
+@event.listens_for(db.metadata, 'after_drop')
+def _drop_with_tables(metadata, connection, **kw):
+    for statement in _dialect(connection)['drop']:
+        connection.execute(text(statement))
+
+
+def rebuild_search_index():
+    """
+    Repopulate the search index from the source tables, e.g. after bulk loads
+    that bypass the ORM flush hooks.
+    """
+    connection = db.session.connection()
+    key = _dialect(connection)['key']
+    connection.execute(text("DELETE FROM search_index"))
+    for backfill in BACKFILL_SELECTS:
+        connection.execute(text(f"INSERT INTO search_index ({key}, kind, ref_id, title, body) {backfill}"))
+    db.session.commit()
+
+
+def search(q, kinds=None, limit=20):
+    """
+    Ranked full-text search across events, groups and users in a single query.
+    Returns a list of dicts with type, id, title and rank.
+    """
+    connection = db.session.connection()
+    query = build_query(connection, q)
+    if query is None:
+        return []
+
+    params = {'query': query, 'limit': limit}
+    kind_filter = ''
+    if kinds:
+        names = [f"kind_{i}" for i in range(len(kinds))]
+        kind_filter = f"AND kind IN ({', '.join(':' + name for name in names)})"
+        params.update(zip(names, kinds))
+
+    statement = text(_dialect(connection)['search'].format(kinds=kind_filter))
+    return [
+        {'type': row.kind, 'id': row.ref_id, 'title': row.title, 'rank': round(row.rank, 6)}
+        for row in connection.execute(statement, params)
+    ]
+
+
+def matching_ids(kind, q):
+    """
+    Select statement yielding the ids of one kind matching q, for use in an IN filter.
+    """
+    connection = db.session.connection()
+    query = build_query(connection, q)
+    if query is None:
+        return select(null()).where(false())
+    statement = text(_dialect(connection)['ids']).bindparams(query=query, kind=kind)
+    return select(statement.columns(column('ref_id', Integer)).subquery().c.ref_id)
+
+
+@event.listens_for(Session, 'after_flush')
+def sync_search_index(session, flush_context):
+    """
+    Keep the search index in step with inserts, updates and deletes of searchable
+    models, inside the same transaction as the flush.
+    """
+    changed = [obj for obj in session.new if type(obj) in SEARCHABLE]
+    for obj in session.dirty:
+        if type(obj) in SEARCHABLE:
+            state = sql_inspect(obj)
+            fields = SEARCHABLE[type(obj)][2]
+            if any(state.attrs[field].history.has_changes() for field in fields):
+                changed.append(obj)
+    removed = [obj for obj in session.deleted if type(obj) in SEARCHABLE]
+
+    if not changed and not removed:
+        return
+
+    connection = session.connection()
+    key = _dialect(connection)['key']
+    for obj in changed + removed:
+        _, code, _, _ = SEARCHABLE[type(obj)]
+        connection.execute(text(f"DELETE FROM search_index WHERE {key} = :doc_id"), {'doc_id': obj.id * 4 + code})
+    for obj in changed:
+        kind, code, _, document = SEARCHABLE[type(obj)]
+        title, body = document(obj)
+        connection.execute(
+            text(f"INSERT INTO search_index ({key}, kind, ref_id, title, body) VALUES (:doc_id, :kind, :ref_id, :title, :body)"),
+            {'doc_id': obj.id * 4 + code, 'kind': kind, 'ref_id': obj.id, 'title': title, 'body': body}
+        )
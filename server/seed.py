@@ -1,8 +1,18 @@
 from faker import Faker
 from config import app, db
-from models import User, Event, Group, RSVP, Comment, GroupInvitation, EventInvitation
+from models import User, Event, Group, RSVP, Comment, GroupInvitation, EventInvitation, group_member
+from search import rebuild_search_index
+from sqlalchemy import insert, text
+import argparse
+import bcrypt
+import functools
+import itertools
+import multiprocessing
+import os
 import random
-from datetime import datetime, timezone
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
 
 # Initialize Faker
 fake = Faker()
@@ -65,10 +75,17 @@ def seed_events(users, num_events=10):
     return events
 
 def seed_rsvps(users, events, num_rsvps=20):
+    seen = set()  # One RSVP per (event, user) pair
     for _ in range(num_rsvps):
+        user_id = random.choice(users).id
+        event_id = random.choice(events).id
+        if (event_id, user_id) in seen:
+            continue
+        seen.add((event_id, user_id))
+
         rsvp = RSVP(
-            user_id=random.choice(users).id,
-            event_id=random.choice(events).id,
+            user_id=user_id,
+            event_id=event_id,
             status=random.choice(['Confirmed', 'Declined', 'maybe']),
         )
         db.session.add(rsvp)
@@ -85,6 +102,7 @@ def seed_comments(users, events, num_comments=30):
     db.session.commit()
 
 def seed_group_invitations(users, groups, num_invitations=20):
+    seen = set()  # One invitation per (group, invitee) pair
     for _ in range(num_invitations):
         inviter = random.choice(users)
         invitee = random.choice(users)
@@ -93,8 +111,13 @@ def seed_group_invitations(users, groups, num_invitations=20):
         while invitee.id == inviter.id:
             invitee = random.choice(users)
 
+        group_id = random.choice(groups).id
+        if (group_id, invitee.id) in seen:
+            continue
+        seen.add((group_id, invitee.id))
+
         group_invitation = GroupInvitation(
-            group_id=random.choice(groups).id,
+            group_id=group_id,
             inviter_id=inviter.id,
             invited_user_id=invitee.id,
             status=random.choice(['pending', 'accepted', 'declined']),
@@ -103,6 +126,7 @@ def seed_group_invitations(users, groups, num_invitations=20):
     db.session.commit()
 
 def seed_event_invitations(users, events, num_invitations=20):
+    seen = set()  # One invitation per (event, invitee) pair
     for _ in range(num_invitations):
         inviter = random.choice(users)
         invitee = random.choice(users)
@@ -111,9 +135,14 @@ def seed_event_invitations(users, events, num_invitations=20):
         while invitee.id == inviter.id:
             invitee = random.choice(users)
 
+        event_id = random.choice(events).id
+        if (event_id, invitee.id) in seen:
+            continue
+        seen.add((event_id, invitee.id))
+
         # Use datetime.now(timezone.utc) for timestamps
         event_invitation = EventInvitation(
-            event_id=random.choice(events).id,
+            event_id=event_id,
             inviter_id=inviter.id,
             invitee_id=invitee.id,
             status=random.choice(['Pending', 'Accepted', 'Denied']),
@@ -141,5 +170,331 @@ def seed_all():
 
         print("Database seeded successfully!")
 
+
+# Bulk seeding for load tests.
+#
+# Every row is generated from the seed and its position alone, so any chunk can be
+# produced by any worker process and the output does not depend on how the work
+# was split or how large the batches are. Ids are assigned explicitly for the
+# same reason. Rows are written with Core executemany inserts, one transaction per
+# chunk, and every user shares one precomputed password hash.
+
+BULK_PASSWORD = 'Password1'
+BULK_EPOCH = datetime(2025, 1, 1)
+RSVP_STATUSES = ('going', 'not_going', 'maybe')
+BCRYPT_ALPHABET = './ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+ID_BLOCK = 1000  # Chunks of users, groups and events start on block boundaries
+
+
+def _pick(seed, kind, id_, users):
+    """
+    A user id chosen deterministically for row id_ of a kind, e.g. an event's owner.
+    """
+    return 1 + zlib.crc32(f'{seed}:{kind}:{id_}'.encode('utf-8')) % users
+
+
+def _rng(seed, *parts):
+    return random.Random(':'.join(str(part) for part in (seed,) + parts))
+
+
+@functools.lru_cache(maxsize=None)
+def _vocabulary(seed):
+    """
+    Pools of Faker text drawn once per process; rows pick from them, since calling
+    Faker for every row would dominate the run time.
+    """
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {
+        'first_names': [fake.first_name().lower() for _ in range(500)],
+        'last_names': [fake.last_name().lower() for _ in range(500)],
+        'words': [fake.word().title() for _ in range(500)],
+        'sentences': [fake.sentence() for _ in range(2000)],
+        'paragraphs': [fake.paragraph() for _ in range(500)],
+        'cities': [fake.city() for _ in range(300)],
+        'catch_phrases': [fake.catch_phrase()[:80] for _ in range(1000)],
+    }
+
+
+def _blocks(seed, kind, start, stop):
+    """
+    Yield (id, rng) for ids start..stop-1, reseeding at each ID_BLOCK boundary so
+    a row's values do not depend on which chunk it was generated in.
+    """
+    for block_start in range(start, stop, ID_BLOCK):
+        rng = _rng(seed, kind, block_start)
+        for id_ in range(block_start, min(block_start + ID_BLOCK, stop)):
+            yield id_, rng
+
+
+def _password_hash(seed):
+    """
+    BULK_PASSWORD hashed once, with a salt derived from the seed so reruns write identical rows.
+    """
+    rng = _rng(seed, 'password')
+    salt = ''.join(rng.choice(BCRYPT_ALPHABET) for _ in range(21)) + '.'
+    rounds = app.config['BCRYPT_LOG_ROUNDS']
+    return bcrypt.hashpw(BULK_PASSWORD.encode('utf-8'), f'$2b${rounds:02d}${salt}'.encode('ascii')).decode('utf-8')
+
+
+def _members(seed, group_id, count, users):
+    """
+    Member ids of a group: its owner plus count - 1 others.
+    """
+    owner = _pick(seed, 'group', group_id, users)
+    others = _rng(seed, 'members', group_id).sample(range(1, users + 1), min(count, users))
+    return [owner] + [user_id for user_id in others if user_id != owner][:max(count - 1, 0)]
+
+
+def _popularity(seed, kind, parents, total, skew, cap=None):
+    """
+    Split total rows over parent ids 1..parents with Zipf-like weights 1 / rank ** skew,
+    ranks shuffled so popularity does not follow id order. No parent gets more than cap.
+    """
+    ranks = list(range(1, parents + 1))
+    _rng(seed, 'ranks', kind).shuffle(ranks)
+    weights = [1 / rank ** skew for rank in ranks]
+    scale = total / sum(weights)
+    counts = [int(weight * scale + 0.5) for weight in weights]
+    return counts if cap is None else [min(count, cap) for count in counts]
+
+
+def _user_rows(seed, start, stop, password_hash):
+    words = _vocabulary(seed)
+    rows = []
+    for id_, rng in _blocks(seed, 'users', start, stop):
+        username = f"{rng.choice(words['first_names'])}.{rng.choice(words['last_names'])}{id_}"
+        rows.append({'id': id_, 'username': username, 'email': f'{username}@example.com', 'password_hash': password_hash})
+    return rows
+
+
+def _group_rows(seed, start, stop, users):
+    words = _vocabulary(seed)
+    return [
+        {
+            'id': id_,
+            'name': rng.choice(words['words']),
+            'description': rng.choice(words['sentences']),
+            'user_id': _pick(seed, 'group', id_, users),
+            'updated_at': BULK_EPOCH,
+        }
+        for id_, rng in _blocks(seed, 'groups', start, stop)
+    ]
+
+
+def _event_rows(seed, start, stop, users):
+    words = _vocabulary(seed)
+    return [
+        {
+            'id': id_,
+            'name': rng.choice(words['catch_phrases']),
+            'date': BULK_EPOCH + timedelta(minutes=rng.randrange(365 * 24 * 60)),
+            'location': rng.choice(words['cities']),
+            'description': rng.choice(words['paragraphs']),
+            'user_id': _pick(seed, 'event', id_, users),
+            'updated_at': BULK_EPOCH,
+        }
+        for id_, rng in _blocks(seed, 'events', start, stop)
+    ]
+
+
+def _member_rows(seed, parents, users):
+    for group_id, _, count in parents:
+        for user_id in _members(seed, group_id, count, users):
+            yield {'group_id': group_id, 'user_id': user_id}
+
+
+def _rsvp_rows(seed, parents, users):
+    """
+    RSVPs paired with the accepted invitations the RSVP endpoint requires, for a run of events.
+    """
+    for event_id, first_id, count in parents:
+        owner = _pick(seed, 'event', event_id, users)
+        rng = _rng(seed, 'rsvps', event_id)
+        guests = [user_id for user_id in rng.sample(range(1, users + 1), count) if user_id != owner]
+        for offset, user_id in enumerate(guests):
+            invitation = {
+                'id': first_id + offset, 'event_id': event_id, 'inviter_id': owner, 'invitee_id': user_id,
+                'status': 'Accepted', 'created_at': BULK_EPOCH, 'updated_at': BULK_EPOCH,
+            }
+            rsvp = {'id': first_id + offset, 'event_id': event_id, 'user_id': user_id, 'status': rng.choice(RSVP_STATUSES)}
+            yield invitation, rsvp
+
+
+def _comment_rows(seed, parents, users):
+    sentences = _vocabulary(seed)['sentences']
+    for event_id, first_id, count in parents:
+        rng = _rng(seed, 'comments', event_id)
+        for offset in range(count):
+            yield {
+                'id': first_id + offset,
+                'event_id': event_id,
+                'user_id': rng.randint(1, users),
+                'content': rng.choice(sentences),
+                'created_at': BULK_EPOCH + timedelta(seconds=rng.randrange(365 * 24 * 3600)),
+            }
+
+
+def _group_invitation_rows(seed, parents, users, members):
+    """
+    Pending invitations to a run of groups, sent by their owners to non-members.
+    """
+    for group_id, first_id, count in parents:
+        owner = _pick(seed, 'group', group_id, users)
+        excluded = set(_members(seed, group_id, members[group_id - 1], users))
+        rng = _rng(seed, 'group_invitations', group_id)
+        invitees = [user_id for user_id in rng.sample(range(1, users + 1), min(count + len(excluded), users))
+                    if user_id not in excluded][:count]
+        for offset, user_id in enumerate(invitees):
+            yield {'id': first_id + offset, 'group_id': group_id, 'inviter_id': owner, 'invited_user_id': user_id, 'status': 'Pending'}
+
+
+# Row builder and target tables per kind of chunk; builders for several tables yield one row for each
+BULK_KINDS = {
+    'users': (_user_rows, (User.__table__,)),
+    'groups': (_group_rows, (Group.__table__,)),
+    'events': (_event_rows, (Event.__table__,)),
+    'members': (_member_rows, (group_member,)),
+    'rsvps': (_rsvp_rows, (EventInvitation.__table__, RSVP.__table__)),
+    'comments': (_comment_rows, (Comment.__table__,)),
+    'group_invitations': (_group_invitation_rows, (GroupInvitation.__table__,)),
+}
+
+
+def _run_chunk(task):
+    """
+    Generate and insert one chunk of rows, batch_size rows per statement, so
+    even a very popular event never has all of its rows in memory at once.
+    Runs in a worker process.
+    """
+    kind, seed, args, batch_size = task
+    build, tables = BULK_KINDS[kind]
+    rows = iter(build(seed, *args))
+    written = 0
+    with db.engine.begin() as connection:
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            if len(tables) == 1:
+                connection.execute(insert(tables[0]), batch)
+            else:
+                for i, table in enumerate(tables):
+                    connection.execute(insert(table), [row[i] for row in batch])
+            written += len(batch) * len(tables)
+    return written
+
+
+def _init_worker():
+    app.app_context().push()
+    # Connections inherited from the parent must not be reused after the fork
+    db.engine.dispose(close=False)
+
+
+def _ranges(count, size):
+    size = max(size // ID_BLOCK, 1) * ID_BLOCK
+    return [(start, min(start + size, count + 1)) for start in range(1, count + 1, size)]
+
+
+def _runs(counts, size):
+    """
+    Group parents into runs of about size child rows, as (parent_id, first_child_id, count).
+    """
+    runs, run, rows, next_id = [], [], 0, 1
+    for parent_id, count in enumerate(counts, start=1):
+        if count:
+            run.append((parent_id, next_id, count))
+            next_id += count
+            rows += count
+        if rows >= size:
+            runs.append(run)
+            run, rows = [], 0
+    if run:
+        runs.append(run)
+    return runs
+
+
+def seed_bulk(users, events, groups, rsvps, comments, members, group_invitations,
+              skew=1.0, seed=0, workers=None, batch_size=10000):
+    """
+    Fill a fresh database with generated data at load-test scale.
+    """
+    started = time.perf_counter()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        dialect = db.engine.dialect.name
+        password_hash = _password_hash(seed)
+
+    # SQLite allows a single writer, so extra processes would only queue on its lock
+    workers = 1 if dialect == 'sqlite' else (workers or os.cpu_count())
+
+    rsvp_counts = _popularity(seed, 'rsvps', events, rsvps, skew, users - 1)
+    comment_counts = _popularity(seed, 'comments', events, comments, skew)
+    member_counts = [max(count, 1) for count in _popularity(seed, 'members', groups, members, skew, users)]
+    invitation_counts = _popularity(seed, 'group_invitations', groups, group_invitations, skew, users)
+    invitation_counts = [min(count, users - members) for count, members in zip(invitation_counts, member_counts)]
+
+    # Parents before children, so foreign keys hold between phases
+    phases = [
+        [('users', seed, (start, stop, password_hash), batch_size) for start, stop in _ranges(users, batch_size)],
+        [('groups', seed, (start, stop, users), batch_size) for start, stop in _ranges(groups, batch_size)]
+        + [('events', seed, (start, stop, users), batch_size) for start, stop in _ranges(events, batch_size)],
+        [('members', seed, (run, users), batch_size) for run in _runs(member_counts, batch_size)]
+        + [('rsvps', seed, (run, users), batch_size) for run in _runs(rsvp_counts, batch_size)]
+        + [('comments', seed, (run, users), batch_size) for run in _runs(comment_counts, batch_size)]
+        + [('group_invitations', seed, (run, users, member_counts), batch_size) for run in _runs(invitation_counts, batch_size)],
+    ]
+
+    total = 0
+    if workers > 1:
+        with multiprocessing.get_context('fork').Pool(workers, initializer=_init_worker) as pool:
+            for tasks in phases:
+                total += sum(pool.imap_unordered(_run_chunk, tasks))
+    else:
+        with app.app_context():
+            for tasks in phases:
+                total += sum(map(_run_chunk, tasks))
+
+    with app.app_context():
+        if dialect == 'postgresql':
+            # Explicit ids leave the sequences behind
+            for table in ('users', 'groups', 'events', 'rsvps', 'event_invitations', 'comments', 'group_invitations'):
+                db.session.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), COALESCE((SELECT MAX(id) FROM {table}), 1))"
+                ))
+            db.session.commit()
+        rebuild_search_index()
+
+    elapsed = time.perf_counter() - started
+    print(f"Seeded {total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s) with {workers} worker(s)")
+    print(f"Every user's password is {BULK_PASSWORD}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with demo data.")
+    parser.add_argument('--bulk', action='store_true', help='generate load-test volumes instead of the small demo set')
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--events', type=int, default=10000)
+    parser.add_argument('--groups', type=int, default=1000)
+    parser.add_argument('--rsvps', type=int, default=500000, help='also creates an accepted invitation per RSVP')
+    parser.add_argument('--comments', type=int, default=200000)
+    parser.add_argument('--members', type=int, default=100000, help='group memberships')
+    parser.add_argument('--group-invitations', type=int, default=20000)
+    parser.add_argument('--skew', type=float, default=1.0, help='Zipf exponent of event and group popularity')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: one per CPU)')
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    if not args.bulk:
+        seed_all()
+        return
+    seed_bulk(
+        args.users, args.events, args.groups, args.rsvps, args.comments, args.members, args.group_invitations,
+        skew=args.skew, seed=args.seed, workers=args.workers, batch_size=args.batch_size,
+    )
+
+
 if __name__ == "__main__":
-    seed_all()
+    main()
@@ -0,0 +1,91 @@
+from datetime import datetime, date, time
+from sqlalchemy import inspect as sql_inspect
+from sqlalchemy.orm import RelationshipProperty
+from sqlalchemy_serializer.lib.schema import Schema
+from models import User, Event, Group, RSVP, Comment
+
+
+def _value_converter(model, column):
+    """
+    Pick the formatter SerializerMixin would apply to values of this column.
+    Returns None for types that are emitted as-is.
+    """
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+
+    if issubclass(python_type, time):
+        fmt = model.time_format
+    elif issubclass(python_type, datetime):
+        fmt = model.datetime_format
+    elif issubclass(python_type, date):
+        fmt = model.date_format
+    else:
+        return None
+    return lambda value: value.strftime(fmt) if value is not None else None
+
+
+def _compile(model, schema):
+    """
+    Walk the model the same way SerializerMixin.to_dict would and return a
+    function that extracts exactly the fields the schema includes.
+    """
+    schema.update(only=model.serialize_only, extend=model.serialize_rules)
+
+    mapper = sql_inspect(model)
+    keys = schema.keys
+    if schema.is_greedy:
+        keys.update(attr.key for attr in mapper.attrs)
+
+    fields = []
+    for attr in mapper.attrs:
+        key = attr.key
+        if key not in keys or not schema.is_included(key=key):
+            continue
+
+        if isinstance(attr, RelationshipProperty):
+            nested = _compile(attr.mapper.class_, schema.fork(key=key))
+            if attr.uselist:
+                convert = lambda items, nested=nested: [nested(item) for item in items]
+            else:
+                convert = lambda item, nested=nested: nested(item) if item is not None else None
+        else:
+            convert = _value_converter(model, attr.columns[0])
+        fields.append((key, convert))
+
+    fields = tuple(fields)
+
+    def serialize(obj):
+        data = {}
+        for key, convert in fields:
+            value = getattr(obj, key)
+            data[key] = convert(value) if convert else value
+        return data
+
+    return serialize
+
+
+def compile_serializer(model, rules=()):
+    """
+    Compile a SerializerMixin rule set for a model into a flat field-extraction
+    function. Rules are resolved once, so calling the result produces the same
+    dict as model.to_dict(rules=rules) without re-parsing them per object.
+    """
+    schema = Schema()
+    schema.update(extend=rules)
+    return _compile(model, schema)
+
+
+# Compiled serializers for the hot paths in app.py
+serialize_event = compile_serializer(Event, rules=('-user.events', '-rsvps.event', '-comments.event', '-invitations.event'))
+serialize_invited_event = compile_serializer(Event, rules=('-invitations', '-rsvps.event', '-comments.event'))
+serialize_user = compile_serializer(User, rules=('-events', '-rsvps', '-groups', '-sent_event_invitations', '-received_event_invitations'))
+serialize_member = compile_serializer(User, rules=('-groups', '-rsvps', '-comments', '-sent_event_invitations', '-received_event_invitations'))
+serialize_group = compile_serializer(Group, rules=('-members.groups', '-invitations.group', '-members.rsvps', '-members.comments'))
+serialize_profile_group = compile_serializer(Group, rules=('-members',))
+serialize_invited_group = compile_serializer(Group, rules=('-invitations', '-members.groups'))
+serialize_group_inviter = compile_serializer(User, rules=('-groups', '-sent_group_invitations', '-received_group_invitations'))
+serialize_rsvp = compile_serializer(RSVP, rules=('-user.rsvps', '-event.rsvps'))
+serialize_comment = compile_serializer(Comment, rules=('-user.comments', '-event.comments'))
+serialize_event_comment = compile_serializer(Comment, rules=('-user.comments', '-event'))
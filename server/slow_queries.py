@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from flask import has_request_context
+import statement_hooks
+from config import app
+from statement_hooks import subscribe
+
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(SERVER_DIR, 'app.py')
+# The statement's own call chain passes through these; they are never its source
+HOOK_FILES = (__file__, statement_hooks.__file__)
+
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|(?<!:):\w+|\$\d+')
+IN_LIST = re.compile(r'\bIN \(\?(?:, \?)*\)', re.IGNORECASE)
+VALUES_LIST = re.compile(r'\bVALUES \([^()]*\)(?:, \([^()]*\))+', re.IGNORECASE)
+EXPLAINABLE = re.compile(r'\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b', re.IGNORECASE)
+BIND_SUFFIX = re.compile(r'(_\d+)+$')
+# Never written to the slow query log: credentials, token ids and personal data
+REDACTED_COLUMNS = frozenset({'password_hash', 'jti', 'family', 'email'})
+
+
+def normalize(statement):
+    """
+    The statement with literals and placeholders replaced by ?, and IN and VALUES
+    lists collapsed, so statements differing only in values share a fingerprint.
+    """
+    normalized = ' '.join(statement.split())
+    normalized = STRING.sub('?', normalized)
+    normalized = PLACEHOLDER.sub('?', normalized)
+    normalized = NUMBER.sub('?', normalized)
+    normalized = IN_LIST.sub('IN (...)', normalized)
+    return VALUES_LIST.sub('VALUES (...)', normalized)
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def source():
+    """
+    The innermost app.py line on the stack, or else the innermost line of any other
+    server module, as "app.py:123 in get". Library frames are skipped.
+    """
+    fallback = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path == APP_FILE:
+            return f'app.py:{frame.f_lineno} in {frame.f_code.co_name}'
+        if fallback is None and path.startswith(SERVER_DIR) and path not in HOOK_FILES and 'site-packages' not in path:
+            fallback = f'{os.path.relpath(path, SERVER_DIR)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return fallback
+
+
+def _parameters(context):
+    """
+    The statement's parameters by bind name, with the values of REDACTED_COLUMNS
+    masked, or None for a statement SQLAlchemy did not compile (there are no names
+    to tell a password hash from an id by).
+    """
+    if context is None or context.compiled is None or not context.compiled_parameters:
+        return None
+    sets = [
+        {name: _parameter(name, value) for name, value in parameters.items()}
+        for parameters in context.compiled_parameters
+    ]
+    return sets[0] if len(sets) == 1 else sets
+
+
+def _parameter(name, value):
+    # Bind names are the column's, with _1, _2 ... appended when it is compared
+    if BIND_SUFFIX.sub('', name) in REDACTED_COLUMNS:
+        return '[redacted]'
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    # Long values (descriptions) are cut so one statement cannot flood the log
+    text = str(value)
+    return text if len(text) <= 200 else text[:200] + '...'
+
+
+def explain(conn, statement, parameters):
+    """
+    The plan of a statement, from EXPLAIN (Postgres) or EXPLAIN QUERY PLAN (SQLite)
+    run on the connection that executed it. Uses a plain DB-API cursor, so the
+    EXPLAIN is neither timed nor counted by the statement hooks. On Postgres it runs
+    inside a savepoint, so a failing EXPLAIN cannot abort the request's transaction.
+    """
+    postgresql = conn.dialect.name == 'postgresql'
+    prefix = 'EXPLAIN' if postgresql else 'EXPLAIN QUERY PLAN'
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if postgresql:
+            cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            cursor.execute(f'{prefix} {statement}', parameters)
+            plan = [row[0] if postgresql else row[-1] for row in cursor.fetchall()]
+        except Exception as e:
+            if postgresql:
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            return [f'EXPLAIN failed: {e}']
+        if postgresql:
+            cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+        return plan
+    finally:
+        cursor.close()
+
+
+class SlowQuery:
+    """
+    Running totals for one statement fingerprint in this worker.
+    """
+    __slots__ = ('fingerprint', 'statement', 'plan', 'count', 'total_ms', 'max_ms', 'sources')
+
+    def __init__(self, fingerprint, statement, plan):
+        self.fingerprint = fingerprint
+        self.statement = statement
+        self.plan = plan
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.sources = {}
+
+    def to_dict(self):
+        return {
+            'fingerprint': self.fingerprint,
+            'statement': self.statement,
+            'count': self.count,
+            'total_ms': round(self.total_ms, 2),
+            'mean_ms': round(self.total_ms / self.count, 2),
+            'max_ms': round(self.max_ms, 2),
+            'sources': dict(sorted(self.sources.items(), key=lambda item: item[1], reverse=True)),
+            'plan': self.plan,
+        }
+
+
+class SlowQueryLog:
+    """
+    Slow statements of this worker by fingerprint. Each shape is explained once,
+    on its first slow execution; later ones only add to its counts. At most
+    SLOW_QUERY_FINGERPRINTS shapes are kept, and further ones are only logged.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queries = {}
+
+    def record(self, conn, statement, parameters, context, executemany, elapsed_ms):
+        normalized = normalize(statement)
+        key = fingerprint(normalized)
+        where = source()
+        resource = None
+        if has_request_context():
+            from instrumentation import resource_name
+
+            resource = resource_name()
+
+        with self._lock:
+            query = self._queries.get(key)
+        first = query is None
+        if first:
+            # executemany has a list of parameter sets, which EXPLAIN cannot take
+            explainable = not executemany and EXPLAINABLE.match(statement)
+            plan = explain(conn, statement, parameters) if explainable else None
+            query = SlowQuery(key, normalized, plan)
+            with self._lock:
+                if len(self._queries) < app.config['SLOW_QUERY_FINGERPRINTS']:
+                    query = self._queries.setdefault(key, query)
+
+        with self._lock:
+            query.count += 1
+            query.total_ms += elapsed_ms
+            query.max_ms = max(query.max_ms, elapsed_ms)
+            label = f'{resource}: {where}' if resource else where
+            query.sources[label] = query.sources.get(label, 0) + 1
+            count, total_ms = query.count, query.total_ms
+
+        line = {
+            'event': 'slow_query',
+            'fingerprint': key,
+            'duration_ms': round(elapsed_ms, 2),
+            'count': count,
+            'total_ms': round(total_ms, 2),
+            'resource': resource,
+            'source': where,
+            'parameters': _parameters(context),
+        }
+        if first:
+            # The full statement and plan once per shape; the fingerprint links the rest
+            line.update(statement=' '.join(statement.split()), plan=query.plan)
+        app.logger.warning(json.dumps(line, default=str))
+
+    def report(self):
+        """
+        Every tracked shape, the most total time first.
+        """
+        with self._lock:
+            queries = [query.to_dict() for query in self._queries.values()]
+        return sorted(queries, key=lambda query: query['total_ms'], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._queries.clear()
+
+
+slow_queries = SlowQueryLog()
+
+
+def _after_statement(conn, cursor, statement, parameters, context, executemany, elapsed):
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= app.config['SLOW_QUERY_MS']:
+        slow_queries.record(conn, statement, parameters, context, executemany, elapsed_ms)
+
+
+def install():
+    """
+    Log every statement slower than SLOW_QUERY_MS as a JSON line with its
+    parameters, fingerprint, running count and the app.py line that issued it.
+    """
+    subscribe(after=_after_statement)
+
+
+if app.config['SLOW_QUERY_MS'] > 0:
+    install()
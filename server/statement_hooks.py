@@ -0,0 +1,35 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_before = []
+_after = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for callback in _before:
+        callback(conn, cursor, statement, parameters, context, executemany)
+    # Started after the callbacks, so their own cost is not timed as the statement's
+    conn.info.setdefault('statement_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['statement_started'].pop()
+    for callback in _after:
+        callback(conn, cursor, statement, parameters, context, executemany, elapsed)
+
+
+def subscribe(before=None, after=None):
+    """
+    Call before(conn, cursor, statement, parameters, context, executemany) ahead of
+    every statement on any engine, and after(..., elapsed) with its time in seconds
+    once it has run. One timing pair serves every subscriber, and nothing is hooked
+    until the first one subscribes, so a build with none pays no per-statement cost.
+    """
+    if not _before and not _after:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    if before is not None:
+        _before.append(before)
+    if after is not None:
+        _after.append(after)
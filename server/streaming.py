@@ -0,0 +1,51 @@
+import json
+from flask import request, Response, stream_with_context
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+JSON_MIMETYPE = 'application/json'
+STREAM_BATCH_SIZE = 1000
+
+
+def stream_format():
+    """
+    The mimetype to stream a whole collection as, or None for a regular page.
+    NDJSON is chosen with ?format=ndjson or by preferring application/x-ndjson
+    in Accept; a single JSON array with ?stream=1.
+    """
+    if request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return NDJSON_MIMETYPE
+    if request.args.get('stream', type=int):
+        return JSON_MIMETYPE
+    return None
+
+
+def stream_response(query, serialize, mimetype, headers=None):
+    """
+    Stream every row of a query, either as one JSON document per line or as the
+    elements of one JSON array. Rows are fetched through a server-side cursor and
+    written STREAM_BATCH_SIZE at a time, then released, so memory stays flat
+    however many rows match.
+    """
+    ndjson = mimetype == NDJSON_MIMETYPE
+
+    def generate():
+        if not ndjson:
+            yield '['
+        separator = ''
+        documents = []
+        for row in query.yield_per(STREAM_BATCH_SIZE):
+            documents.append(json.dumps(serialize(row)))
+            if len(documents) == STREAM_BATCH_SIZE:
+                yield chunk(separator, documents)
+                separator, documents = ',', []
+        if documents:
+            yield chunk(separator, documents)
+        if not ndjson:
+            yield ']'
+
+    def chunk(separator, documents):
+        if ndjson:
+            return '\n'.join(documents) + '\n'
+        return separator + ','.join(documents)
+
+    return Response(stream_with_context(generate()), mimetype=mimetype, headers=headers)
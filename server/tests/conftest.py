@@ -0,0 +1,147 @@
+import os
+import tempfile
+
+# config.py reads the environment at import time, so it is set before anything imports it
+DIRECTORY = tempfile.mkdtemp(prefix='event-manager-tests-')
+os.environ['DATABASE_URI'] = f"sqlite:///{os.path.join(DIRECTORY, 'app.db')}"
+os.environ['JWT_SECRET_KEY'] = 'tests-only-secret-key-of-32-bytes'
+os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+os.environ['BCRYPT_POOL_SIZE'] = '0'
+os.environ['DETAIL_CACHE_BUS'] = os.path.join(DIRECTORY, 'cache.bin')
+os.environ['METRICS_ENABLED'] = 'true'
+os.environ['METRICS_DIR'] = os.path.join(DIRECTORY, 'metrics')
+# Every request in the suite is held to its Resource's query_budget
+os.environ['QUERY_BUDGETS'] = 'true'
+os.environ['QUERY_BUDGET_STRICT'] = 'true'
+# So the row counting cursor is in the way of every statement the suite runs
+os.environ['SQL_INSTRUMENTATION'] = 'true'
+# Hooked but out of reach; tests lower app.config['SLOW_QUERY_MS'] to record statements
+os.environ['SLOW_QUERY_MS'] = '60000'
+# Hooked with no sampling, so only requests sending this token are profiled
+os.environ['PROFILE_TOKEN'] = 'tests-only-profile-token'
+os.environ['PROFILE_DIR'] = os.path.join(DIRECTORY, 'profiles')
+
+from datetime import datetime
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event as sql_event
+from config import app, db
+from models import User, Event, Group, Comment, RSVP, EventInvitation, GroupInvitation
+from cache import CACHES
+from autocomplete import INDEXES
+from slow_queries import slow_queries
+import app as routes  # noqa: F401  registers the API resources
+
+
+@pytest.fixture(autouse=True)
+def database():
+    """
+    A fresh schema for every test. Ids start over, so per-worker state keyed by
+    id is cleared as well.
+    """
+    app.config.update(TESTING=True, JWT_COOKIE_CSRF_PROTECT=False, JWT_COOKIE_SECURE=False)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    for cache in CACHES:
+        cache.clear()
+    for index in INDEXES.values():
+        index.reset()
+    slow_queries.clear()
+    yield
+    with app.app_context():
+        db.session.remove()
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+@pytest.fixture
+def login():
+    """
+    login(client, user_id) sets an access cookie for the user on the test client.
+    """
+    def login(client, user_id):
+        with app.app_context():
+            client.set_cookie('access_token_cookie', create_access_token(identity=str(user_id)))
+    return login
+
+
+@pytest.fixture
+def statements():
+    """
+    SQL statements sent to the database while the list is being recorded;
+    clear() it before the request to measure.
+    """
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    sql_event.listen(engine, 'before_cursor_execute', record)
+    yield recorded
+    sql_event.remove(engine, 'before_cursor_execute', record)
+
+
+class Factory:
+    """
+    Creates committed rows and returns their ids.
+    """
+
+    def __init__(self):
+        self._count = 0
+
+    def _add(self, obj):
+        with app.app_context():
+            db.session.add(obj)
+            db.session.commit()
+            return obj.id
+
+    def _unique(self, prefix):
+        self._count += 1
+        return f'{prefix}{self._count}'
+
+    def user(self, username=None):
+        username = username or self._unique('user')
+        user = User(username=username, email=f'{username}@example.com')
+        user.password = 'Password1'
+        return self._add(user)
+
+    def event(self, owner, name=None):
+        return self._add(Event(
+            name=name or self._unique('event'), date=datetime(2025, 6, 1, 18, 30),
+            location='Hall', description='An event', user_id=owner
+        ))
+
+    def group(self, owner, members=()):
+        with app.app_context():
+            group = Group(name=self._unique('group'), description='A group', user_id=owner)
+            group.members = db.session.scalars(db.select(User).filter(User.id.in_(members))).all()
+            db.session.add(group)
+            db.session.commit()
+            return group.id
+
+    def comment(self, event_id, user_id, content='A comment'):
+        return self._add(Comment(event_id=event_id, user_id=user_id, content=content))
+
+    def rsvp(self, event_id, user_id, status='Going'):
+        return self._add(RSVP(event_id=event_id, user_id=user_id, status=status))
+
+    def event_invitation(self, event_id, invitee_id, status='Pending'):
+        with app.app_context():
+            inviter = db.session.get(Event, event_id).user_id
+        return self._add(EventInvitation(event_id=event_id, inviter_id=inviter, invitee_id=invitee_id, status=status))
+
+    def group_invitation(self, group_id, invitee_id, status='Pending'):
+        with app.app_context():
+            inviter = db.session.get(Group, group_id).user_id
+        return self._add(GroupInvitation(group_id=group_id, inviter_id=inviter, invited_user_id=invitee_id, status=status))
+
+
+@pytest.fixture
+def make():
+    return Factory()
@@ -0,0 +1,57 @@
+from sqlalchemy import insert
+from config import app, db
+from models import User
+import autocomplete
+from autocomplete import PrefixIndex
+
+
+def names(response):
+    return [match['username'] for match in response.get_json()]
+
+
+def test_own_commits_are_applied_without_a_rebuild(client, make, statements):
+    make.user('alice')
+    assert names(client.get('/api/autocomplete/users?q=al')) == ['alice']
+
+    make.user('alfred')
+    statements.clear()
+    assert names(client.get('/api/autocomplete/users?q=al')) == ['alfred', 'alice']
+    assert statements == []
+
+
+def other_worker_adds(username):
+    # Another worker commits a user and publishes it through its own copy of the index
+    with app.app_context():
+        user_id = db.session.execute(
+            insert(User).values(username=username, email=f'{username}@example.com', password_hash='x').returning(User.id)
+        ).scalar_one()
+        db.session.commit()
+    PrefixIndex(User.username, 'username').apply([('upsert', user_id, username)])
+
+
+def test_commits_in_another_worker_are_applied_without_a_rebuild(client, make, statements):
+    make.user('alice')
+    assert names(client.get('/api/autocomplete/users?q=al')) == ['alice']
+
+    other_worker_adds('albert')
+    statements.clear()
+    assert names(client.get('/api/autocomplete/users?q=al')) == ['albert', 'alice']
+    assert statements == []
+
+
+def test_a_rotated_journal_rebuilds_the_index(client, make, monkeypatch):
+    make.user('alice')
+    assert names(client.get('/api/autocomplete/users?q=al')) == ['alice']
+
+    monkeypatch.setattr(autocomplete, 'JOURNAL_MAX_BYTES', 1)
+    other_worker_adds('albert')
+    assert names(client.get('/api/autocomplete/users?q=al')) == ['albert', 'alice']
+
+
+def test_queries_stop_at_the_limit(client, make):
+    for number in range(5):
+        make.user(f'alpha{number}')
+    make.user('beta')
+
+    response = client.get('/api/autocomplete/users?q=al&limit=3')
+    assert names(response) == ['alpha0', 'alpha1', 'alpha2']
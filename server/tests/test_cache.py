@@ -0,0 +1,39 @@
+import multiprocessing
+from config import app, db
+from models import Comment
+from cache import event_details
+
+
+def _comment(event_id, user_id, content):
+    # Connections are not shared across a fork; the child opens its own
+    with app.app_context():
+        db.engine.dispose(close=False)
+        db.session.add(Comment(event_id=event_id, user_id=user_id, content=content))
+        db.session.commit()
+
+
+def commit_in_another_worker(target, *args):
+    """
+    Run target in a forked process, the way gunicorn forks its workers, so its
+    commit reaches this process only through the shared version table.
+    """
+    process = multiprocessing.get_context('fork').Process(target=target, args=args)
+    process.start()
+    process.join(30)
+    assert process.exitcode == 0
+
+
+def test_a_commit_in_another_worker_invalidates_the_cached_detail(client, login, make):
+    owner = make.user()
+    event_id = make.event(owner)
+    login(client, owner)
+    path = f'/api/events/{event_id}'
+
+    assert client.get(path).get_json()['comments'] == []
+    hits = event_details.hits
+    assert client.get(path).get_json()['comments'] == []
+    assert event_details.hits == hits + 1
+
+    commit_in_another_worker(_comment, event_id, owner, 'From another worker')
+    comments = client.get(path).get_json()['comments']
+    assert [comment['content'] for comment in comments] == ['From another worker']
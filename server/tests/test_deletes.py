@@ -0,0 +1,34 @@
+from config import app, db
+from models import Event, User
+
+
+def test_only_the_owner_can_delete_an_event(client, login, make, statements):
+    owner, guest = make.user(), make.user()
+    event_id = make.event(owner)
+    make.rsvp(event_id, guest)
+    make.comment(event_id, guest)
+
+    # The refusal is decided on the owner column alone
+    login(client, guest)
+    statements.clear()
+    assert client.delete(f'/api/events/{event_id}').status_code == 403
+    assert len(statements) == 1
+
+    login(client, owner)
+    assert client.delete(f'/api/events/{event_id}').status_code == 200
+    with app.app_context():
+        assert db.session.get(Event, event_id) is None
+
+
+def test_deleting_a_profile_deletes_its_events(client, login, make):
+    owner, guest = make.user(), make.user()
+    event_id = make.event(owner)
+    make.event_invitation(event_id, guest, status='Accepted')
+    make.rsvp(event_id, guest)
+    make.comment(event_id, guest)
+
+    login(client, owner)
+    assert client.delete('/api/profile/delete').status_code == 200
+    with app.app_context():
+        assert db.session.get(User, owner) is None
+        assert db.session.get(Event, event_id) is None
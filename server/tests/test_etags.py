@@ -0,0 +1,96 @@
+from config import app, db
+from sqlalchemy import insert
+from models import event_invitation
+
+
+def revalidate(client, path, etag):
+    return client.get(path, headers={'If-None-Match': etag})
+
+
+def test_event_detail_is_not_modified_until_a_comment_is_added(client, login, make):
+    owner = make.user()
+    event_id = make.event(owner)
+    login(client, owner)
+    path = f'/api/events/{event_id}'
+
+    first = client.get(path)
+    assert first.status_code == 200
+    assert revalidate(client, path, first.headers['ETag']).status_code == 304
+
+    make.comment(event_id, owner, 'New comment')
+    changed = revalidate(client, path, first.headers['ETag'])
+    assert changed.status_code == 200
+    assert [comment['content'] for comment in changed.get_json()['comments']] == ['New comment']
+
+
+def test_not_modified_does_not_load_relationships(client, login, make, statements):
+    owner = make.user()
+    event_id = make.event(owner)
+    for _ in range(3):
+        make.comment(event_id, make.user())
+    login(client, owner)
+    path = f'/api/events/{event_id}'
+    etag = client.get(path).headers['ETag']
+
+    for cache_path in ('/api/events', f'/api/events/{event_id}/comments', f'/api/events/{event_id}/rsvps'):
+        client.get(cache_path)
+    statements.clear()
+    assert revalidate(client, path, etag).status_code == 304
+    assert not any('comments' in statement for statement in statements)
+
+
+def test_deleting_a_member_changes_the_group(client, login, make):
+    owner, member = make.user(), make.user('leaving')
+    group_id = make.group(owner, members=[owner, member])
+    path = f'/api/groups/{group_id}'
+    first = client.get(path)
+    assert [user['username'] for user in first.get_json()['members']].count('leaving') == 1
+
+    login(client, member)
+    assert client.delete('/api/profile/delete').status_code == 200
+
+    changed = revalidate(client, path, first.headers['ETag'])
+    assert changed.status_code == 200
+    assert 'leaving' not in [user['username'] for user in changed.get_json()['members']]
+
+
+def test_deleting_an_invited_user_changes_the_event(client, login, make):
+    owner, invitee = make.user(), make.user('leaving')
+    event_id = make.event(owner)
+    with app.app_context():
+        db.session.execute(insert(event_invitation).values(event_id=event_id, user_id=invitee))
+        db.session.commit()
+    login(client, owner)
+    path = f'/api/events/{event_id}'
+    first = client.get(path)
+    assert [user['id'] for user in first.get_json()['invited_users']] == [invitee]
+
+    login(client, invitee)
+    assert client.delete('/api/profile/delete').status_code == 200
+
+    login(client, owner)
+    changed = revalidate(client, path, first.headers['ETag'])
+    assert changed.status_code == 200
+    assert changed.get_json()['invited_users'] == []
+
+
+def test_rsvps_refusals_and_not_modified_skip_the_event_payload(client, login, make, statements):
+    owner, guest, outsider = make.user(), make.user(), make.user()
+    event_id = make.event(owner)
+    make.event_invitation(event_id, guest, status='Accepted')
+    make.rsvp(event_id, guest)
+    make.comment(event_id, guest)
+    path = f'/api/events/{event_id}/rsvps'
+
+    login(client, owner)
+    first = client.get(path)
+    assert first.status_code == 200
+    assert [rsvp['user_id'] for rsvp in first.get_json()] == [guest]
+    statements.clear()
+    assert revalidate(client, path, first.headers['ETag']).status_code == 304
+    assert len(statements) == 1
+
+    login(client, outsider)
+    statements.clear()
+    assert client.get(path).status_code == 403
+    assert len(statements) == 2
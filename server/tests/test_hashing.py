@@ -0,0 +1,30 @@
+from config import app
+from models import User
+from hashing import HashingExecutor, _hashpw, _checkpw
+
+
+def test_register_fails_fast_when_the_hashing_queue_is_full(client, monkeypatch):
+    monkeypatch.setitem(app.config, 'BCRYPT_MAX_QUEUE', 0)
+    response = client.post('/api/register', json={'username': 'busy', 'email': 'busy@example.com', 'password': 'Password1'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_login_rehashes_passwords_made_with_another_work_factor(client, make, monkeypatch):
+    make.user('rehash')
+    monkeypatch.setitem(app.config, 'BCRYPT_LOG_ROUNDS', 5)
+    response = client.post('/api/login', json={'email': 'rehash@example.com', 'password': 'Password1'})
+    assert response.status_code == 200
+    with app.app_context():
+        assert User.query.filter_by(username='rehash').one().password_hash.startswith('$2b$05$')
+
+
+def test_the_hashing_pool_does_not_fork_the_worker(monkeypatch):
+    monkeypatch.setitem(app.config, 'BCRYPT_POOL_SIZE', 1)
+    executor = HashingExecutor()
+    try:
+        password_hash = executor.run(_hashpw, b'Password1', 4)
+        assert executor.run(_checkpw, b'Password1', password_hash)
+        assert executor._pool._mp_context.get_start_method() == 'forkserver'
+    finally:
+        executor._pool.shutdown()
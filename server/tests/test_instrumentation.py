@@ -0,0 +1,8 @@
+def test_server_timing_counts_rows_read(client, make):
+    for _ in range(3):
+        make.user()
+
+    # A page of two reads a third row to learn whether there is a next page
+    response = client.get('/api/users', query_string={'limit': 2})
+    assert response.status_code == 200
+    assert 'desc="1 queries, 3 rows"' in response.headers['Server-Timing']
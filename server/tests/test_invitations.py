@@ -0,0 +1,164 @@
+from sqlalchemy import select
+from config import app, db
+from models import EventInvitation, GroupInvitation, group_member
+
+
+def invitees(event_id):
+    with app.app_context():
+        return sorted(invitation.invitee_id for invitation in EventInvitation.query.filter_by(event_id=event_id))
+
+
+def members(group_id):
+    """
+    Member ids of a group, one per membership row, so duplicates would show.
+    """
+    with app.app_context():
+        return sorted(db.session.scalars(select(group_member.c.user_id).where(group_member.c.group_id == group_id)))
+
+
+def statuses(model, ids):
+    with app.app_context():
+        return {invitation.id: invitation.status for invitation in model.query.filter(model.id.in_(ids))}
+
+
+def test_group_members_can_invite_the_group(client, login, make):
+    owner, member, other = make.user(), make.user(), make.user()
+    group_id = make.group(owner, members=[owner, member, other])
+    event_id = make.event(member)
+    login(client, member)
+
+    response = client.post(f'/api/events/{event_id}/invite/group', json={'group_id': group_id})
+    assert response.status_code == 201
+    assert response.get_json()['created'] == 2
+    assert invitees(event_id) == sorted([owner, other])
+
+
+def test_outsiders_cannot_invite_a_group(client, login, make):
+    owner, member, outsider = make.user(), make.user(), make.user()
+    group_id = make.group(owner, members=[owner, member])
+    event_id = make.event(outsider)
+    login(client, outsider)
+
+    response = client.post(f'/api/events/{event_id}/invite/group', json={'group_id': group_id})
+    assert response.status_code == 403
+    assert invitees(event_id) == []
+
+
+def test_inviting_a_list_reports_each_id(client, login, make, statements):
+    owner, invited, new = make.user(), make.user(), make.user()
+    event_id = make.event(owner)
+    make.event_invitation(event_id, invited)
+    login(client, owner)
+
+    statements.clear()
+    response = client.post(f'/api/events/{event_id}/invite', json={
+        'invited_user_ids': [new, invited, 9999, owner, new, 'x']
+    })
+    assert response.status_code == 201
+    outcomes = [(result['user_id'], result['status']) for result in response.get_json()['results']]
+    assert outcomes == [
+        (new, 'invited'), (invited, 'already_invited'), (9999, 'not_found'),
+        (owner, 'self'), (new, 'duplicate'), ('x', 'invalid'),
+    ]
+    assert response.get_json()['invited'] == 1
+    assert invitees(event_id) == sorted([invited, new])
+    assert sum(statement.startswith('INSERT INTO event_invitations') for statement in statements) == 1
+
+
+def test_only_the_owner_can_invite_a_list(client, login, make):
+    owner, other, invitee = make.user(), make.user(), make.user()
+    event_id = make.event(owner)
+    login(client, other)
+
+    response = client.post(f'/api/events/{event_id}/invite', json={'invited_user_ids': [invitee]})
+    assert response.status_code == 403
+    assert invitees(event_id) == []
+
+
+def test_inviting_a_group_is_one_insert_select(client, login, make, statements):
+    owner = make.user()
+    members = [make.user() for _ in range(20)]
+    group_id = make.group(owner, members=[owner] + members)
+    event_id = make.event(owner)
+    make.event_invitation(event_id, members[0])
+    login(client, owner)
+
+    statements.clear()
+    response = client.post(f'/api/events/{event_id}/invite/group', json={'group_id': group_id})
+    assert response.status_code == 201
+    # The owner and the member invited already are skipped
+    assert response.get_json()['created'] == 19
+    assert response.get_json()['skipped'] == 2
+    assert invitees(event_id) == sorted(members)
+    inserts = [statement for statement in statements if statement.startswith('INSERT INTO event_invitations')]
+    assert len(inserts) == 1
+    assert 'SELECT' in inserts[0]
+
+
+def test_only_the_event_owner_can_invite_a_group(client, login, make):
+    owner, member = make.user(), make.user()
+    group_id = make.group(owner, members=[owner, member])
+    event_id = make.event(owner)
+    login(client, member)
+
+    response = client.post(f'/api/events/{event_id}/invite/group', json={'group_id': group_id})
+    assert response.status_code == 403
+    assert invitees(event_id) == []
+
+
+def test_a_bulk_batch_with_anothers_invitation_changes_nothing(client, login, make):
+    owner, invitee, other = make.user(), make.user(), make.user()
+    event_id = make.event(owner)
+    mine = make.event_invitation(event_id, invitee)
+    theirs = make.event_invitation(event_id, other)
+    login(client, invitee)
+
+    response = client.put('/api/event_invitations/bulk', json={'invitation_ids': [mine, theirs], 'action': 'accept'})
+    assert response.status_code == 403
+    assert response.get_json()['ids'] == [theirs]
+    response = client.put('/api/event_invitations/bulk', json={'invitation_ids': [mine, 9999], 'action': 'deny'})
+    assert response.status_code == 404
+    assert response.get_json()['ids'] == [9999]
+    assert statuses(EventInvitation, [mine, theirs]) == {mine: 'Pending', theirs: 'Pending'}
+
+    group_id = make.group(owner, members=[owner])
+    group_mine = make.group_invitation(group_id, invitee)
+    group_theirs = make.group_invitation(group_id, other)
+    response = client.put('/api/group_invitations/bulk', json={
+        'invitation_ids': [group_mine, group_theirs], 'action': 'accept'
+    })
+    assert response.status_code == 403
+    assert statuses(GroupInvitation, [group_mine, group_theirs]) == {group_mine: 'Pending', group_theirs: 'Pending'}
+    assert members(group_id) == [owner]
+
+
+def test_bulk_accept_and_deny_change_only_the_listed_event_invitations(client, login, make):
+    owner, invitee = make.user(), make.user()
+    events = [make.event(owner) for _ in range(3)]
+    accepted, denied, untouched = (make.event_invitation(event_id, invitee) for event_id in events)
+    login(client, invitee)
+
+    response = client.put('/api/event_invitations/bulk', json={'invitation_ids': [accepted], 'action': 'accept'})
+    assert response.status_code == 200
+    response = client.put('/api/event_invitations/bulk', json={'invitation_ids': [denied], 'action': 'deny'})
+    assert response.status_code == 200
+    # Denied event invitations are deleted
+    assert statuses(EventInvitation, [accepted, denied, untouched]) == {accepted: 'Accepted', untouched: 'Pending'}
+
+
+def test_bulk_accepting_group_invitations_adds_each_member_once(client, login, make):
+    owner, invitee = make.user(), make.user()
+    joined = make.group(owner, members=[owner, invitee])
+    fresh = make.group(owner, members=[owner])
+    declined = make.group(owner, members=[owner])
+    invitations = [make.group_invitation(group_id, invitee) for group_id in (joined, fresh, declined)]
+    login(client, invitee)
+
+    response = client.put('/api/group_invitations/bulk', json={'invitation_ids': invitations[:2], 'action': 'accept'})
+    assert response.status_code == 200
+    response = client.put('/api/group_invitations/bulk', json={'invitation_ids': invitations[2:], 'action': 'deny'})
+    assert response.status_code == 200
+
+    assert members(joined) == members(fresh) == sorted([owner, invitee])
+    assert members(declined) == [owner]
+    assert list(statuses(GroupInvitation, invitations).values()) == ['Accepted', 'Accepted', 'Denied']
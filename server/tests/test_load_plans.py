@@ -0,0 +1,34 @@
+import pytest
+
+LISTS = ('/api/events', '/api/groups', '/api/users')
+
+
+def populate(make, events, related):
+    """
+    Events and groups, each with related users as commenters, guests, invitees and members.
+    """
+    users = [make.user() for _ in range(related)]
+    for _ in range(events):
+        event_id = make.event(users[0])
+        for user_id in users:
+            make.comment(event_id, user_id)
+            make.rsvp(event_id, user_id)
+            make.event_invitation(event_id, user_id)
+        make.group(users[0], members=users)
+
+
+@pytest.mark.parametrize('path', LISTS)
+def test_list_query_count_does_not_grow_with_the_page(client, login, make, statements, path):
+    login(client, make.user())
+    populate(make, events=1, related=1)
+    statements.clear()
+    response = client.get(f'{path}?limit=100')
+    assert response.status_code == 200
+    page, small = len(response.get_json()), len(statements)
+
+    populate(make, events=10, related=6)
+    statements.clear()
+    response = client.get(f'{path}?limit=100')
+    assert response.status_code == 200
+    assert len(response.get_json()) > page
+    assert len(statements) == small
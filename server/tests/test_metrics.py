@@ -0,0 +1,15 @@
+import re
+
+from metrics import LATENCY_BUCKETS
+
+
+def test_histograms_expose_every_bucket(client):
+    assert client.get('/api/users').status_code == 200
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    bounds = re.findall(
+        r'^http_request_duration_seconds_bucket\{resource="UserList",method="GET",le="([^"]+)"\} ',
+        response.get_data(as_text=True), re.MULTILINE
+    )
+    assert bounds == [repr(bound) for bound in LATENCY_BUCKETS] + ['+Inf']
@@ -0,0 +1,55 @@
+import json
+import os
+
+import flask_migrate
+from sqlalchemy import text
+from config import app, db
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+
+def upgrade(revision='head'):
+    with app.app_context():
+        flask_migrate.upgrade(directory=MIGRATIONS, revision=revision)
+    # alembic's fileConfig disables the loggers that already exist, the app's included
+    app.logger.disabled = False
+
+
+def test_comments_from_before_created_at_can_be_paged(client):
+    with app.app_context():
+        db.drop_all()
+    upgrade('0ad0cace2b58')
+    with app.app_context():
+        db.session.execute(text(
+            "INSERT INTO users (id, username, email, password_hash) VALUES (1, 'ada', 'ada@example.com', 'x')"
+        ))
+        db.session.execute(text(
+            "INSERT INTO events (id, name, date, location, description, user_id) "
+            "VALUES (1, 'Launch', '2025-06-01 18:30:00.000000', 'Hall', 'An event', 1)"
+        ))
+        db.session.execute(text("INSERT INTO comments (content, user_id, event_id) VALUES (:content, 1, 1)"), [
+            {'content': f'comment {i}'} for i in range(5)
+        ])
+        db.session.commit()
+    upgrade()
+
+    try:
+        seen, args = [], {'limit': 2}
+        for _ in range(6):
+            response = client.get('/api/events/1/comments', query_string=args)
+            assert response.status_code == 200
+            seen += [comment['id'] for comment in response.get_json()]
+            if 'X-Next-Cursor' not in response.headers:
+                break
+            args['cursor'] = response.headers['X-Next-Cursor']
+        assert seen == [5, 4, 3, 2, 1]
+
+        first_page = client.get('/api/events/1/comments', query_string={'limit': 2})
+        streamed = client.get('/api/events/1/comments', query_string={
+            'format': 'ndjson', 'cursor': first_page.headers['X-Next-Cursor']
+        })
+        assert [json.loads(line)['id'] for line in streamed.get_data(as_text=True).splitlines()] == [3, 2, 1]
+    finally:
+        with app.app_context():
+            db.session.execute(text('DROP TABLE alembic_version'))
+            db.session.commit()
@@ -0,0 +1,81 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+from config import app, db
+from models import Comment, Event
+
+
+def walk(client, path, limit):
+    """
+    Every page of a list by following X-Next-Cursor, as (ids, page count).
+    """
+    ids, pages, args = [], 0, {'limit': limit}
+    while True:
+        response = client.get(path, query_string=args)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= limit
+        ids += [item['id'] for item in page]
+        pages += 1
+        if 'X-Next-Cursor' not in response.headers:
+            return ids, pages
+        assert len(page) == limit
+        args['cursor'] = response.headers['X-Next-Cursor']
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def test_event_pages_break_date_ties_by_id(client, make):
+    owner = make.user()
+    event_ids = [make.event(owner) for _ in range(7)]
+    # Two earlier events; the other five share one date
+    with app.app_context():
+        db.session.execute(update(Event).where(Event.id.in_(event_ids[-2:])).values(date=datetime(2025, 1, 1)))
+        db.session.commit()
+
+    ids, pages = walk(client, '/api/events', limit=2)
+    assert ids == event_ids[-2:] + event_ids[:-2]
+    assert pages == 4
+
+
+def test_comment_pages_break_created_at_ties_by_id(client, make):
+    owner = make.user()
+    event_id = make.event(owner)
+    comment_ids = [make.comment(event_id, owner, f'comment {number}') for number in range(5)]
+    with app.app_context():
+        db.session.execute(update(Comment).values(created_at=datetime(2025, 6, 1, 12, 0)))
+        db.session.commit()
+
+    ids, _ = walk(client, f'/api/events/{event_id}/comments', limit=2)
+    assert ids == comment_ids[::-1]
+
+
+def test_the_last_page_has_no_cursor(client, make):
+    for _ in range(4):
+        make.user()
+
+    exact = client.get('/api/users', query_string={'limit': 4})
+    assert len(exact.get_json()) == 4
+    assert 'X-Next-Cursor' not in exact.headers
+
+    ids, pages = walk(client, '/api/users', limit=3)
+    assert len(ids) == len(set(ids)) == 4
+    assert pages == 2
+
+
+@pytest.mark.parametrize('value', [
+    'not-a-cursor!',
+    cursor([1]),
+    cursor(['2025-06-01T18:30:00', '1']),
+    cursor(['yesterday', 1]),
+    cursor({'date': '2025-06-01T18:30:00', 'id': 1}),
+])
+def test_malformed_or_tampered_cursors_are_rejected(client, make, value):
+    make.event(make.user())
+    response = client.get('/api/events', query_string={'cursor': value})
+    assert response.status_code == 400
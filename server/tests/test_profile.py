@@ -0,0 +1,19 @@
+def test_profile_lists_each_event_once_with_the_users_rsvp(client, login, make):
+    user, host = make.user(), make.user()
+    # Owned and also invited to, e.g. after an ownership transfer
+    owned = make.event(user)
+    make.event_invitation(owned, user, status='Accepted')
+    make.rsvp(owned, user, status='Maybe')
+    accepted = make.event(host)
+    make.event_invitation(accepted, user, status='Accepted')
+    pending = make.event(host)
+    make.event_invitation(pending, user)
+    denied = make.event(host)
+    make.event_invitation(denied, user, status='Denied')
+    make.rsvp(denied, user)
+    login(client, user)
+
+    response = client.get('/api/profile')
+    assert response.status_code == 200
+    events = [(event['id'], event['rsvp_status']) for event in response.get_json()['events']]
+    assert events == [(owned, 'Maybe'), (accepted, 'Needs RSVP')]
@@ -0,0 +1,35 @@
+import os
+import pytest
+from config import app
+
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    """
+    The directory profiles are written to, empty at the start of the test.
+    """
+    monkeypatch.setitem(app.config, 'PROFILE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_the_profile_token_writes_a_collapsed_profile(client, profiles):
+    response = client.get('/api/events', headers={'X-Profile': app.config['PROFILE_TOKEN'], 'X-Request-ID': 'abc/123'})
+    assert response.status_code == 200
+    name = response.headers['X-Profile-Id']
+    assert name == 'EventList.GET.abc123'
+    assert os.listdir(profiles) == [f'{name}.collapsed']
+
+
+def test_a_wrong_token_profiles_nothing(client, profiles):
+    response = client.get('/api/events', headers={'X-Profile': 'not-the-token'})
+    assert response.status_code == 200
+    assert 'X-Profile-Id' not in response.headers
+    assert os.listdir(profiles) == []
+
+
+@pytest.mark.parametrize('rate, written', [(0.0, 0), (1.0, 3)])
+def test_the_sample_rate_picks_requests_without_a_token(client, profiles, monkeypatch, rate, written):
+    monkeypatch.setitem(app.config, 'PROFILE_SAMPLE_RATE', rate)
+    for _ in range(3):
+        assert client.get('/api/events').status_code == 200
+    assert len(os.listdir(profiles)) == written
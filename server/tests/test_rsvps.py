@@ -0,0 +1,67 @@
+import threading
+
+from config import app
+from models import RSVP
+
+
+def rsvps(event_id):
+    with app.app_context():
+        return sorted((rsvp.user_id, rsvp.status) for rsvp in RSVP.query.filter_by(event_id=event_id))
+
+
+def test_rsvp_is_created_then_updated(client, login, make):
+    owner, guest = make.user(), make.user()
+    event_id = make.event(owner)
+    make.event_invitation(event_id, guest, status='Accepted')
+    login(client, guest)
+
+    first = client.post('/api/rsvps', json={'event_id': event_id, 'status': 'Going'})
+    second = client.post('/api/rsvps', json={'event_id': event_id, 'status': 'Maybe'})
+    assert first.status_code == second.status_code == 201
+    assert first.get_json()['rsvp']['id'] == second.get_json()['rsvp']['id']
+    assert rsvps(event_id) == [(guest, 'Maybe')]
+
+
+def test_rsvp_requires_an_accepted_invitation(client, login, make):
+    owner, pending, outsider = make.user(), make.user(), make.user()
+    event_id = make.event(owner)
+    make.event_invitation(event_id, pending)
+
+    for user_id in (pending, outsider):
+        login(client, user_id)
+        response = client.post('/api/rsvps', json={'event_id': event_id, 'status': 'Going'})
+        assert response.status_code == 403
+    assert rsvps(event_id) == []
+
+    response = client.post('/api/rsvps', json={'event_id': event_id + 1, 'status': 'Going'})
+    assert response.status_code == 404
+
+
+def test_concurrent_rsvps_leave_one_row_per_user(login, make):
+    owner = make.user()
+    event_id = make.event(owner)
+    guests = [make.user() for _ in range(4)]
+    for guest in guests:
+        make.event_invitation(event_id, guest, status='Accepted')
+
+    statuses = ('Going', 'Maybe', 'Not Going')
+    jobs = [(guest, status) for guest in guests for status in statuses]
+    start = threading.Barrier(len(jobs))
+    codes = []
+
+    def submit(guest, status):
+        client = app.test_client()
+        login(client, guest)
+        start.wait()
+        codes.append(client.post('/api/rsvps', json={'event_id': event_id, 'status': status}).status_code)
+
+    threads = [threading.Thread(target=submit, args=job) for job in jobs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert codes == [201] * len(jobs)
+    rows = rsvps(event_id)
+    assert [user_id for user_id, _ in rows] == sorted(guests)
+    assert all(status in statuses for _, status in rows)
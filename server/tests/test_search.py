@@ -0,0 +1,80 @@
+from sqlalchemy import text
+from config import app, db
+from models import Event, Group, User
+
+
+def indexed():
+    """
+    The search index as {(kind, ref_id): (title, body)}.
+    """
+    with app.app_context():
+        rows = db.session.execute(text("SELECT kind, ref_id, title, body FROM search_index"))
+        return {(row.kind, row.ref_id): (row.title, row.body) for row in rows}
+
+
+def found(client, q, **args):
+    response = client.get('/api/search', query_string={'q': q, **args})
+    assert response.status_code == 200
+    return [(result['type'], result['id']) for result in response.get_json()]
+
+
+def test_flushes_create_update_and_remove_index_rows(client, login, make, statements):
+    owner = make.user('alice')
+    event_id = make.event(owner, name='Rooftop concert')
+    assert indexed() == {
+        ('user', owner): ('alice', ''),
+        ('event', event_id): ('Rooftop concert', 'An event Hall'),
+    }
+
+    with app.app_context():
+        event = db.session.get(Event, event_id)
+        event.location = 'Garden'
+        db.session.commit()
+    assert indexed()[('event', event_id)] == ('Rooftop concert', 'An event Garden')
+
+    with app.app_context():
+        user = db.session.get(User, owner)
+        statements.clear()
+        user.email = 'alice@example.org'
+        db.session.commit()
+    # A change to a field outside the document leaves the index alone
+    assert not any('search_index' in statement for statement in statements)
+    login(client, owner)
+    assert client.delete(f'/api/events/{event_id}').status_code == 200
+    assert indexed() == {('user', owner): ('alice', '')}
+
+
+def test_title_matches_rank_above_body_matches(client, make):
+    owner = make.user()
+    in_body = make.event(owner, name='Evening meetup')
+    in_title = make.event(owner, name='Jazz night')
+    with app.app_context():
+        db.session.get(Event, in_body).description = 'Live jazz and food'
+        db.session.commit()
+
+    assert found(client, 'jazz') == [('event', in_title), ('event', in_body)]
+    # Terms match as prefixes
+    assert found(client, 'ja') == [('event', in_title), ('event', in_body)]
+
+
+def test_results_can_be_limited_to_types(client, make):
+    user = make.user('chess')
+    event_id = make.event(user, name='Chess club')
+    group_id = make.group(user)
+    with app.app_context():
+        db.session.get(Group, group_id).name = 'Chess players'
+        db.session.commit()
+
+    assert sorted(found(client, 'chess')) == sorted([('user', user), ('event', event_id), ('group', group_id)])
+    assert found(client, 'chess', type='event') == [('event', event_id)]
+    assert sorted(found(client, 'chess', type='group,user')) == sorted([('group', group_id), ('user', user)])
+    assert client.get('/api/search', query_string={'q': 'chess', 'type': 'comment'}).status_code == 400
+
+
+def test_list_endpoints_filter_through_the_index(client, make):
+    owner = make.user()
+    picnic = make.event(owner, name='Summer picnic')
+    make.event(owner, name='Board games')
+
+    response = client.get('/api/events', query_string={'q': 'picnic'})
+    assert [event['id'] for event in response.get_json()] == [picnic]
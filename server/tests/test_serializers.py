@@ -0,0 +1,10 @@
+from benchmarks.serializers import EVENT_RULES, USER_RULES, build_objects
+from serializers import serialize_event, serialize_user
+
+
+def test_compiled_serializers_match_to_dict():
+    users, events = build_objects(50)
+    for user in users:
+        assert serialize_user(user) == user.to_dict(rules=USER_RULES)
+    for event in events:
+        assert serialize_event(event) == event.to_dict(rules=EVENT_RULES)
@@ -0,0 +1,125 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+from config import app, db
+from models import User
+from slow_queries import normalize, fingerprint, explain, slow_queries, _after_statement
+
+
+@pytest.mark.parametrize('statements', [
+    ("SELECT * FROM users WHERE id IN (?, ?, ?)", "SELECT * FROM users WHERE id IN (?)"),
+    ("SELECT * FROM users WHERE username = 'ada'", "SELECT * FROM users  WHERE username = 'it''s'"),
+    ("SELECT * FROM events WHERE id = 12 LIMIT 20", "SELECT * FROM events WHERE id = :id_1 LIMIT :param_1"),
+    ("SELECT * FROM events WHERE id = %(id_1)s", "SELECT * FROM events\nWHERE id = $1"),
+    ("INSERT INTO rsvps (event_id) VALUES (?), (?)", "INSERT INTO rsvps (event_id) VALUES (1), (2), (3)"),
+])
+def test_statements_differing_only_in_values_share_a_fingerprint(statements):
+    first, second = (normalize(statement) for statement in statements)
+    assert first == second
+    assert fingerprint(first) == fingerprint(second)
+    assert '?' in first or '...' in first
+
+
+def test_statements_of_different_shapes_do_not_share_a_fingerprint():
+    assert normalize("SELECT * FROM users WHERE id = 1") != normalize("SELECT * FROM users WHERE email = 1")
+    assert normalize("SELECT * FROM users WHERE id IN (?)") != normalize("SELECT * FROM users WHERE id = ?")
+
+
+def run(statement, elapsed):
+    """
+    Hand a statement to the hook as if it had taken elapsed seconds.
+    """
+    with app.app_context(), db.engine.connect() as conn:
+        _after_statement(conn, None, statement, (), None, False, elapsed)
+
+
+def test_only_statements_at_the_threshold_are_recorded(monkeypatch):
+    monkeypatch.setitem(app.config, 'SLOW_QUERY_MS', 50)
+    run('SELECT 1', 0.049)
+    assert slow_queries.report() == []
+
+    run('SELECT 2', 0.05)
+    run('SELECT 3', 0.2)
+    [query] = slow_queries.report()
+    assert query['statement'] == 'SELECT ?'
+    assert query['count'] == 2
+    assert query['max_ms'] == 200
+    assert query['plan']
+
+
+def test_shapes_past_the_cap_are_logged_but_not_kept(monkeypatch, caplog):
+    monkeypatch.setitem(app.config, 'SLOW_QUERY_MS', 0)
+    monkeypatch.setitem(app.config, 'SLOW_QUERY_FINGERPRINTS', 2)
+    for table in ('users', 'events', 'groups', 'users'):
+        run(f'SELECT id FROM {table}', 0.1)
+
+    assert [query['statement'] for query in slow_queries.report()] == ['SELECT id FROM users', 'SELECT id FROM events']
+    logged = [json.loads(record.message)['fingerprint'] for record in caplog.records if '"slow_query"' in record.message]
+    assert logged == [fingerprint(f'SELECT id FROM {table}') for table in ('users', 'events', 'groups', 'users')]
+
+
+def test_a_failing_explain_leaves_the_transaction_usable(make):
+    make.user('ada')
+    with app.app_context():
+        db.session.get(User, 1).username = 'grace'
+        db.session.flush()
+        plan = explain(db.session.connection(), 'SELECT * FROM missing_table', ())
+        assert plan[0].startswith('EXPLAIN failed')
+        db.session.commit()
+        assert db.session.scalar(select(User.username)) == 'grace'
+
+
+class Cursor:
+    """
+    A DB-API cursor recording what it executes, which fails any EXPLAIN.
+    """
+
+    def __init__(self, executed):
+        self.executed = executed
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(statement)
+        if statement.startswith('EXPLAIN'):
+            raise RuntimeError('syntax error')
+
+    def close(self):
+        pass
+
+
+def test_explain_on_postgres_rolls_back_to_its_savepoint():
+    executed = []
+    conn = SimpleNamespace(
+        dialect=SimpleNamespace(name='postgresql'),
+        connection=SimpleNamespace(dbapi_connection=SimpleNamespace(cursor=lambda: Cursor(executed))),
+    )
+    assert explain(conn, 'SELECT 1', {}) == ['EXPLAIN failed: syntax error']
+    assert executed == ['SAVEPOINT slow_query_explain', 'EXPLAIN SELECT 1', 'ROLLBACK TO SAVEPOINT slow_query_explain']
+
+
+def test_slow_query_report_needs_the_metrics_token(client, login, make, monkeypatch):
+    user = make.user()
+    login(client, user)
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'scraper-token')
+
+    assert client.get('/api/slow_queries').status_code == 403
+    response = client.get('/api/slow_queries', headers={'Authorization': 'Bearer scraper-token'})
+    assert response.status_code == 200
+
+
+def test_slow_queries_never_expose_credentials(client, make, monkeypatch, caplog):
+    monkeypatch.setitem(app.config, 'SLOW_QUERY_MS', 0)
+    make.user('ada')
+    assert client.post('/api/login', json={'email': 'ada@example.com', 'password': 'Password1'}).status_code == 200
+    monkeypatch.setitem(app.config, 'SLOW_QUERY_MS', 60000)
+
+    report = client.get('/api/slow_queries').get_json()
+    assert report and all('parameters' not in query and 'last_parameters' not in query for query in report)
+
+    lines = [json.loads(record.message) for record in caplog.records if '"slow_query"' in record.message]
+    inserted = [line['parameters'] for line in lines if line.get('statement', '').startswith('INSERT INTO users')]
+    assert inserted == [{'username': 'ada', 'email': '[redacted]', 'password_hash': '[redacted]'}]
+    tokens = [line['parameters'] for line in lines if line.get('statement', '').startswith('INSERT INTO refresh_tokens')]
+    assert tokens and all(parameters['jti'] == parameters['family'] == '[redacted]' for parameters in tokens)
+    assert 'ada@example.com' not in caplog.text and '$2b$' not in caplog.text
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+import streaming
+
+LISTS = ('/api/events', '/api/groups', '/api/users')
+
+
+def populate(make):
+    users = [make.user() for _ in range(5)]
+    for user_id in users:
+        event_id = make.event(user_id)
+        make.comment(event_id, users[0])
+        make.group(user_id, members=users[:2])
+
+
+def ndjson(response):
+    assert response.mimetype == 'application/x-ndjson'
+    text = response.get_data(as_text=True)
+    assert text == '' or text.endswith('\n')
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def json_array(response):
+    assert response.mimetype == 'application/json'
+    return json.loads(response.get_data(as_text=True))
+
+
+@pytest.mark.parametrize('path', LISTS)
+@pytest.mark.parametrize('batch_size', [1000, 2])
+def test_streams_match_the_paged_payload(client, login, make, monkeypatch, path, batch_size):
+    # A batch of two makes every stream span several chunks
+    monkeypatch.setattr(streaming, 'STREAM_BATCH_SIZE', batch_size)
+    populate(make)
+    login(client, make.user())
+    paged = client.get(path, query_string={'limit': 100}).get_json()
+
+    assert ndjson(client.get(path, query_string={'format': 'ndjson'})) == paged
+    assert ndjson(client.get(path, headers={'Accept': 'application/x-ndjson'})) == paged
+    assert json_array(client.get(path, query_string={'stream': 1})) == paged
+
+
+def test_streams_start_at_the_cursor(client, make):
+    populate(make)
+    first = client.get('/api/users', query_string={'limit': 2})
+    rest = client.get('/api/users', query_string={'format': 'ndjson', 'cursor': first.headers['X-Next-Cursor']})
+    assert first.get_json() + ndjson(rest) == client.get('/api/users').get_json()
+
+
+def test_empty_streams_are_well_formed(client, make):
+    event_id = make.event(make.user())
+    path = f'/api/events/{event_id}/comments'
+
+    assert ndjson(client.get(path, query_string={'format': 'ndjson'})) == []
+    response = client.get(path, query_string={'stream': 1})
+    assert response.get_data(as_text=True) == '[]'
+    assert json_array(response) == []
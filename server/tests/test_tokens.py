@@ -0,0 +1,35 @@
+from config import app
+
+REFRESH_PATH = '/api/token/refresh'
+
+
+def log_in(client, email):
+    response = client.post('/api/login', json={'email': email, 'password': 'Password1'})
+    assert response.status_code == 200
+    return client.get_cookie('refresh_token_cookie', path=REFRESH_PATH).value
+
+
+def test_refresh_rotates_the_token(client, make):
+    make.user('rotate')
+    first = log_in(client, 'rotate@example.com')
+    assert client.post(REFRESH_PATH).status_code == 200
+    assert client.get_cookie('refresh_token_cookie', path=REFRESH_PATH).value != first
+
+
+def test_logout_revokes_the_refresh_token(client, make):
+    make.user('leaving')
+    captured = log_in(client, 'leaving@example.com')
+    assert client.post('/api/logout').status_code == 302
+
+    client.set_cookie('refresh_token_cookie', captured, path=REFRESH_PATH)
+    assert client.post(REFRESH_PATH).status_code == 401
+
+
+def test_logout_keeps_other_logins_of_the_user(make):
+    make.user('two_devices')
+    laptop, phone = app.test_client(), app.test_client()
+    log_in(laptop, 'two_devices@example.com')
+    log_in(phone, 'two_devices@example.com')
+
+    assert laptop.post('/api/logout').status_code == 302
+    assert phone.post(REFRESH_PATH).status_code == 200
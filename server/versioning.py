@@ -0,0 +1,162 @@
+import hashlib
+from datetime import datetime, timezone
+from flask import request, make_response
+from sqlalchemy import event, update, insert, inspect as sql_inspect
+from sqlalchemy.orm import Session
+from config import db
+from models import User, Event, Group, RSVP, Comment, GroupInvitation, EventInvitation, CollectionVersion
+
+# Rows whose changes show up in an event's or a group's serialized payload
+EVENT_CHILDREN = (Comment, RSVP, EventInvitation)
+GROUP_CHILDREN = (GroupInvitation,)
+
+
+def _relationship_targets(obj, key):
+    """
+    Objects added to or removed from a relationship since the last flush.
+    """
+    history = sql_inspect(obj).attrs[key].history
+    return [target for target in (history.added or ()) + (history.deleted or ()) if target is not None]
+
+
+def affected_ids(session):
+    """
+    Ids of the events and groups whose serialized payload the pending flush changes,
+    either directly or through a child row or a membership.
+    """
+    deleted_events, deleted_groups = session.info.pop('versioning_deleted_members', ((), ()))
+    events, groups = set(deleted_events), set(deleted_groups)
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Event):
+            events.add(obj.id)
+        elif isinstance(obj, EVENT_CHILDREN):
+            events.add(obj.event_id)
+        elif isinstance(obj, Group):
+            groups.add(obj.id)
+        elif isinstance(obj, GROUP_CHILDREN):
+            groups.add(obj.group_id)
+        elif isinstance(obj, User) and obj not in session.deleted:
+            # Joining a group or being invited through the association tables
+            groups.update(group.id for group in _relationship_targets(obj, 'groups'))
+            events.update(event.id for event in _relationship_targets(obj, 'invited_events'))
+
+    events.discard(None)
+    groups.discard(None)
+    return events, groups
+
+
+def _bump(session, events, groups):
+    collections = {name for name, ids in (('events', events), ('groups', groups)) if ids}
+    if not collections:
+        return
+
+    connection = session.connection()
+    now = datetime.now(timezone.utc)
+    if events:
+        connection.execute(update(Event.__table__).where(Event.__table__.c.id.in_(events)).values(updated_at=now))
+    if groups:
+        connection.execute(update(Group.__table__).where(Group.__table__.c.id.in_(groups)).values(updated_at=now))
+
+    table = CollectionVersion.__table__
+    for name in sorted(collections):
+        result = connection.execute(
+            update(table).where(table.c.name == name).values(version=table.c.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(name=name, version=1))
+
+    pending = session.info.setdefault('versioning_touched', (set(), set()))
+    pending[0].update(events)
+    pending[1].update(groups)
+
+
+@event.listens_for(Session, 'before_flush')
+def collect_deleted_memberships(session, flush_context, instances):
+    """
+    The groups and invited events of users about to be deleted. Their rows in the
+    association tables are deleted with them, so after the flush they can no
+    longer be read; affected_ids picks them up from the session. The flush loads
+    both collections anyway to delete those rows, so reading them here is free.
+    """
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            pending = session.info.setdefault('versioning_deleted_members', (set(), set()))
+            pending[0].update(event.id for event in obj.invited_events)
+            pending[1].update(group.id for group in obj.groups)
+
+
+@event.listens_for(Session, 'after_flush')
+def bump_versions(session, flush_context):
+    """
+    Bump updated_at on every affected event and group, and the version counter
+    of every collection touched.
+    """
+    _bump(session, *affected_ids(session))
+
+
+def touch(session, events=(), groups=()):
+    """
+    Bump versions for writes made with Core statements (bulk inserts, set-based
+    updates), which bypass the ORM flush and therefore bump_versions.
+    """
+    _bump(session, {id_ for id_ in events if id_ is not None}, {id_ for id_ in groups if id_ is not None})
+
+
+_commit_listeners = []
+
+
+def on_commit(listener):
+    """
+    Register listener(events, groups), called with the ids touched by each
+    transaction once it has committed. Rolled-back transactions are never reported.
+    """
+    _commit_listeners.append(listener)
+    return listener
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_commit(session):
+    events, groups = session.info.pop('versioning_touched', ((), ()))
+    if events or groups:
+        for listener in _commit_listeners:
+            listener(events, groups)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_touched(session):
+    session.info.pop('versioning_touched', None)
+    session.info.pop('versioning_deleted_members', None)
+
+
+def collection_version(name):
+    """
+    Current version counter of a collection (0 if it has never been written).
+    """
+    return db.session.query(CollectionVersion.version).filter_by(name=name).scalar() or 0
+
+
+def make_etag(*parts):
+    """
+    Strong ETag over the version stamps and request details a payload depends on.
+    """
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(etag):
+    """
+    A 304 response if the client already holds this version, otherwise None.
+    """
+    if etag.strip('"') in request.if_none_match:
+        response = make_response('', 304)
+        response.headers.update(etag_headers(etag))
+        return response
+    return None
+
+
+def etag_headers(etag):
+    """
+    Headers that make clients revalidate with If-None-Match instead of reusing stale data.
+    """
+    return {'ETag': etag, 'Cache-Control': 'private, no-cache'}